@@ -0,0 +1,211 @@
+# engine/accounts.py
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import contextvars
+import json
+import time
+
+from .identity import RegimeFlexIdentity as RF
+from .config import Config, frozen_config
+from .pipeline import Pipeline, SESSION_MEMO, load_pipeline_config
+from .stage_timer import StageTimer
+from .trade_cadence import last_trade_dates
+from .daily_stages import (
+    AccountPaths, decision_stages, execution_stages, subgraph, build_result, build_early_exit,
+    stage_exec_pair, stage_reconcile, stage_audit_plan, stage_broker, stage_fills, stage_snapshot,
+    PLANNING_STAGES, universe_enabled,
+)
+from .positions import load_positions
+from .run_summary import append_run_summary
+
+ACCOUNTS_DEFAULTS = {
+    "state_root": "data/accounts",   # one subdirectory per account
+    "max_workers": 4,                # accounts planned/submitted at once
+    "summary_file": "logs/audit/accounts_summary.jsonl",
+}
+
+# shared once per batch: config hash, gate, calendar, signal + allocation
+SHARED_STAGES = ("fingerprint", "gate", "calendar", "load_signal", "phase", "allocator", "diagnostics")
+# shared once per execution pair
+PAIR_STAGES = ("load_long", "load_short", "common_close", "prices", "adv")
+
+@dataclass(frozen=True)
+class Account:
+    name: str
+    pair: str = "QQQ_PSQ"
+    equity: float = 25_000.0
+    min_trade_value: float = 200.0
+    alpaca: Dict[str, Any] = field(default_factory=dict)   # overrides broker.yaml alpaca (enabled/dry_run/mode)
+    key_env: Optional[str] = None                          # env vars holding this account's API keys
+    secret_env: Optional[str] = None
+
+def load_accounts_config() -> dict:
+    cfg = Config(".")._load_yaml("config/accounts.yaml") if (Config(".").root / "config/accounts.yaml").exists() else {}
+    return {**ACCOUNTS_DEFAULTS, **{k: v for k, v in cfg.items() if k != "accounts"}, "accounts": cfg.get("accounts") or []}
+
+def load_accounts(cfg: Optional[dict] = None) -> List[Account]:
+    cfg = cfg or load_accounts_config()
+    out = []
+    for a in cfg["accounts"]:
+        out.append(Account(
+            name=str(a["name"]),
+            pair=str(a.get("pair", "QQQ_PSQ")).upper(),
+            equity=float(a.get("equity", 25_000.0)),
+            min_trade_value=float(a.get("min_trade_value", 200.0)),
+            alpaca=dict(a.get("alpaca") or {}),
+            key_env=a.get("key_env"),
+            secret_env=a.get("secret_env"),
+        ))
+    names = [a.name for a in out]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate account names in config/accounts.yaml")
+    check_live_keys(out)
+    return out
+
+def check_live_keys(accounts: List[Account]) -> None:
+    """
+    Live submission needs each account's own keys: falling back to the global ALPACA_* keys
+    would put every account on one brokerage book while each keeps its own positions file.
+    """
+    broker = Config(".")._load_yaml("config/broker.yaml") if Config(".").has("config/broker.yaml") else {}
+    for a in accounts:
+        alp = {**(broker.get("alpaca") or {}), **a.alpaca}
+        if not bool(alp.get("dry_run", True)) and not (a.key_env and a.secret_env):
+            raise ValueError(f"Account '{a.name}' submits live (dry_run: false) but sets no key_env/secret_env")
+
+def _account_planning(paths: AccountPaths) -> List:
+    """reconcile (this account's positions + fills) → target … decide."""
+    stages = subgraph(decision_stages(universe=False), ("reconcile",) + PLANNING_STAGES)
+    return [replace(s, fn=partial(stage_reconcile, paths=paths)) if s.name == "reconcile" else s for s in stages]
+
+def _account_execution(acct: Account, paths: AccountPaths) -> List:
+    bound = {
+        "audit_plan": partial(stage_audit_plan, paths=paths),
+        "broker": partial(stage_broker, paths=paths, alpaca=acct.alpaca,
+                          creds_env=(acct.key_env, acct.secret_env) if acct.key_env else None,
+                          account=acct.name),
+        "fills": partial(stage_fills, paths=paths),
+        "snapshot": partial(stage_snapshot, paths=paths, equity_ref=acct.equity),
+    }
+    return [replace(s, fn=bound[s.name]) for s in execution_stages(universe=False)]
+
+def _run_account(acct: Account, base: Dict[str, Any], paths: AccountPaths) -> Dict[str, Any]:
+    timer = StageTimer(enabled=True)
+    last = last_trade_dates(paths.fills)
+    today = datetime.now(timezone.utc).date()
+    seed = {
+        **base,
+        "equity": acct.equity,
+        "min_trade_value": acct.min_trade_value,
+        "t0": time.perf_counter(),
+        "days_since": lambda sym: (today - last[sym]).days if sym in last else None,
+        "positions_raw": None,
+    }
+    ctx = Pipeline(_account_planning(paths), max_workers=1).run(seed, timer)
+    if ctx.get("halted_by") != "decide":
+        ctx = Pipeline(_account_execution(acct, paths), max_workers=1).run(ctx, timer)
+    result = build_result(ctx, timer.as_dict())
+    try:
+        append_run_summary(result, paths.run_summary)
+    except Exception as e:
+        RF.print_log(f"[{acct.name}] run summary append failed: {e}", "ERROR")
+    return result
+
+def _summary_row(acct: Account, result: Dict[str, Any]) -> Dict[str, Any]:
+    bc = result.get("breadcrumbs") or {}
+    tgt = result.get("target") or {}
+    return {
+        "account": acct.name,
+        "pair": acct.pair,
+        "equity": acct.equity,
+        "target_symbol": tgt.get("symbol", ""),
+        "target_dollars": round(float(tgt.get("dollars", 0.0)), 2),
+        "n_intents": len(result.get("intents") or []),
+        "no_op": bool(bc.get("no_op", False)),
+        "no_op_reason": bc.get("no_op_reason", ""),
+        "turnover_frac": bc.get("turnover_frac", 0.0),
+        "positions_after": result.get("positions_after", {}),
+        "error": result.get("error", ""),
+    }
+
+def run_accounts(accounts: Optional[List[Account]] = None, vix: Optional[float] = None,
+                 minutes_to_close: Optional[int] = None, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    One daily cycle for every account in config/accounts.yaml:
+      shared    fingerprint, gate, calendar, signal load, phase, allocator, diagnostics (once)
+      per pair  bar loads, common close, prices (once per distinct execution pair)
+      per acct  reconcile → sizing/turnover/plan/filters/coalesce → audit → broker → fills → snapshot,
+                in parallel, each with its own positions, fills journal, ledger and snapshot CSV
+                (data/accounts/<name>/)
+    Returns {"results": {name: result}, "summary": [row per account]} and appends the consolidated
+    summary to logs/audit/accounts_summary.jsonl. A failing account does not stop the others.
+    """
+    if universe_enabled():
+        raise ValueError("config/universe.yaml is enabled: universe mode plans one book, "
+                         "accounts are planned per execution pair")
+    cfg = load_accounts_config()
+    accounts = load_accounts(cfg) if accounts is None else list(accounts)
+    check_live_keys(accounts)
+    run = Config(".").run or {}
+    vix = run.get("vix_assumption", 20.0) if vix is None else vix
+    minutes_to_close = int(run.get("minutes_to_close", 28) if minutes_to_close is None else minutes_to_close)
+    workers = max(1, int(max_workers or cfg["max_workers"]))
+    t0 = time.perf_counter()
+    RF.print_log(f"Account batch starting ({len(accounts)} account(s))", "INFO")
+
+    with frozen_config():
+        pcfg = load_pipeline_config()
+        memo = SESSION_MEMO if bool(pcfg.get("memoize", True)) else None
+        shared = Pipeline(subgraph(decision_stages(universe=False), SHARED_STAGES),
+                          max_workers=int(pcfg.get("max_workers", 4)), memo=memo, salt_key="fp")
+        base = shared.run({"minutes_to_close": minutes_to_close, "vix": vix})
+
+        root = Path(cfg["state_root"])
+        paths = {a.name: AccountPaths.under(root / a.name) for a in accounts}
+        results: Dict[str, Dict[str, Any]] = {}
+        if base.get("halted_by") == "gate":
+            # kill switch / EOD guard: every account is a no-op on its own book
+            for acct in accounts:
+                res = build_early_exit({**base, "t0": t0}, {})
+                pos = load_positions(paths[acct.name].positions)
+                results[acct.name] = {**res, "positions_before": pos, "positions_after": pos}
+        else:
+            pair_ctx: Dict[str, Dict[str, Any]] = {}
+            for pair in sorted({a.pair for a in accounts}):
+                market = Pipeline(subgraph(decision_stages(universe=False), PAIR_STAGES), max_workers=2, memo=memo, salt_key="fp")
+                pair_ctx[pair] = market.run({**base, **stage_exec_pair(pair)})
+
+            def _one(acct: Account) -> Dict[str, Any]:
+                try:
+                    return _run_account(acct, pair_ctx[acct.pair], paths[acct.name])
+                except Exception as e:
+                    RF.print_log(f"[{acct.name}] account cycle failed: {e}", "ERROR")
+                    return {"target": {}, "intents": [], "positions_after": {},
+                            "breadcrumbs": {"no_op": True, "no_op_reason": "ERROR"}, "error": f"{type(e).__name__}: {e}"}
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rf-acct") as pool:
+                # each account runs in a copy of this context, so it reads the batch's frozen config
+                futs = [pool.submit(contextvars.copy_context().run, _one, acct) for acct in accounts]
+                for acct, fut in zip(accounts, futs):
+                    results[acct.name] = fut.result()
+
+    summary = [_summary_row(a, results[a.name]) for a in accounts]
+    doc = {
+        "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "hash16": base["fp"]["sha256_16"],
+        "phase": base.get("phase", ""),
+        "halted_by": base.get("halted_by", ""),
+        "duration_sec": round(time.perf_counter() - t0, 3),
+        "accounts": summary,
+    }
+    path = Path(cfg["summary_file"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(doc, default=str) + "\n")
+    RF.print_log(f"Account batch complete in {doc['duration_sec']:.3f}s → {path}", "SUCCESS")
+    return {"results": results, "summary": summary}
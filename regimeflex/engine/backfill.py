@@ -0,0 +1,206 @@
+# engine/backfill.py
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+
+from .config import Config
+from .data import load_window
+from .exposure import exposure_allocator_series, classify_phase_series, compute_sma
+from .fingerprint import compute_fingerprint
+from .guardrails import enforce_exposure_caps
+from .health import run_health
+from .identity import RegimeFlexIdentity as RF
+from .report import (render_daily_html, write_report_css, load_render_index,
+                     save_render_index, pending_pages)
+from .symbols import resolve_signal_underlier
+
+BACKFILL_DEFAULTS = {
+    "start_date": None,
+    "end_date": None,
+    "out_dir": "reports/backfill",
+    "skip_if_exists": True,
+    "workers": 4,
+    "chunk_size": 50,
+    "parallel_min_pages": 2000,
+}
+
+def load_backfill_config() -> dict:
+    cfg = Config(".")
+    raw = cfg._load_yaml("config/backfill.yaml") if (cfg.root / "config/backfill.yaml").exists() else {}
+    return {**BACKFILL_DEFAULTS, **raw}
+
+def _to_date(s):
+    return None if s in (None, "", "null") else datetime.fromisoformat(str(s)).date()
+
+def build_pages(cfg: dict, equity: float) -> List[Tuple[str, dict]]:
+    """
+    (filename, result) for every backfill date. Allocator and phase are computed once
+    over the whole range (same values as calling them on each date's history).
+    """
+    # resolve signal underlier from cache (falls back to QQQ if NDX missing)
+    sig_sym, sig_df_all = resolve_signal_underlier()
+
+    start = _to_date(cfg.get("start_date"))
+    end = _to_date(cfg.get("end_date"))
+
+    # execution underliers for valuation: closes inside the backfill range only
+    lo = pd.Timestamp(start) if start else None
+    hi = pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns") if end else None
+    qqq = load_window("QQQ", lo, hi, columns=("close",))
+    psq = load_window("PSQ", lo, hi, columns=("close",))
+    if qqq is None or psq is None:
+        raise RuntimeError("QQQ/PSQ cache missing for valuation.")
+    if start:
+        sig_df_all = sig_df_all[sig_df_all.index.date >= start]
+    if end:
+        sig_df_all = sig_df_all[sig_df_all.index.date <= end]
+    if sig_df_all.empty:
+        RF.print_log("No dates in range after filtering.", "ERROR")
+        return []
+
+    # warm-up length: need at least slow MA; read from exposure.yaml
+    exp = Config(".")._load_yaml("config/exposure.yaml")
+    slow_ma = int(exp["trend"]["slow_ma"])
+    fast_ma = int(exp["trend"]["fast_ma"])
+    bb_p = int(exp["weights"]["bb_period"])
+    bb_std = float(exp["weights"]["bb_std"])
+
+    fp = compute_fingerprint(".")  # config hash for breadcrumbs
+    allocs = exposure_allocator_series(sig_df_all)
+    phases = classify_phase_series(sig_df_all, fast=fast_ma, bb_p=bb_p, bb_std=bb_std)
+    slow = compute_sma(sig_df_all, slow_ma).to_numpy()
+    qqq_px = dict(zip(qqq.index, qqq["close"].to_numpy()))
+    psq_px = dict(zip(psq.index, psq["close"].to_numpy()))
+    limits = exp.get("limits")
+
+    pages: List[Tuple[str, dict]] = []
+    for i, d in enumerate(sig_df_all.index):
+        # ensure we have enough history up to date d
+        if i + 1 < slow_ma or pd.isna(slow[i]):
+            continue
+        # valuation prices on date d; skip if ETF bars are missing this date
+        if d not in qqq_px or d not in psq_px:
+            continue
+        alloc, guard_note = enforce_exposure_caps(allocs[i], limits=limits)
+        phase = phases[i]
+        px_qqq = float(qqq_px[d])
+        px_psq = float(psq_px[d])
+
+        # choose side and compute target (no orders; just a report)
+        tqqq_w = float(alloc["TQQQ"])
+        sqqq_w = float(alloc["SQQQ"])
+        if tqqq_w >= sqqq_w:
+            symbol = "TQQQ"
+            dollars = equity * tqqq_w
+            shares = dollars / px_qqq if px_qqq > 0 else 0.0
+        else:
+            symbol = "SQQQ"
+            dollars = equity * sqqq_w
+            shares = dollars / px_psq if px_psq > 0 else 0.0
+        direction = "LONG" if dollars > 0 else "FLAT"
+
+        # minimal run-like result, named by the historical date
+        result = {
+            "target": {
+                "symbol": symbol,
+                "direction": direction,
+                "dollars": round(dollars, 2),
+                "shares": round(shares, 6),
+                "notes": "BACKFILL_STUB",
+            },
+            "positions_before": {},   # not simulated to avoid behavioral assumptions
+            "intents": [],            # backfill: no orders
+            "positions_after": {},    # backfill: none
+            "breadcrumbs": {
+                "signal_underlier": sig_sym,
+                "phase": phase,
+                "config_hash16": fp["sha256_16"],
+                "eod_guard": "backfill",
+                "plan_reason": f"backfill: phase={phase} caps={guard_note}",
+            },
+        }
+        pages.append((f"daily_report_{d.strftime('%Y-%m-%d')}.html", result))
+    return pages
+
+def _render_chunk(out_dir: str, health_status: str, chunk: List[Tuple[str, dict, str]]) -> List[Tuple[str, str]]:
+    """Worker: render and write one chunk of pages; returns (filename, hash) for the checkpoint."""
+    out = Path(out_dir)
+    done = []
+    for fname, result, h in chunk:
+        (out / fname).write_text(render_daily_html(result, health_status), encoding="utf-8")
+        done.append((fname, h))
+    return done
+
+def render_pages(pages: List[Tuple[str, dict]], out_dir: str, health_status: str, workers: int = 4,
+                 chunk_size: int = 50, incremental: bool = True, parallel_min_pages: int = 2000) -> Dict[str, float]:
+    """
+    Render pages in chunks across a process pool (inline below parallel_min_pages, where
+    worker start-up costs more than it saves). The render index doubles as the checkpoint:
+    it is saved after every finished chunk, so an interrupted backfill resumes with only
+    the pages that were not written (or whose inputs changed).
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    write_report_css(out_dir)
+    index = load_render_index(out_dir)
+    todo, skipped = pending_pages(pages, out_dir, health_status, index, incremental)
+    size = max(1, int(chunk_size))
+    chunks = [todo[i:i + size] for i in range(0, len(todo), size)]
+    total, done = len(todo), 0
+    t0 = time.perf_counter()
+
+    def _checkpoint(finished: List[Tuple[str, str]]) -> None:
+        nonlocal done
+        index.update(finished)
+        save_render_index(out_dir, index)
+        done += len(finished)
+        secs = max(time.perf_counter() - t0, 1e-9)
+        rate = done / secs
+        eta = (total - done) / rate if rate > 0 else 0.0
+        RF.print_log(f"Backfill {done}/{total} pages ({rate:.0f} pages/s, ETA {eta:.0f}s)", "INFO")
+
+    if skipped:
+        RF.print_log(f"Backfill resuming: {skipped} page(s) already up to date", "INFO")
+    if len(chunks) > 1 and int(workers) > 1 and total >= int(parallel_min_pages):
+        # forkserver: the parent may hold threads (notifier, log rotation) that a plain fork would copy
+        # mid-state; the server preloads the renderer so each worker starts without re-importing pandas
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["engine.report"])
+        with ProcessPoolExecutor(max_workers=min(int(workers), len(chunks)), mp_context=ctx) as pool:
+            futs = [pool.submit(_render_chunk, out_dir, health_status, c) for c in chunks]
+            for fut in as_completed(futs):
+                _checkpoint(fut.result())
+    else:
+        for c in chunks:
+            _checkpoint(_render_chunk(out_dir, health_status, c))
+
+    secs = time.perf_counter() - t0
+    return {"rendered": total, "skipped": skipped, "seconds": round(secs, 3),
+            "pages_per_sec": round(total / secs, 1) if secs > 0 and total else 0.0}
+
+def run_backfill(cfg: Optional[dict] = None) -> Dict[str, float]:
+    cfg = cfg or load_backfill_config()
+    run = Config(".").run or {}
+    equity = float(run.get("equity", 25_000.0))
+    out_dir = cfg.get("out_dir", "reports/backfill")
+
+    t0 = time.perf_counter()
+    pages = build_pages(cfg, equity)
+    build_sec = time.perf_counter() - t0
+    if not pages:
+        return {"rendered": 0, "skipped": 0, "seconds": round(build_sec, 3), "pages_per_sec": 0.0}
+    RF.print_log(f"Backfill computed {len(pages)} dates in {build_sec:.2f}s", "INFO")
+
+    workers = min(int(cfg.get("workers", 4)), os.cpu_count() or 1)
+    res = render_pages(pages, out_dir, run_health().status, workers=workers,
+                       chunk_size=int(cfg.get("chunk_size", 50)),
+                       incremental=bool(cfg.get("skip_if_exists", True)),
+                       parallel_min_pages=int(cfg.get("parallel_min_pages", 2000)))
+    RF.print_log(f"Backfill produced {res['rendered']} reports → {out_dir}", "SUCCESS")
+    return res
@@ -1,20 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Optional
 import math
 import pandas as pd
 import numpy as np
 
 from .signals import detect_regime, trend_signal, mr_signal, RegimeState
 from .risk import RiskConfig, RiskInputs, circuit_breakers, dynamic_position_size
-
-def _slip(px: float, side: str, bps: float) -> float:
-    """
-    Applies slippage in basis points:
-      BUY  → pay higher:  px * (1 + bps/1e4)
-      SELL → receive less: px * (1 - bps/1e4)
-    """
-    m = (bps / 1e4)
-    return px * (1 + m) if side.upper() == "BUY" else px * (1 - m)
+from .costs import CostModel, adv_series
 
 @dataclass(frozen=True)
 class BTConfig:
@@ -26,10 +19,18 @@ class BTConfig:
     commission_per_share: float = 0.0     # e.g., 0.005
     fixed_fee_per_trade: float = 0.0      # e.g., 0.00
     slippage_bps: float = 10.0            # 10 bps = 0.10%
+    impact_bps: float = 0.0               # square-root impact at 100% of ADV (engine/costs.py)
+    adv_days: int = 20
+    expected_edge_bps: float = 0.0        # >0: skip resizes whose expected cost exceeds this edge
     # NEW: strategy params (passed to signal functions)
     trend_params: dict = None
     mr_params: dict = None
 
+    def cost_model(self) -> CostModel:
+        return CostModel(slippage_bps=self.slippage_bps, commission_per_share=self.commission_per_share,
+                         fixed_fee_per_trade=self.fixed_fee_per_trade, impact_bps=self.impact_bps,
+                         expected_edge_bps=self.expected_edge_bps)
+
 @dataclass(frozen=True)
 class BTResult:
     equity_curve: pd.Series
@@ -50,16 +51,41 @@ def _metrics(equity: pd.Series) -> tuple[float, float, float]:
     sharpe = (rets.mean() / (rets.std(ddof=0) + 1e-12)) * np.sqrt(252) if rets.std(ddof=0) > 0 else 0.0
     return float(cagr), float(abs(dd)), float(sharpe)
 
-def run_backtest(qqq: pd.DataFrame, psq: pd.DataFrame, cfg: BTConfig) -> BTResult:
-    # align dates
-    idx = qqq.index.intersection(psq.index)
-    qqq = qqq.loc[idx].copy()
-    psq = psq.loc[idx].copy()
+def run_backtest(qqq: pd.DataFrame, psq: pd.DataFrame, cfg: BTConfig, cache: Optional[bool] = None) -> BTResult:
+    """
+    Backtest cfg over the bars. Results are content-addressed by (bars, BTConfig, backtest code)
+    in engine/bt_cache.py, so an identical run is read back instead of recomputed;
+    cache=None → data.yaml backtest_cache.enabled.
+    """
+    from .bt_cache import backtest_cache, data_key, result_key   # bt_cache imports this module
+    store = backtest_cache(cache)
+    if store is None:
+        return _run_backtest(qqq, psq, cfg)
+    dkey = data_key(qqq, psq)
+    key = result_key(dkey, cfg)
+    res = store.get(key)
+    if res is None:
+        res = _run_backtest(qqq, psq, cfg)
+        store.put(key, res, cfg, dkey)
+    return res
+
+def _run_backtest(qqq: pd.DataFrame, psq: pd.DataFrame, cfg: BTConfig) -> BTResult:
+    # align dates (read-only below, so no copies; equal indexes are used as-is)
+    if qqq.index.equals(psq.index):
+        idx = qqq.index
+    else:
+        idx = qqq.index.intersection(psq.index)
+        qqq = qqq.loc[idx]
+        psq = psq.loc[idx]
     
     # Extract strategy parameters
     trend_kwargs = cfg.trend_params or {}
     mr_kwargs = cfg.mr_params or {}
 
+    # frictions: per-symbol ADV once for the whole run, costs evaluated per trade
+    costs = cfg.cost_model()
+    adv = {"QQQ": adv_series(qqq, cfg.adv_days), "PSQ": adv_series(psq, cfg.adv_days)}
+
     cash = cfg.start_cash
     shares = 0.0
     symbol = None
@@ -138,8 +164,8 @@ def run_backtest(qqq: pd.DataFrame, psq: pd.DataFrame, cfg: BTConfig) -> BTResul
                 # SELL all current shares of old symbol (side = SELL)
                 side = "SELL"
                 exec_px = float(qqq["close"].iloc[i] if symbol == "QQQ" else psq["close"].iloc[i])
-                exec_px = _slip(exec_px, side, cfg.slippage_bps)
-                commission = abs(shares) * cfg.commission_per_share
+                exec_px = costs.exec_price(exec_px, side, shares, adv[symbol][i])
+                commission = float(costs.commission(shares))
                 fee = cfg.fixed_fee_per_trade
                 cash += shares * exec_px - commission - fee
                 shares = 0.0
@@ -153,8 +179,8 @@ def run_backtest(qqq: pd.DataFrame, psq: pd.DataFrame, cfg: BTConfig) -> BTResul
                     # go flat: SELL all
                     side = "SELL"
                     exec_px = float(qqq["close"].iloc[i] if symbol == "QQQ" else psq["close"].iloc[i])
-                    exec_px = _slip(exec_px, side, cfg.slippage_bps)
-                    commission = abs(shares) * cfg.commission_per_share
+                    exec_px = costs.exec_price(exec_px, side, shares, adv[symbol][i])
+                    commission = float(costs.commission(shares))
                     fee = cfg.fixed_fee_per_trade
                     cash += shares * exec_px - commission - fee
                     shares = 0.0
@@ -166,10 +192,13 @@ def run_backtest(qqq: pd.DataFrame, psq: pd.DataFrame, cfg: BTConfig) -> BTResul
                 new_shares = target_dollars / px
                 delta_shares = new_shares - (shares if symbol == sym else 0.0)
 
-                if abs(delta_shares) * px >= cfg.min_trade_value:
+                # resizes of an open position must also earn their expected cost (entries always trade)
+                resize = symbol == sym and shares != 0.0
+                if abs(delta_shares) * px >= cfg.min_trade_value and (
+                        not resize or bool(costs.worth_trading(delta_shares, px, adv[sym][i]))):
                     side = "BUY" if delta_shares > 0 else "SELL"
-                    exec_px = _slip(px, side, cfg.slippage_bps)
-                    commission = abs(delta_shares) * cfg.commission_per_share
+                    exec_px = costs.exec_price(px, side, delta_shares, adv[sym][i])
+                    commission = float(costs.commission(delta_shares))
                     fee = cfg.fixed_fee_per_trade
                     # adjust cash by the delta trade, include costs
                     cash -= delta_shares * exec_px + commission + fee
@@ -0,0 +1,153 @@
+# engine/barstore.py
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Date-partitioned columnar bar store:
+#   <root>/<SYMBOL>/<partition>.npz   one array per column + "ts" (int64 ns, UTC wall time)
+#   <root>/<SYMBOL>/_meta.json        columns, index name/tz/unit and a source tag
+# Reads prune partitions by date range, slice rows with searchsorted and load only the
+# requested columns (npz members load lazily), so memory follows the window, not the history.
+
+PARTITION_UNITS = {"Y": "datetime64[Y]", "M": "datetime64[M]"}
+
+def _utc_ns(ts) -> Optional[int]:
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_convert("UTC").tz_localize(None) if ts.tz is not None else ts
+    return int(ts.as_unit("ns").value)
+
+class PartitionedStore:
+    def __init__(self, root: Path, freq: str = "Y"):
+        if freq not in PARTITION_UNITS:
+            raise ValueError(f"freq must be one of {sorted(PARTITION_UNITS)}")
+        self.root = Path(root)
+        self.freq = freq
+
+    # ----- layout -----
+
+    def _dir(self, symbol: str) -> Path:
+        return self.root / symbol.upper().replace("/", "_")
+
+    def _key(self, ts_ns: np.ndarray) -> np.ndarray:
+        return ts_ns.astype("datetime64[ns]").astype(PARTITION_UNITS[self.freq]).astype(str)
+
+    def partitions(self, symbol: str) -> List[str]:
+        d = self._dir(symbol)
+        return sorted(p.stem for p in d.glob("*.npz") if not p.stem.endswith(".tmp")) if d.exists() else []
+
+    def meta(self, symbol: str) -> dict:
+        try:
+            return json.loads((self._dir(symbol) / "_meta.json").read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, symbol: str, meta: dict) -> None:
+        path = self._dir(symbol) / "_meta.json"
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(meta, sort_keys=True))
+        os.replace(tmp, path)
+
+    def _save(self, path: Path, arrays: dict) -> None:
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+    # ----- write -----
+
+    def write(self, symbol: str, df: pd.DataFrame, replace: bool = False, tag: Optional[str] = None) -> int:
+        """
+        Merge rows into their partitions (newer rows win on equal timestamps); only touched
+        partitions are rewritten. replace=True drops partitions the frame no longer covers.
+        Returns rows written.
+        """
+        d = self._dir(symbol)
+        d.mkdir(parents=True, exist_ok=True)
+        idx = pd.DatetimeIndex(df.index)
+        tz = str(idx.tz) if idx.tz is not None else None
+        wall = idx.tz_convert("UTC").tz_localize(None) if tz else idx
+        new = {"ts": wall.as_unit("ns").asi8.astype(np.int64)}
+        for c in df.columns:
+            new[str(c)] = df[c].to_numpy()
+        keys = self._key(new["ts"]) if len(df) else np.array([], dtype=str)
+        touched = set(np.unique(keys))
+        if replace:
+            for p in set(self.partitions(symbol)) - touched:
+                (d / f"{p}.npz").unlink()
+        for k in sorted(touched):
+            sel = keys == k
+            part = {c: v[sel] for c, v in new.items()}
+            path = d / f"{k}.npz"
+            if path.exists() and not replace:
+                with np.load(path) as z:
+                    part = {c: np.concatenate([z[c], part[c]]) for c in part}
+            order = np.argsort(part["ts"], kind="stable")
+            ts = part["ts"][order]
+            keep = order[np.append(ts[1:] != ts[:-1], True)]
+            self._save(path, {c: v[keep] for c, v in part.items()})
+        self._write_meta(symbol, {"columns": [str(c) for c in df.columns], "tz": tz, "unit": idx.unit,
+                                  "index": df.index.name or "date", "tag": tag})
+        return int(len(df))
+
+    # ----- read -----
+
+    def scan(self, symbol: str, start=None, end=None,
+             columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+        """One frame per partition overlapping [start, end] (inclusive), with only `columns`."""
+        meta = self.meta(symbol)
+        cols = list(columns) if columns is not None else meta.get("columns", [])
+        lo, hi = _utc_ns(start), _utc_ns(end)
+        klo = None if lo is None else str(self._key(np.array([lo]))[0])
+        khi = None if hi is None else str(self._key(np.array([hi]))[0])
+        for p in self.partitions(symbol):
+            if (klo is not None and p < klo) or (khi is not None and p > khi):
+                continue
+            yield self._read_part(symbol, p, cols, meta, lo, hi)
+
+    def _read_part(self, symbol: str, part: str, cols: list, meta: dict,
+                   lo: Optional[int] = None, hi: Optional[int] = None) -> pd.DataFrame:
+        with np.load(self._dir(symbol) / f"{part}.npz") as z:
+            ts = z["ts"]
+            a = 0 if lo is None else int(np.searchsorted(ts, lo, "left"))
+            b = len(ts) if hi is None else int(np.searchsorted(ts, hi, "right"))
+            data = {c: z[c][a:b] for c in cols}
+            ts = ts[a:b]
+        return self._frame(ts, data, meta)
+
+    @staticmethod
+    def _frame(ts: np.ndarray, data: dict, meta: dict) -> pd.DataFrame:
+        idx = pd.DatetimeIndex(ts.astype("datetime64[ns]"), name=meta.get("index", "date"))
+        idx = idx.as_unit(meta.get("unit", "ns"))
+        if meta.get("tz"):
+            idx = idx.tz_localize("UTC").tz_convert(meta["tz"])
+        return pd.DataFrame(data, index=idx)
+
+    def read(self, symbol: str, start=None, end=None, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        parts = list(self.scan(symbol, start, end, columns))
+        if not parts:
+            meta = self.meta(symbol)
+            cols = list(columns) if columns is not None else meta.get("columns", [])
+            return self._frame(np.array([], dtype=np.int64), {c: [] for c in cols}, meta)
+        return pd.concat(parts) if len(parts) > 1 else parts[0]
+
+    def tail(self, symbol: str, n: int, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Last n rows, reading partitions newest-first until n are collected."""
+        meta = self.meta(symbol)
+        cols = list(columns) if columns is not None else meta.get("columns", [])
+        got: List[pd.DataFrame] = []
+        rows = 0
+        for p in reversed(self.partitions(symbol)):
+            got.append(self._read_part(symbol, p, cols, meta))
+            rows += len(got[-1])
+            if rows >= n:
+                break
+        if not got:
+            return self.read(symbol, columns=cols)
+        out = pd.concat(got[::-1]) if len(got) > 1 else got[0]
+        return out.iloc[-n:] if n > 0 else out.iloc[:0]
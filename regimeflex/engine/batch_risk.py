@@ -0,0 +1,84 @@
+# engine/batch_risk.py
+from __future__ import annotations
+from typing import List, Tuple, Union
+
+import numpy as np
+
+# Row-wise (accounts × symbols) versions of exposure_delta.current_exposure_weights,
+# exposure_delta.exposure_delta, turnover.enforce_turnover_cap and guardrails.enforce_exposure_caps.
+# Every input broadcasts against the (rows, symbols) shape; NaN/inf prices, shares and
+# weights count as 0, and rows with equity <= 0 have zero weights and zero turnover.
+
+ArrayLike = Union[float, np.ndarray]
+
+# turnover_cap_batch status codes
+TURNOVER_OK, TURNOVER_CLAMP, TURNOVER_SKIP, TURNOVER_NO_LIMIT = 0, 1, 2, 3
+
+def _clean(a: ArrayLike) -> np.ndarray:
+    return np.nan_to_num(np.asarray(a, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+
+def current_weights_batch(shares: ArrayLike, prices: ArrayLike, equity: ArrayLike) -> np.ndarray:
+    """(rows, symbols) weights = shares × price / equity."""
+    mv = _clean(shares) * _clean(prices)
+    eq = np.asarray(equity, dtype=float)
+    eq = eq[..., None] if eq.ndim else eq
+    ok = eq > 0
+    return np.where(ok, mv / np.where(ok, eq, 1.0), 0.0)
+
+def exposure_delta_batch(prev_w: ArrayLike, desired_w: ArrayLike) -> np.ndarray:
+    """Δ = desired − prev."""
+    return _clean(desired_w) - _clean(prev_w)
+
+def turnover_cap_batch(w_target: ArrayLike, w_now: ArrayLike, max_frac: ArrayLike,
+                       mode: str = "clamp", equity: ArrayLike = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (weights, turnover_frac, status) per row with enforce_turnover_cap's rules:
+      turnover_frac = Σ|target − now| (0 where equity <= 0)
+      max_frac <= 0 → unchanged (NO_LIMIT); frac <= max_frac → unchanged (OK)
+      otherwise clamp: now + (max_frac / frac)·(target − now), or skip: now
+    """
+    tgt, now = np.broadcast_arrays(_clean(w_target), _clean(w_now))
+    eq = np.asarray(equity, dtype=float)
+    frac = np.where(eq > 0, np.abs(tgt - now).sum(axis=-1), 0.0)
+    cap = np.broadcast_to(np.asarray(max_frac, dtype=float), frac.shape)
+
+    over = (cap > 0) & (frac > cap)
+    status = np.where(cap <= 0, TURNOVER_NO_LIMIT, TURNOVER_OK)
+    if mode.lower() == "skip":
+        status = np.where(over, TURNOVER_SKIP, status)
+        out = np.where(over[..., None], now, tgt)
+    else:
+        status = np.where(over, TURNOVER_CLAMP, status)
+        scale = np.where(over, cap / np.where(frac > 0, frac, 1.0), 1.0)
+        out = np.where(over[..., None], now + scale[..., None] * (tgt - now), tgt)
+    return out, frac, status.astype(np.int8)
+
+def turnover_notes(frac: np.ndarray, status: np.ndarray, max_frac: ArrayLike) -> List[str]:
+    """enforce_turnover_cap's note strings, for reporting a (small) batch."""
+    cap = np.broadcast_to(np.asarray(max_frac, dtype=float), np.shape(frac))
+    notes = []
+    for f, s, c in zip(np.ravel(frac), np.ravel(status), np.ravel(cap)):
+        if s == TURNOVER_NO_LIMIT:
+            notes.append("cap=0 → no limit")
+        elif s == TURNOVER_SKIP:
+            notes.append(f"turnover {f:.3f}>{c:.3f} -> skip")
+        elif s == TURNOVER_CLAMP:
+            notes.append(f"turnover {f:.3f}>{c:.3f} -> clamp×{c / f:.3f}")
+        else:
+            notes.append("OK")
+    return notes
+
+def exposure_caps_batch(weights: ArrayLike, max_weight: ArrayLike,
+                        max_gross: ArrayLike = 1.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Long-only per-symbol caps, then a per-row gross scale (enforce_exposure_caps over N legs).
+    Returns (weights, capped mask per cell, gross scale per row; 1.0 = not scaled).
+    """
+    w0 = _clean(weights)
+    caps = np.asarray(max_weight, dtype=float)
+    capped = w0 > caps
+    out = np.minimum(np.maximum(w0, 0.0), caps)
+    gross = out.sum(axis=-1)
+    g = np.broadcast_to(np.asarray(max_gross, dtype=float), gross.shape)
+    scale = np.where((gross > g) & (gross > 0), g / np.where(gross > 0, gross, 1.0), 1.0)
+    return out * scale[..., None], capped, scale
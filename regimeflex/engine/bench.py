@@ -0,0 +1,141 @@
+# engine/bench.py
+from __future__ import annotations
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BENCH_FILE = Path("reports/bench/bench_history.json")
+
+HISTORY_LENGTHS = {"1y": 252, "10y": 2520, "30y": 7560}   # business days
+
+def make_bench_series(n_days: int, start_price: float = 400.0, seed: int = 7,
+                      drift: float = 0.0004, vol: float = 0.012, inverse: bool = False) -> pd.DataFrame:
+    """
+    Deterministic OHLCV random walk ending today (business days), same columns as
+    scripts/seed_and_check_data.make_mock_series but with noise so allocator branches vary.
+    inverse=True mirrors the returns (PSQ-style leg).
+    """
+    today = datetime.now(timezone.utc).date()
+    dates = pd.date_range(end=today, periods=n_days, freq="B")
+    rng = np.random.default_rng(seed)
+    rets = rng.normal(drift, vol, len(dates))
+    if inverse:
+        rets = -rets
+    close = start_price * np.exp(np.cumsum(rets))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * 1.003,
+            "low": close * 0.997,
+            "close": close,
+            "volume": [1_000_000] * len(dates),
+        },
+        index=dates,
+    )
+
+def time_call(fn: Callable[[], object], repeat: int = 3,
+              setup: Optional[Callable[[], None]] = None) -> float:
+    """Best-of-N wall seconds; setup() runs untimed before every repetition."""
+    best = float("inf")
+    for _ in range(max(1, int(repeat))):
+        if setup is not None:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def git_commit(root: str | Path = ".") -> str:
+    """Short HEAD sha (+ '-dirty' with uncommitted changes), or 'unknown' outside git."""
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short=12", "HEAD"], cwd=root,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True).stdout.strip()
+        return sha + ("-dirty" if dirty else "")
+    except Exception:
+        return "unknown"
+
+# cold-start import statements, run from the repo root in a fresh interpreter
+IMPORT_TARGETS = {
+    "engine.runner": "import engine.runner",
+    "run_http_trigger": "import sys; sys.path.insert(0, 'scripts'); import run_http_trigger",
+}
+
+def _importtime(stmt: str, root: str | Path) -> Tuple[int, Dict[str, int]]:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", stmt], cwd=root,
+                          capture_output=True, text=True, check=True)
+    total, mods = 0, {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header row
+        cum, name = int(parts[1]), parts[2]
+        mods[name.strip()] = cum
+        if not name.startswith("  "):   # top-level import (nested ones are indented further)
+            total += cum
+    return total, mods
+
+def import_time(stmt: str, root: str | Path = ".") -> Tuple[float, Dict[str, int]]:
+    """
+    `python -X importtime -c stmt` in a fresh interpreter: (seconds spent in imports beyond
+    the bare interpreter start-up, module → cumulative µs).
+    """
+    base, _ = _importtime("pass", root)
+    total, mods = _importtime(stmt, root)
+    return max(0, total - base) / 1e6, mods
+
+def load_history(path: Path = BENCH_FILE) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")) or {}
+    except Exception:
+        return {}
+
+def record_results(results: Dict[str, float], commit: str, path: Path = BENCH_FILE,
+                   meta: Optional[dict] = None) -> Dict[str, dict]:
+    """Store {commit: {ts, meta, results}}; re-running on the same commit overwrites its entry."""
+    hist = load_history(path)
+    hist[commit] = {
+        "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "meta": meta or {},
+        "results": {k: round(float(v), 6) for k, v in results.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(hist, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(path)
+    return hist
+
+def find_baseline(history: Dict[str, dict], commit: str, baseline: Optional[str] = None) -> Optional[str]:
+    """Explicit baseline if present, else the most recent other commit by timestamp."""
+    if baseline:
+        return baseline if baseline in history else None
+    others = [(v.get("ts", ""), k) for k, v in history.items() if k != commit]
+    return max(others)[1] if others else None
+
+def compare(current: Dict[str, float], baseline: Dict[str, float],
+            threshold: float = 0.20, min_seconds: float = 0.005) -> List[dict]:
+    """
+    Returns one row per bench present in both runs, flagged if slower than
+    baseline by more than `threshold` (0.20 = 20%). Benches faster than
+    `min_seconds` in both runs are never flagged (timer noise).
+    """
+    rows: List[dict] = []
+    for name in sorted(set(current) & set(baseline)):
+        cur, base = float(current[name]), float(baseline[name])
+        ratio = (cur / base) if base > 0 else 1.0
+        flagged = (ratio - 1.0) > threshold and max(cur, base) >= min_seconds
+        rows.append({"name": name, "baseline": base, "current": cur,
+                     "ratio": round(ratio, 3), "regression": bool(flagged)})
+    return rows
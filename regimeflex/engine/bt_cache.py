@@ -0,0 +1,133 @@
+# engine/bt_cache.py
+from __future__ import annotations
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .config import Config
+from .pipeline import digest
+from .versioning import runtime_versions
+from .backtest import BTConfig, BTResult
+
+# Content-addressed backtest results: key = sha256(data key, canonical BTConfig, code key).
+#   data key   — digest of the QQQ/PSQ frames the backtest reads
+#   code key   — source of the modules run_backtest executes + pandas/numpy versions,
+#                so editing the backtest (or upgrading the stack) never serves stale results
+# One npz per result (UTC ns timestamps + float64 equity + metrics) under <root>/<key[:2]>/,
+# plus an append-only _index.jsonl (key, config, metrics) for browsing.
+
+BT_CACHE_DEFAULTS = {
+    "enabled": True,
+    "root": "data/cache/_backtests",
+}
+
+INDEX_NAME = "_index.jsonl"
+# modules whose code decides a backtest's result
+_CODE_MODULES = ("backtest.py", "signals.py", "risk.py", "indicators.py", "costs.py", "fills.py")
+_code_key: Optional[str] = None
+_index_lock = threading.Lock()
+
+def load_bt_cache_config() -> dict:
+    """data.yaml `backtest_cache:` over BT_CACHE_DEFAULTS."""
+    cfg = Config(".")
+    data = cfg._load_yaml("config/data.yaml") if cfg.has("config/data.yaml") else {}
+    return {**BT_CACHE_DEFAULTS, **(data.get("backtest_cache") or {})}
+
+def code_key() -> str:
+    """Hash of the backtest's source files and numeric stack (once per process)."""
+    global _code_key
+    if _code_key is None:
+        h = hashlib.sha256()
+        here = Path(__file__).parent
+        for name in _CODE_MODULES:
+            h.update(name.encode() + b"\0" + (here / name).read_bytes())
+        v = runtime_versions()
+        h.update(f"pandas={v['pandas']};numpy={v['numpy']}".encode())
+        _code_key = h.hexdigest()
+    return _code_key
+
+def data_key(qqq: pd.DataFrame, psq: pd.DataFrame) -> str:
+    """Digest of the bars (index + every column); compute once per sweep."""
+    return digest(qqq, psq)
+
+def canonical_config(cfg: BTConfig) -> str:
+    """BTConfig as sorted JSON; None and {} strategy params (equivalent in run_backtest) map to {}."""
+    d = asdict(cfg)
+    for k in ("trend_params", "mr_params"):
+        d[k] = d[k] or {}
+    return json.dumps(d, sort_keys=True, separators=(",", ":"), default=str)
+
+def result_key(dkey: str, cfg: BTConfig) -> str:
+    return hashlib.sha256(f"{dkey}|{canonical_config(cfg)}|{code_key()}".encode()).hexdigest()
+
+class BacktestCache:
+    """get(key) → BTResult | None; put(key, result, cfg, dkey). Writes are atomic (tmp + replace)."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[BTResult]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                ts, equity, metrics = z["ts"], z["equity"], z["metrics"]
+                meta = json.loads(str(z["meta"]))
+        except Exception:
+            return None     # torn/corrupt entry → recompute (put overwrites it)
+        idx = pd.DatetimeIndex(ts.astype("datetime64[ns]"), name=meta.get("index", "date"))
+        idx = idx.as_unit(meta.get("unit", "ns"))
+        if meta.get("tz"):
+            idx = idx.tz_localize("UTC").tz_convert(meta["tz"])
+        return BTResult(equity_curve=pd.Series(equity, index=idx), trades=int(meta["trades"]),
+                        cagr=float(metrics[0]), max_dd=float(metrics[1]), sharpe=float(metrics[2]))
+
+    def put(self, key: str, res: BTResult, cfg: BTConfig, dkey: str) -> None:
+        idx = pd.DatetimeIndex(res.equity_curve.index)
+        meta = {"index": idx.name, "unit": str(idx.unit), "tz": str(idx.tz) if idx.tz is not None else None,
+                "trades": int(res.trades)}
+        ts = (idx.tz_convert("UTC").tz_localize(None) if idx.tz is not None else idx).as_unit("ns").asi8
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+        np.savez(tmp, ts=ts, equity=res.equity_curve.to_numpy(dtype=float),
+                 metrics=np.array([res.cagr, res.max_dd, res.sharpe], dtype=float), meta=np.array(json.dumps(meta)))
+        os.replace(tmp, path)
+        entry = {"key": key, "data": dkey, "config": json.loads(canonical_config(cfg)), "rows": int(len(idx)),
+                 "trades": int(res.trades), "cagr": res.cagr, "max_dd": res.max_dd, "sharpe": res.sharpe,
+                 "created_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")}
+        with _index_lock, (self.root / INDEX_NAME).open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, sort_keys=True) + "\n")
+
+    def index(self) -> pd.DataFrame:
+        """One row per cached result (latest index line per key, only keys whose file still exists)."""
+        path = self.root / INDEX_NAME
+        rows: Dict[str, dict] = {}
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    e = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                rows[e["key"]] = e
+        live: List[dict] = [e for k, e in rows.items() if self._path(k).exists()]
+        return pd.DataFrame(live)
+
+def backtest_cache(enabled: Optional[bool] = None) -> Optional[BacktestCache]:
+    """The configured cache, or None when disabled (enabled=None → data.yaml)."""
+    c = load_bt_cache_config()
+    if not (bool(c["enabled"]) if enabled is None else bool(enabled)):
+        return None
+    return BacktestCache(Path(c["root"]))
@@ -0,0 +1,318 @@
+# engine/compact.py
+from __future__ import annotations
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import Config
+
+# Compact daily bars for sweeps / multi-process work:
+#   one int32 day-number index (days since 1970-01-01 UTC) shared by every symbol,
+#   symbols addressed by code (position in `symbols`),
+#   prices float32 when they round-trip exactly at their quote decimals (cents → rounded back on
+#   expansion) or, for full-precision prices, when the relative error stays under `tol`,
+#   volume int32 where it fits,
+#   optionally backed by one read-only shared-memory block that workers attach to.
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+NS_PER_DAY = 86_400 * 10**9
+
+COMPACT_DEFAULTS = {
+    "enabled": False,          # sweeps with workers > 1 share float32 bars (else float64)
+    "price_dtype": "float32",
+    "tol": 1e-6,               # max relative price error before a column stays float64
+}
+
+def load_compact_config() -> dict:
+    data = Config(".")._load_yaml("config/data.yaml") if (Config(".").root / "config/data.yaml").exists() else {}
+    return {**COMPACT_DEFAULTS, **(data.get("compact") or {})}
+
+def day_numbers(idx: pd.DatetimeIndex) -> np.ndarray:
+    """UTC calendar day of each bar as int32 days since the epoch."""
+    idx = pd.DatetimeIndex(idx)
+    wall = idx.tz_convert("UTC").tz_localize(None) if idx.tz is not None else idx
+    return (wall.as_unit("ns").asi8 // NS_PER_DAY).astype(np.int32)
+
+MAX_DECIMALS = 6
+
+def _quote_decimals(values: np.ndarray, small: np.ndarray) -> int:
+    """Fewest decimals d with round(float32(v), d) == v for every bar, else -1."""
+    finite = np.isfinite(values)
+    v, back = values[finite], small[finite].astype(np.float64)
+    for d in range(MAX_DECIMALS + 1):
+        if np.array_equal(np.round(v, d), v):
+            return d if np.array_equal(np.round(back, d), v) else -1
+    return -1
+
+def _narrow_price(values: np.ndarray, dtype: str, tol: float) -> Tuple[np.ndarray, int]:
+    """(column, decimals): decimals >= 0 means expansion rounds back to the exact float64 values."""
+    values = np.asarray(values, dtype=np.float64)
+    if np.dtype(dtype) == np.float64:
+        return values, -1
+    small = values.astype(dtype)
+    dec = _quote_decimals(values, small)
+    if dec >= 0:
+        return small, dec
+    finite = np.isfinite(values) & (values != 0)
+    err = np.abs(small[finite].astype(np.float64) / values[finite] - 1.0)
+    return (small, -1) if err.size == 0 or float(err.max()) <= tol else (values, -1)
+
+def _column_decimals(values: Sequence[np.ndarray], packed: Sequence[Tuple[np.ndarray, int]]) -> Optional[int]:
+    """
+    One expansion rule for a whole column: the quote decimals every narrowed row round-trips at,
+    -1 when every row was narrowed by `tol` (or none was narrowed), None when the rows disagree.
+    """
+    if len({n.dtype for n, _ in packed}) > 1:
+        return None
+    decs = {d for _, d in packed}
+    if -1 in decs:
+        return -1 if len(decs) == 1 else None
+    top = max(decs, default=-1)
+    for v, (n, _) in zip(values, packed):
+        v = np.asarray(v, dtype=np.float64)
+        finite = np.isfinite(v)
+        if not np.array_equal(np.round(n[finite].astype(np.float64), top), v[finite]):
+            return None
+    return top
+
+def _narrow_volume(values: np.ndarray) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        if not np.all(np.isfinite(values)) or not np.all(values == np.round(values)):
+            return values
+        values = values.astype(np.int64)
+    info = np.iinfo(np.int32)
+    if values.size == 0 or (values.min() >= info.min and values.max() <= info.max):
+        return values.astype(np.int32)
+    return values.astype(np.int64)
+
+@dataclass(frozen=True)
+class CompactPanel:
+    symbols: Tuple[str, ...]
+    days: np.ndarray                        # int32 (n_days,), sorted, shared by all symbols
+    present: np.ndarray                     # bool (n_symbols, n_days)
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)   # name → (n_symbols, n_days)
+    tz: Optional[str] = "UTC"
+    decimals: Dict[str, int] = field(default_factory=dict)         # float32 column → quote decimals
+    unit: str = "ns"                                               # resolution of rebuilt indexes
+
+    def code(self, symbol: str) -> int:
+        return self.symbols.index(symbol.upper())
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.days.nbytes + self.present.nbytes + sum(a.nbytes for a in self.columns.values()))
+
+    def index(self, code: Optional[int] = None) -> pd.DatetimeIndex:
+        days = self.days if code is None else self.days[self.present[code]]
+        idx = pd.DatetimeIndex(days.astype("datetime64[D]").astype(f"datetime64[{self.unit}]"), name="date")
+        return idx.tz_localize(self.tz) if self.tz else idx
+
+    def frame(self, symbol: str, dtype=np.float64) -> pd.DataFrame:
+        """
+        One symbol's bars as a DataFrame. dtype=np.float64 upcasts float32 prices so indicator
+        math runs as before; dtype=None keeps the compact column dtypes. Columns that need no
+        conversion are views of the panel (zero-copy for shared blocks) when the symbol has
+        a bar on every panel day.
+        """
+        i = self.code(symbol)
+        row = self.present[i]
+        full = bool(row.all())
+        data = {}
+        for name, arr in self.columns.items():
+            col = arr[i] if full else arr[i, row]
+            if name in PRICE_COLUMNS and dtype is not None and col.dtype != np.dtype(dtype):
+                col = col.astype(dtype)
+                if self.decimals.get(name, -1) >= 0 and col.dtype == np.float64:
+                    col = np.round(col, self.decimals[name])
+            elif col.dtype == np.int32 and dtype is not None:
+                col = col.astype(np.int64)
+            data[name] = col
+        return pd.DataFrame(data, index=self.index(i), copy=False)
+
+def compact_frames(frames: Dict[str, pd.DataFrame], price_dtype: str = "float32",
+                   tol: float = 1e-6) -> CompactPanel:
+    """
+    Pack daily frames (one bar per UTC day each) onto a shared day index.
+    Missing days are NaN for prices and 0 for volume, with `present` marking real bars.
+    """
+    symbols = tuple(s.upper() for s in frames)
+    per_sym = {}
+    for sym, df in zip(symbols, frames.values()):
+        d = day_numbers(df.index)
+        if len(d) > 1 and not np.all(np.diff(d) > 0):
+            raise ValueError(f"{sym}: compact bars need one sorted bar per UTC day")
+        per_sym[sym] = d
+    days = np.unique(np.concatenate(list(per_sym.values()))) if per_sym else np.array([], dtype=np.int32)
+    days = days.astype(np.int32)
+    present = np.zeros((len(symbols), len(days)), dtype=bool)
+    names: List[str] = []
+    for df in frames.values():
+        names += [c for c in df.columns if c not in names]
+
+    columns: Dict[str, np.ndarray] = {}
+    decimals: Dict[str, int] = {}
+    for name in names:
+        rows = []
+        for i, (sym, df) in enumerate(zip(symbols, frames.values())):
+            pos = np.searchsorted(days, per_sym[sym])
+            present[i, pos] = True
+            vals = df[name].to_numpy() if name in df.columns else np.full(len(df), np.nan)
+            rows.append((pos, vals))
+        if name != "volume":
+            packed = [_narrow_price(v, price_dtype, tol) for _, v in rows]
+            dec = _column_decimals([v for _, v in rows], packed)
+            if dec is None:     # mixed precision: keep every symbol's exact float64 values
+                narrowed, dt = [np.asarray(v, dtype=np.float64) for _, v in rows], np.float64
+            else:
+                narrowed = [n for n, _ in packed]
+                dt = np.result_type(*[n.dtype for n in narrowed]) if narrowed else np.float64
+                if dt != np.float64:
+                    decimals[name] = dec
+            out = np.full((len(symbols), len(days)), np.nan, dtype=dt)
+        else:
+            narrowed = [_narrow_volume(v) for _, v in rows]
+            dt = np.result_type(*[n.dtype for n in narrowed]) if narrowed else np.int32
+            out = np.zeros((len(symbols), len(days)), dtype=dt)
+        for i, ((pos, _), n) in enumerate(zip(rows, narrowed)):
+            out[i, pos] = n
+        columns[name] = out
+
+    tz, unit = None, "ns"
+    first = next(iter(frames.values()), None)
+    if first is not None:
+        first_idx = pd.DatetimeIndex(first.index)
+        tz, unit = ("UTC" if first_idx.tz is not None else None), first_idx.unit
+    return CompactPanel(symbols, days, present, columns, tz, decimals, unit)
+
+# ---------- shared memory ----------
+
+@dataclass(frozen=True)
+class SharedSpec:
+    """Picklable handle a worker passes to attach_panel()."""
+    name: str
+    symbols: Tuple[str, ...]
+    tz: Optional[str]
+    layout: Tuple[Tuple[str, str, Tuple[int, ...], int], ...]   # (key, dtype, shape, offset)
+    decimals: Tuple[Tuple[str, int], ...] = ()
+    unit: str = "ns"
+
+class SharedPanel:
+    """
+    A CompactPanel living in one shared-memory block. The creating process owns the block
+    (unlink() when the work is done); attached panels are read-only views.
+    Use as a context manager to close (and, for the owner, unlink) on exit.
+    """
+    def __init__(self, shm: shared_memory.SharedMemory, spec: SharedSpec, owner: bool):
+        self.shm = shm
+        self.spec = spec
+        self.owner = owner
+        self.panel: Optional[CompactPanel] = _views(shm, spec)
+
+    def close(self) -> None:
+        self.panel = None
+        self.shm.close()
+
+    def unlink(self) -> None:
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> "SharedPanel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+        self.unlink()
+
+def _views(shm: shared_memory.SharedMemory, spec: SharedSpec) -> CompactPanel:
+    arrays = {}
+    for key, dtype, shape, offset in spec.layout:
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        arr.flags.writeable = False
+        arrays[key] = arr
+    cols = {k[4:]: v for k, v in arrays.items() if k.startswith("col:")}
+    return CompactPanel(spec.symbols, arrays["days"], arrays["present"], cols, spec.tz,
+                        dict(spec.decimals), spec.unit)
+
+def share_panel(panel: CompactPanel) -> SharedPanel:
+    """Copy a panel into a new shared-memory block (8-byte aligned arrays)."""
+    items = [("days", panel.days), ("present", panel.present)]
+    items += [(f"col:{k}", v) for k, v in panel.columns.items()]
+    layout, offset = [], 0
+    for key, arr in items:
+        layout.append((key, arr.dtype.str, tuple(arr.shape), offset))
+        offset += -(-arr.nbytes // 8) * 8
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, 8))
+    for (key, arr), (_, _, _, off) in zip(items, layout):
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=off)[...] = arr
+    spec = SharedSpec(shm.name, panel.symbols, panel.tz, tuple(layout),
+                      tuple(sorted(panel.decimals.items())), panel.unit)
+    return SharedPanel(shm, spec, owner=True)
+
+def attach_panel(spec: SharedSpec) -> SharedPanel:
+    """Map an existing block read-only; the owner, not the worker, unlinks it."""
+    try:
+        shm = shared_memory.SharedMemory(name=spec.name, track=False)   # 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=spec.name)   # pool workers share the owner's tracker
+    return SharedPanel(shm, spec, owner=False)
+
+# ---------- precision audit ----------
+
+def _signals(df: pd.DataFrame, cfg: dict) -> Dict[str, np.ndarray]:
+    from .exposure import exposure_allocator_series, classify_phase_series, compute_sma
+    fast, slow = int(cfg["trend"]["fast_ma"]), int(cfg["trend"]["slow_ma"])
+    allocs = exposure_allocator_series(df)
+    phases = classify_phase_series(df, fast=fast, bb_p=int(cfg["weights"]["bb_period"]),
+                                   bb_std=float(cfg["weights"]["bb_std"]))
+    sma200 = compute_sma(df, 200).to_numpy()
+    return {
+        "side": np.array(["SQQQ" if a["SQQQ"] > 0 else "TQQQ" for a in allocs]),
+        "weight": np.array([max(a["TQQQ"], a["SQQQ"]) for a in allocs], dtype=float),
+        "phase": np.array(phases),
+        "bull": df["close"].to_numpy() > sma200,
+    }
+
+def precision_audit(frames: Optional[Dict[str, pd.DataFrame]] = None, price_dtype: Optional[str] = None,
+                    tol: Optional[float] = None, symbols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Compare the signals (allocator side/weight, phase, 200-day regime) computed on float64 bars
+    with the same signals on compacted bars, bar by bar. frames=None audits the cached
+    data.yaml symbols. One row per symbol; any *_changes > 0 means compaction moved a decision.
+    """
+    from .data import load_from_cache
+    ccfg = load_compact_config()
+    price_dtype = price_dtype or str(ccfg["price_dtype"])
+    tol = float(ccfg["tol"] if tol is None else tol)
+    if frames is None:
+        data = Config(".")._load_yaml("config/data.yaml")
+        frames = {s: load_from_cache(s) for s in (symbols or data.get("symbols", []))}
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+    exp = Config(".")._load_yaml("config/exposure.yaml")
+
+    rows = []
+    for sym, df in frames.items():
+        daily = df.copy()
+        daily.index = compact_frames({sym: df}).index(0)     # same day-resolution index on both sides
+        panel = compact_frames({sym: daily}, price_dtype=price_dtype, tol=tol)
+        small = panel.frame(sym)
+        a, b = _signals(daily, exp), _signals(small, exp)
+        close = daily["close"].to_numpy(dtype=float)
+        rel = np.abs(small["close"].to_numpy() / np.where(close == 0, np.nan, close) - 1.0)
+        wdiff = np.abs(a["weight"] - b["weight"])
+        rows.append({
+            "symbol": sym.upper(),
+            "rows": int(len(df)),
+            "price_dtype": str(panel.columns["close"].dtype),
+            "max_rel_err": float(np.nanmax(rel)) if np.isfinite(rel).any() else 0.0,
+            "side_changes": int((a["side"] != b["side"]).sum()),
+            "phase_changes": int((a["phase"] != b["phase"]).sum()),
+            "regime_changes": int((a["bull"] != b["bull"]).sum()),
+            "max_weight_diff": float(np.nanmax(wdiff)) if np.isfinite(wdiff).any() else 0.0,
+            "bytes_float64": int(df.memory_usage(index=True).sum()),
+            "bytes_compact": panel.nbytes,
+        })
+    return pd.DataFrame(rows)
@@ -1,21 +1,86 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
+import copy
+import os
 import yaml
 
+from .statcache import StatCache
+
+# (cwd, root, path) → parsed YAML (None = missing) while inside frozen_config(); per context, so only
+# the batch that opened the block (and workers started with its context) see the snapshot
+_frozen: ContextVar[dict | None] = ContextVar("rf_frozen_config", default=None)
+
+def _parse_yaml(p: Path):
+    with p.open("r") as f:
+        return yaml.safe_load(f) or {}
+
+def copy_plain(obj):
+    """Deep copy for parsed YAML (dicts/lists of immutable scalars); several times faster than deepcopy."""
+    if isinstance(obj, dict):
+        return {k: copy_plain(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [copy_plain(v) for v in obj]
+    if isinstance(obj, (str, int, float, bool, type(None))):
+        return obj
+    return copy.deepcopy(obj)
+
+# parsed YAML per file, re-read only when the file's stat changes (long-lived processes)
+YAML_CACHE = StatCache(_parse_yaml, copier=copy_plain)
+
+@contextmanager
+def frozen_config():
+    """
+    Parse each config file at most once for the duration of the block (batch what-ifs,
+    simulations); callers still get their own deep copy. Files are treated as immutable
+    inside the block, so repeat reads (and missing files) cost no filesystem calls.
+    Nested blocks share the outer snapshot. Other threads keep reading the files unless
+    they run in a copy of this context (contextvars.copy_context(), as Pipeline does).
+    """
+    if _frozen.get() is not None:
+        yield
+        return
+    token = _frozen.set({})
+    try:
+        yield
+    finally:
+        _frozen.reset(token)
+
 class Config:
     def __init__(self, root: str = "."):
         self.root = Path(root)
+        self._root_key = str(root)
         self._strategies = None
         self._risk = None
         self._schedule = None
         self._telemetry = None
         self._run = None  # NEW
 
+    def _frozen_entry(self, snap: dict, rel_path: str):
+        key = (os.getcwd(), self._root_key, rel_path)
+        if key not in snap:
+            p = self.root / rel_path
+            snap[key] = _parse_yaml(p) if p.exists() else None
+        return snap[key]
+
+    def has(self, rel_path: str) -> bool:
+        """Whether a config file exists (answered from the snapshot inside frozen_config)."""
+        snap = _frozen.get()
+        if snap is not None:
+            return self._frozen_entry(snap, rel_path) is not None
+        return (self.root / rel_path).exists()
+
     def _load_yaml(self, rel_path: str):
+        snap = _frozen.get()
+        if snap is not None:
+            data = self._frozen_entry(snap, rel_path)
+            if data is None:
+                raise FileNotFoundError(f"Missing config: {rel_path}")
+            return copy_plain(data)
         p = self.root / rel_path
         if not p.exists():
             raise FileNotFoundError(f"Missing config: {rel_path}")
-        with p.open("r") as f:
-            return yaml.safe_load(f) or {}
+        return YAML_CACHE.get(p)
 
     @property
     def strategies(self):
@@ -0,0 +1,120 @@
+# engine/costs.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .config import Config
+
+# Expected transaction cost of a trade, shared by the backtest, the fill engine (runner dry-run
+# and simulator) and the live delta filter:
+#   |shares|·price·(spread_bps/2 + slippage_bps + impact_bps·√(|shares| / ADV)) / 1e4
+#   + |shares|·commission_per_share + fixed_fee_per_trade (per non-zero trade)
+# Every method broadcasts over arrays of candidates. Unknown ADV (NaN / <= 0) → no impact term.
+# The benefit side is expected_edge_bps per dollar traded; 0 turns the cost gate off.
+
+ArrayLike = Union[float, np.ndarray]
+
+COST_DEFAULTS = {
+    "enabled": False,              # live: skip resizes whose expected cost exceeds the expected benefit
+    "spread_bps": 0.0,             # full quoted spread; each fill crosses half of it
+    "slippage_bps": 0.0,
+    "commission_per_share": 0.0,
+    "fixed_fee_per_trade": 0.0,
+    "impact_bps": 0.0,             # square-root impact at 100% of ADV
+    "adv_days": 20,                # trailing sessions for average daily volume (shares)
+    "expected_edge_bps": 0.0,      # expected benefit per dollar of rebalance
+}
+
+def load_cost_config() -> dict:
+    """risk.yaml `costs:` over COST_DEFAULTS."""
+    cfg = Config(".")
+    risk = cfg._load_yaml("config/risk.yaml") if cfg.has("config/risk.yaml") else {}
+    return {**COST_DEFAULTS, **(risk.get("costs") or {})}
+
+@dataclass(frozen=True)
+class CostModel:
+    slippage_bps: float = 0.0
+    spread_bps: float = 0.0
+    commission_per_share: float = 0.0
+    fixed_fee_per_trade: float = 0.0
+    impact_bps: float = 0.0
+    expected_edge_bps: float = 0.0
+
+    @classmethod
+    def from_config(cls, c: Optional[dict] = None) -> "CostModel":
+        c = load_cost_config() if c is None else {**COST_DEFAULTS, **c}
+        return cls(slippage_bps=float(c["slippage_bps"]), spread_bps=float(c["spread_bps"]),
+                   commission_per_share=float(c["commission_per_share"]),
+                   fixed_fee_per_trade=float(c["fixed_fee_per_trade"]), impact_bps=float(c["impact_bps"]),
+                   expected_edge_bps=float(c["expected_edge_bps"]))
+
+    def cost_bps(self, shares: ArrayLike, adv: ArrayLike = np.nan) -> np.ndarray:
+        """Price-proportional cost (half spread + slippage + square-root impact) in bps of notional."""
+        q = np.abs(np.asarray(shares, dtype=float))
+        adv = np.asarray(adv, dtype=float)
+        ok = np.isfinite(adv) & (adv > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            part = np.where(ok, q / np.where(ok, adv, 1.0), 0.0)
+        return self.spread_bps / 2.0 + self.slippage_bps + self.impact_bps * np.sqrt(part)
+
+    def commission(self, shares: ArrayLike) -> np.ndarray:
+        return np.abs(np.asarray(shares, dtype=float)) * self.commission_per_share
+
+    def fees(self, shares: ArrayLike) -> np.ndarray:
+        """Cash charged on top of the fill price: commission + the fixed fee per non-zero trade."""
+        q = np.abs(np.asarray(shares, dtype=float))
+        return q * self.commission_per_share + np.where(q > 0, self.fixed_fee_per_trade, 0.0)
+
+    def cost(self, shares: ArrayLike, price: ArrayLike, adv: ArrayLike = np.nan) -> np.ndarray:
+        """Expected dollars lost to trading `shares` (signed or not) at `price`."""
+        q = np.abs(np.asarray(shares, dtype=float))
+        return q * np.asarray(price, dtype=float) * self.cost_bps(q, adv) / 1e4 + self.fees(q)
+
+    def benefit(self, shares: ArrayLike, price: ArrayLike) -> np.ndarray:
+        return np.abs(np.asarray(shares, dtype=float)) * np.asarray(price, dtype=float) * self.expected_edge_bps / 1e4
+
+    def worth_trading(self, shares: ArrayLike, price: ArrayLike, adv: ArrayLike = np.nan) -> np.ndarray:
+        """True where expected cost <= expected benefit (always True with expected_edge_bps = 0)."""
+        if self.expected_edge_bps <= 0:
+            return np.ones(np.broadcast(np.asarray(shares), np.asarray(price)).shape, dtype=bool)
+        return self.cost(shares, price, adv) <= self.benefit(shares, price)
+
+    def exec_price(self, px: float, side: str, shares: float = 0.0, adv: float = np.nan) -> float:
+        """Reference price moved against the trade by spread + slippage + impact (fees excluded)."""
+        sign = 1.0 if side.upper() == "BUY" else -1.0
+        return float(px * (1.0 + sign * self.cost_bps(shares, adv) / 1e4))
+
+def rebalance_cost(model: CostModel, w_target: ArrayLike, w_now: ArrayLike, equity: ArrayLike,
+                   prices: ArrayLike, adv: ArrayLike = np.nan) -> np.ndarray:
+    """
+    (rows, symbols) expected cost of moving weights w_now → w_target, broadcasting like
+    engine/batch_risk.py (NaN/inf weights count as 0; cells with no price cost nothing).
+    Sum over the last axis for a per-row total.
+    """
+    tgt = np.nan_to_num(np.asarray(w_target, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+    now = np.nan_to_num(np.asarray(w_now, dtype=float), nan=0.0, posinf=0.0, neginf=0.0)
+    px = np.asarray(prices, dtype=float)
+    eq = np.asarray(equity, dtype=float)
+    eq = eq[..., None] if eq.ndim else eq
+    ok = np.isfinite(px) & (px > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(ok, (tgt - now) * np.maximum(eq, 0.0) / np.where(ok, px, 1.0), 0.0)
+    return model.cost(shares, np.where(ok, px, 0.0), adv)
+
+def adv_series(df: pd.DataFrame, days: int) -> np.ndarray:
+    """Trailing mean daily volume (shares) per bar, including the bar itself; NaN without volume."""
+    if df is None or "volume" not in df.columns:
+        return np.full(0 if df is None else len(df), np.nan)
+    return df["volume"].astype(float).rolling(max(1, int(days)), min_periods=1).mean().to_numpy()
+
+def adv_shares(df: pd.DataFrame, days: int) -> float:
+    """Average daily volume over the last `days` bars (NaN when unknown)."""
+    if df is None or len(df) == 0 or "volume" not in df.columns:
+        return float("nan")
+    return float(df["volume"].iloc[-max(1, int(days)):].astype(float).mean())
+
+def adv_map(sides: list, long_df: pd.DataFrame, short_df: pd.DataFrame, days: int) -> Dict[str, float]:
+    return {sides[0]: adv_shares(long_df, days), sides[1]: adv_shares(short_df, days)}
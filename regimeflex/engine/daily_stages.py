@@ -0,0 +1,988 @@
+# engine/daily_stages.py
+from __future__ import annotations
+from dataclasses import asdict, dataclass, replace
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import math
+import os
+import time
+
+import numpy as np
+
+from .identity import RegimeFlexIdentity as RF
+from .env import load_env
+from .config import Config
+from .killswitch import is_killed
+from .pnl import snapshot_from_positions, append_snapshot_csv
+from .exposure import exposure_allocator, classify_phase
+from .guardrails import enforce_exposure_caps
+from .versioning import runtime_versions
+from .exposure_delta import current_exposure_weights, exposure_delta
+from .exposure_reason import compute_exposure_diagnostics, format_plan_reason
+from .symbols import resolve_signal_underlier
+from .instruments import resolve_execution_pair
+from .turnover import enforce_turnover_cap
+from .reconcile_positions import effective_positions_before
+from .report_csv import write_change_report
+from .run_summary import append_run_summary
+from .order_preview import write_order_preview
+from .metrics import compute_tsi
+from .plan_coalesce import coalesce_side_flip
+from .symnorm import sym_upper, map_keys_upper, ensure_keys_upper
+from .timing import eod_ready
+from .fingerprint import compute_fingerprint, diff_fingerprints, load_last_fingerprint, save_last_fingerprint
+from .telemetry import Notifier, TGCreds
+from .data import get_daily_bars
+from .portfolio import TargetExposure
+from .exec_planner import plan_orders, OrderIntent
+from .exec_alpaca import AlpacaCreds, AlpacaExecutor, ALPACA_PAPER_URL, ALPACA_LIVE_URL
+from .reconcile import compare_intents_vs_orders
+from .positions import load_positions, save_positions
+from .fills import simulate_fills, apply_simulated_fills, FillModel
+from .costs import CostModel, adv_map, adv_shares, load_cost_config, rebalance_cost
+from .sizing import load_constraints
+from .universe import (
+    Universe, load_universe, load_universe_config, target_weights, cap_weights, current_weights,
+    turnover_cap, plan_rebalance,
+)
+from .storage import ENSStyleAudit
+from .calendar import is_fomc_blackout, is_opex
+from .pipeline import Stage
+
+# Stage functions for the daily cycle (graph assembled in decision_stages/execution_stages).
+# Market stages depend only on bars + config, account stages on positions/fills; the IO
+# stages (audit, preview CSV, broker, persist) are the only ones that write. Breadcrumb
+# fragments come back as crumbs_<stage> and build_crumbs merges them in a fixed order.
+
+def _risk_cfg() -> dict:
+    cfg = Config(".")
+    return cfg._load_yaml("config/risk.yaml") if cfg.has("config/risk.yaml") else {}
+
+def intent_to_dict(it: OrderIntent) -> dict:
+    return {
+        "symbol": it.symbol,
+        "side": it.side,
+        "qty": round(float(it.qty), 6),
+        "order_type": it.order_type,
+        "time_in_force": it.time_in_force,
+        "limit_price": None if it.limit_price is None else float(it.limit_price),
+        "reason": it.reason,
+    }
+
+def last_common_close(long_df, short_df) -> tuple:
+    """Find the latest common date and prices for both dataframes."""
+    # Normalize timestamps to avoid timezone comparison issues
+    long_dates_norm = set(long_df.index.tz_localize(None) if long_df.index.tz is not None else long_df.index)
+    short_dates_norm = set(short_df.index.tz_localize(None) if short_df.index.tz is not None else short_df.index)
+    common_dates_norm = long_dates_norm.intersection(short_dates_norm)
+
+    if common_dates_norm:
+        # Get the latest common date
+        latest_common_date_norm = max(common_dates_norm)
+        # Find the original timestamp in the dataframe
+        latest_common_date = None
+        for idx in long_df.index:
+            if (idx.tz_localize(None) if idx.tz is not None else idx) == latest_common_date_norm:
+                latest_common_date = idx
+                break
+
+        long_price = float(long_df.loc[latest_common_date, "close"])
+        short_price = float(short_df.loc[latest_common_date, "close"])
+    else:
+        # Fall back to latest available date for each symbol
+        latest_long_date_norm = max(long_dates_norm)
+        latest_short_date_norm = max(short_dates_norm)
+        latest_common_date_norm = max(latest_long_date_norm, latest_short_date_norm)
+
+        # Find original timestamps
+        latest_long_date = None
+        latest_short_date = None
+        for idx in long_df.index:
+            if (idx.tz_localize(None) if idx.tz is not None else idx) == latest_long_date_norm:
+                latest_long_date = idx
+                break
+        for idx in short_df.index:
+            if (idx.tz_localize(None) if idx.tz is not None else idx) == latest_short_date_norm:
+                latest_short_date = idx
+                break
+
+        # Use the latest available price for each symbol
+        long_price = float(long_df.loc[latest_long_date, "close"])
+        short_price = float(short_df.loc[latest_short_date, "close"])
+        latest_common_date = latest_common_date_norm
+
+    return latest_common_date, long_price, short_price
+
+# ---------- gate / IO preamble ----------
+
+def stage_fingerprint() -> dict:
+    fp = compute_fingerprint(".")
+    RF.print_log(f"Config fingerprint: {fp['sha256_16']} ({len(fp['files'])} files)", "INFO")
+    # per-file hashes against the previous run say which config changed, without re-reading anything
+    prev = load_last_fingerprint()
+    changed = diff_fingerprints(prev, fp)
+    if changed:
+        RF.print_log(f"Config changed since last run → {', '.join(changed)}", "RISK")
+    if prev is None or prev.get("sha256") != fp["sha256"]:
+        save_last_fingerprint(fp)
+    ENSStyleAudit().log(kind="CFG", data={"hash16": fp["sha256_16"], "hash": fp["sha256"], "files": fp["files"],
+                                          "changed": changed})
+    return {"fp": fp, "config_changed": changed}
+
+def stage_gate(minutes_to_close: int) -> dict:
+    """Kill switch + EOD timing guard; halts the pipeline with an early-exit descriptor."""
+    if is_killed():
+        RF.print_log("KILL-SWITCH active — aborting run before any actions", "RISK")
+        return {"gate": {"no_op_reason": "KILL_SWITCH", "notes": "KILL", "crumbs": {}}, "halt": "KILL_SWITCH"}
+
+    ok_time, why = eod_ready(minutes_to_close)
+    RF.print_log(f"EOD timing check → {why}", "RISK" if not ok_time else "INFO")
+    if not ok_time:
+        return {"gate": {"no_op_reason": "EOD_GUARD_TOO_EARLY", "notes": "EOD_GUARD", "crumbs": {"eod_guard": why}},
+                "halt": "EOD_GUARD_TOO_EARLY"}
+    return {"gate": None}
+
+def stage_decision_ping(minutes_to_close: int) -> dict:
+    tele_cfg = (Config(".").telemetry or {})
+    if tele_cfg.get("decision_ping", True) and tele_cfg.get("enabled", True):
+        exp_cfg = Config(".")._load_yaml("config/exposure.yaml")
+        fast = exp_cfg["trend"]["fast_ma"]
+        bb_p = exp_cfg["weights"]["bb_period"]
+        bb_sd = exp_cfg["weights"]["bb_std"]
+        # the ping goes out before signals are computed
+        msg = (
+            f"*⏰ RegimeFlex Decision Window*\n"
+            f"Within EOD window — `{minutes_to_close}m` to close.\n"
+            f"*Underlier*: `N/A`   *Phase*: `N/A`\n"
+            f"*BB*: {bb_p}/{bb_sd}σ   *FastMA*: {fast}\n"
+            f"_This is an informational ping; no orders placed yet._"
+        )
+        env = load_env()
+        Notifier(TGCreds(token=env.telegram_bot_token, chat_id=env.telegram_chat_id)).send(msg)
+
+    # Always print a concise console line too
+    RF.print_log(f"Decision window active — {minutes_to_close}m to close", "INFO")
+    return {}
+
+def stage_calendar() -> dict:
+    sched = Config(".").schedule or {}
+    today = date.today()
+    is_fomc = is_fomc_blackout(
+        today,
+        fomc_meetings=sched.get("fomc_dates", []),
+        window=tuple(sched.get("fomc_blackout_window", [-1, 1]))
+    )
+    is_opex_day = is_opex(today, overrides=sched.get("opex_overrides", []))
+    RF.print_log(f"Calendar → FOMC blackout={is_fomc}, OPEX={is_opex_day}", "RISK")
+    return {"calendar": {"fomc_blackout": is_fomc, "opex": is_opex_day}}
+
+# ---------- market data ----------
+
+def stage_exec_pair(pair: Optional[str] = None) -> dict:
+    exec_map = resolve_execution_pair(pair)
+    return {"exec_map": exec_map, "sides": [sym_upper(exec_map["long"]), sym_upper(exec_map["short"])]}
+
+def stage_load_long(exec_map: dict) -> dict:
+    return {"long_df": get_daily_bars(exec_map["long_ref"])}
+
+def stage_load_short(exec_map: dict) -> dict:
+    return {"short_df": get_daily_bars(exec_map["short_ref"])}
+
+def stage_load_signal() -> dict:
+    sig_sym, sig_df = resolve_signal_underlier()
+    return {"sig_sym": sig_sym, "sig_df": sig_df}
+
+# ---------- signals / allocation (pure) ----------
+
+def stage_phase(sig_df) -> dict:
+    exp_cfg = Config(".")._load_yaml("config/exposure.yaml")
+    phase = classify_phase(sig_df, fast=exp_cfg["trend"]["fast_ma"],
+                           bb_p=exp_cfg["weights"]["bb_period"], bb_std=exp_cfg["weights"]["bb_std"])
+    RF.print_log(f"Signal phase → {phase}", "INFO")
+    return {"phase": phase}
+
+def stage_allocator(sig_df) -> dict:
+    alloc_raw, guard_note = enforce_exposure_caps(exposure_allocator(sig_df))
+    return {"alloc_raw": alloc_raw, "guard_note": guard_note}
+
+def stage_diagnostics(sig_df, phase: str, guard_note: str) -> dict:
+    diag = compute_exposure_diagnostics(sig_df)
+    plan_reason = format_plan_reason(diag, phase=phase, guard_note=guard_note)
+    RF.print_log(f"Plan reason → {plan_reason}", "INFO")
+    return {"plan_reason": plan_reason}
+
+def stage_common_close(long_df, short_df) -> dict:
+    return {"common_close": last_common_close(long_df, short_df)}
+
+def stage_adv(long_df, short_df, sides: list) -> dict:
+    """Average daily volume (shares) per execution symbol, for the cost model's impact term."""
+    return {"adv": adv_map(sides, long_df, short_df, int(load_cost_config()["adv_days"]))}
+
+def stage_target(alloc_raw: dict, sides: list, long_df, short_df, equity: float) -> dict:
+    """Map allocator weights onto the execution pair and pick the primary target."""
+    return target_exposure(alloc_raw, sides, float(long_df["close"].iloc[-1]),
+                           float(short_df["close"].iloc[-1]), equity)
+
+def target_exposure(alloc_raw: dict, sides: list, px_long: float, px_short: float, equity: float) -> dict:
+    """stage_target on given closes for the long/short legs (the simulator passes each day's closes)."""
+    LONG, SHORT = sides
+    alloc = ensure_keys_upper({
+        LONG:  float(alloc_raw.get("TQQQ", 0.0)),
+        SHORT: float(alloc_raw.get("SQQQ", 0.0)),
+    }, sides)
+    RF.print_log(f"Allocation (guarded) → {LONG}={alloc[LONG]:.2f} {SHORT}={alloc[SHORT]:.2f}", "INFO")
+
+    long_dollars = equity * alloc[LONG]
+    short_dollars = equity * alloc[SHORT]
+    if long_dollars > short_dollars:
+        symbol, dollars, direction = LONG, long_dollars, "LONG"
+    elif short_dollars > long_dollars:
+        symbol, dollars, direction = SHORT, short_dollars, "LONG"
+    else:
+        symbol, dollars, direction = LONG, 0.0, "FLAT"
+
+    price = float(px_long if symbol == LONG else px_short)
+    target = TargetExposure(
+        symbol=symbol,
+        direction=direction,
+        dollars=dollars,
+        shares=dollars / price if price > 0 else 0.0,
+        notes=f"Exposure allocator: {LONG}={alloc[LONG]:.2f} {SHORT}={alloc[SHORT]:.2f}"
+    )
+    RF.print_log(f"Target → {target.symbol} | {target.direction} | ${target.dollars:,.2f}", "INFO")
+    return {"alloc": alloc, "target": target, "target_price": price}
+
+def stage_prices(common_close: tuple, sides: list) -> dict:
+    """Price map on the common date + staleness check against config/data.yaml."""
+    common_d, px_long, px_short = common_close
+    last_prices_map = map_keys_upper({sides[0]: px_long, sides[1]: px_short})
+    return {"last_prices_map": last_prices_map, "price_info": _price_info(common_d)}
+
+def _price_info(common_d) -> dict:
+    common_date_str = common_d.strftime("%Y-%m-%d")
+    RF.print_log(f"Price common date → {common_date_str}", "INFO")
+
+    data_cfg = Config(".")._load_yaml("config/data.yaml")
+    max_days_ok = int(((data_cfg.get("staleness") or {}).get("max_days_ok", 3)))
+    lag_days = (datetime.now(timezone.utc).date() - common_d.date()).days
+    is_stale = lag_days > max_days_ok
+    if is_stale:
+        RF.print_log(f"Price data stale: {lag_days}d old (>{max_days_ok}d)", "RISK")
+    return {
+        "price_common_date": common_date_str,
+        "price_staleness_days": lag_days,
+        "price_stale": bool(is_stale),
+        "price_stale_note": f"{lag_days}d old (> {max_days_ok}d)" if is_stale else "fresh",
+    }
+
+# ---------- account ----------
+
+@dataclass(frozen=True)
+class AccountPaths:
+    """
+    Where one account's state and journals live. None → the single-account defaults
+    (data/state/positions.json, logs/trading/*, logs/audit/*).
+    """
+    positions: Optional[Path] = None
+    fills: Optional[Path] = None
+    ledger_dir: Optional[Path] = None
+    snapshot_csv: Optional[Path] = None
+    run_summary: Optional[Path] = None
+
+    @classmethod
+    def under(cls, root: Path) -> "AccountPaths":
+        root = Path(root)
+        (root / "audit").mkdir(parents=True, exist_ok=True)
+        return cls(positions=root / "positions.json", fills=root / "fills_state.jsonl",
+                   ledger_dir=root / "audit", snapshot_csv=root / "daily_snapshot.csv",
+                   run_summary=root / "run_summaries.jsonl")
+
+LIVE_PATHS = AccountPaths()
+
+def _audit(paths: AccountPaths) -> ENSStyleAudit:
+    return ENSStyleAudit(paths.ledger_dir) if paths.ledger_dir else ENSStyleAudit()
+
+def stage_reconcile(positions_raw: Optional[dict] = None, paths: AccountPaths = LIVE_PATHS) -> dict:
+    """positions_raw=None reads the account's positions file (data/state/positions.json live)."""
+    positions_before_raw = load_positions(paths.positions) if positions_raw is None else dict(positions_raw)
+    RF.print_log(f"Positions BEFORE (raw): {positions_before_raw}", "INFO")
+    positions_before, pos_note = effective_positions_before(
+        raw_positions_before=positions_before_raw,
+        broker_positions_snapshot=None,  # hook for future: pass real broker positions here if available
+        fills_file=paths.fills,
+    )
+    positions_before = map_keys_upper(positions_before)
+    RF.print_log(f"Positions effective source: {pos_note}", "INFO")
+    RF.print_log(f"Positions BEFORE (effective): {positions_before}", "INFO")
+    return {"positions_before": positions_before, "positions_source": pos_note}
+
+def _safe(f) -> float:
+    try:
+        f = float(f)
+        return f if (f == f and math.isfinite(f)) else 0.0
+    except Exception:
+        return 0.0
+
+def stage_exposure(positions_before: dict, positions_source: str, last_prices_map: dict,
+                   alloc: dict, sides: list, equity: float) -> dict:
+    # live equity (gross) from reconciled positions
+    equity_now = 0.0
+    for sym, sh in positions_before.items():
+        equity_now += abs(_safe(sh) * _safe(last_prices_map.get(sym)))
+    RF.print_log(f"Positions source → {positions_source} | equity_now=${equity_now:,.2f}", "INFO")
+
+    prev_w = current_exposure_weights(positions_before, last_prices_map, equity_ref=equity, sides=sides)
+    dW = exposure_delta(prev_w, alloc, sides=sides)
+    RF.print_log("Exposure change → " + " | ".join(
+        f"{s} {prev_w[s]:.2f}→{alloc[s]:.2f} (Δ{dW[s]:+.2f})" for s in sides), "INFO")
+    return {"equity_now": equity_now, "prev_w": prev_w, "delta_w": dW}
+
+def stage_turnover(alloc: dict, positions_before: dict, last_prices_map: dict, sides: list, equity: float,
+                   adv: dict) -> dict:
+    LONG, SHORT = sides
+    pos_before = {
+        LONG:  float(positions_before.get(LONG, 0.0)),
+        SHORT: float(positions_before.get(SHORT, 0.0)),
+    }
+    tov = (_risk_cfg().get("turnover") or {})
+    alloc_after, _desired_mv, turnover_frac, tov_note = enforce_turnover_cap(
+        alloc_weights=alloc,
+        positions_before=pos_before,
+        last_prices=last_prices_map,
+        equity=equity,
+        max_turnover_frac=float(tov.get("max_pct_of_equity", 0.15)),
+        mode=str(tov.get("mode", "clamp")),
+    )
+    return {"alloc_capped": alloc_after,
+            "turnover": _turnover_result(turnover_frac, tov_note, sides, alloc_after, pos_before,
+                                         last_prices_map, equity, adv)}
+
+def _turnover_result(turnover_frac: float, tov_note: str, sides: list, alloc_after: dict, positions: dict,
+                     last_prices_map: dict, equity: float, adv: dict) -> dict:
+    turnover = {"turnover_frac": turnover_frac, "turnover_note": tov_note}
+    costs = load_cost_config()
+    if bool(costs["enabled"]):
+        # expected cost of the (capped) rebalance, in dollars
+        px = [float(last_prices_map.get(s, float("nan"))) for s in sides]
+        w_now = [float(positions.get(s, 0.0)) * p / equity if equity > 0 else 0.0 for s, p in zip(sides, px)]
+        est = rebalance_cost(CostModel.from_config(costs), [float(alloc_after.get(s, 0.0)) for s in sides],
+                             w_now, equity, px, [float(adv.get(s, float("nan"))) for s in sides])
+        turnover["est_cost"] = round(float(np.nansum(est)), 2)
+        tov_note = f"{tov_note} | est. cost ${turnover['est_cost']:,.2f}"
+    RF.print_log(f"Turnover check → {turnover_frac:.2%} of equity | {tov_note}", "INFO")
+    return turnover
+
+def stage_exposure_crumbs(sides: list, prev_w: dict, alloc_capped: dict, delta_w: dict, turnover: dict,
+                          positions_source: str, equity_now: float, price_info: dict, t0: float) -> dict:
+    return {"crumbs_exposure": {
+        "exec_long": sides[0],
+        "exec_short": sides[1],
+        "prev_exposure": {s: round(prev_w[s], 4) for s in sides},
+        "desired_exposure": {s: round(alloc_capped[s], 4) for s in sides},
+        "delta_exposure": {s: round(delta_w[s], 4) for s in sides},
+        "turnover_frac": round(turnover["turnover_frac"], 4),
+        "turnover_note": turnover["turnover_note"],
+        "positions_source": positions_source,
+        "equity_now": round(equity_now, 2),
+        **price_info,
+        "run_duration_sec": round(time.perf_counter() - t0, 3),
+        "versions": runtime_versions(),
+    }}
+
+# ---------- planning + filters (side-effect free) ----------
+
+def stage_plan(positions_before: dict, target: TargetExposure, target_price: float,
+               minutes_to_close: int, min_trade_value: float) -> dict:
+    intents = plan_orders(
+        current_positions=positions_before,
+        target=target,
+        current_price=target_price,
+        minutes_to_close=minutes_to_close,
+        min_trade_value=min_trade_value,
+        emergency_override=False,
+    )
+    intents = [
+        OrderIntent(
+            symbol=sym_upper(it.symbol),
+            side=it.side,
+            qty=it.qty,
+            order_type=it.order_type,
+            time_in_force=it.time_in_force,
+            limit_price=it.limit_price,
+            reason=it.reason
+        ) for it in intents
+    ]
+    return {"intents_planned": intents}
+
+def stage_cadence(intents_planned: List[OrderIntent], days_since: Callable[[str], Optional[int]]) -> dict:
+    """Drop intents for symbols traded fewer than risk.cadence.min_days_between days ago."""
+    cad = (_risk_cfg().get("cadence") or {})
+    cad_enabled = bool(cad.get("enabled", True))
+    cad_min_days = int(cad.get("min_days_between", 1))
+    cad_symbols = [s.upper() for s in (cad.get("symbols") or [])]
+
+    def _blocked(it) -> bool:
+        sym = str(it.symbol).upper()
+        if cad_symbols and sym not in cad_symbols:
+            return False
+        d = days_since(sym)
+        if d is None:
+            return False  # never traded before
+        return d < cad_min_days
+
+    intents = list(intents_planned)
+    noop: Dict[str, Any] = {}
+    if cad_enabled and intents:
+        kept, blocked = [], []
+        for it in intents:
+            (blocked if _blocked(it) else kept).append(it)
+        if blocked and not kept:
+            # Entire day is a no-op due to cadence
+            noop = {"no_op": True, "no_op_reason": "CADENCE_GUARD"}
+            RF.print_log(f"Cadence guard: blocked {len(blocked)} intent(s) (<{cad_min_days}d since last trade)", "RISK")
+        elif blocked:
+            RF.print_log(f"Cadence guard: filtered {len(blocked)} of {len(intents)} intent(s)", "RISK")
+        intents = kept
+    return {"intents_cadence": intents,
+            "crumbs_cadence": {**noop, "cadence_enabled": cad_enabled, "cadence_min_days": cad_min_days}}
+
+def stage_delta_filter(intents_cadence: List[OrderIntent], crumbs_exposure: dict, positions_before: dict,
+                       last_prices_map: dict, adv: dict) -> dict:
+    """
+    Skip intents whose symbol's (rounded) exposure change is below risk.exposure_threshold,
+    then (risk.costs.enabled) resizes of an open position whose expected cost exceeds the
+    expected benefit. Entries and full exits are never cost-gated.
+    """
+    ex_cfg = (_risk_cfg().get("exposure_threshold") or {})
+    ex_enabled = bool(ex_cfg.get("enabled", True))
+    ex_min = float(ex_cfg.get("min_delta_abs", 0.01))
+
+    intents = list(intents_cadence)
+    noop: Dict[str, Any] = {}
+    if ex_enabled and intents:
+        kept, filtered = [], []
+        for it in intents:
+            sym = str(it.symbol).upper()
+            d_prev = float((crumbs_exposure.get("prev_exposure") or {}).get(sym, 0.0))
+            d_new = float((crumbs_exposure.get("desired_exposure") or {}).get(sym, 0.0))
+            (filtered if abs(d_new - d_prev) < ex_min else kept).append(it)
+        if filtered and not kept:
+            noop = {"no_op": True, "no_op_reason": "DELTA_BELOW_THRESHOLD"}
+            RF.print_log(f"Exposure filter: all intents below {ex_min:.2%}, skipped.", "RISK")
+        elif filtered:
+            RF.print_log(f"Exposure filter: {len(filtered)} of {len(intents)} intents below {ex_min:.2%}, skipped.", "RISK")
+        intents = kept
+
+    crumbs: Dict[str, Any] = {"exposure_min_delta": ex_min}
+    costs = load_cost_config()
+    if bool(costs["enabled"]) and intents:
+        model = CostModel.from_config(costs)
+        syms = [str(it.symbol).upper() for it in intents]
+        held = np.array([float(positions_before.get(s, 0.0)) for s in syms])
+        signed = np.array([float(it.qty) if it.side == "BUY" else -float(it.qty) for it in intents])
+        price = np.array([float(last_prices_map.get(s, float("nan"))) for s in syms])
+        vol = np.array([float(adv.get(s, float("nan"))) for s in syms])
+        resize = (np.abs(held) > 1e-9) & (np.abs(held + signed) > 1e-9)
+        ok = model.worth_trading(signed, price, vol) | ~resize | ~np.isfinite(price)
+        kept = [it for it, k in zip(intents, ok) if k]
+        if len(kept) < len(intents):
+            dropped = len(intents) - len(kept)
+            RF.print_log(f"Cost filter: {dropped} of {len(intents)} resizes cost more than "
+                         f"{model.expected_edge_bps:g}bps edge, skipped.", "RISK")
+            if not kept and not noop:
+                noop = {"no_op": True, "no_op_reason": "COST_EXCEEDS_BENEFIT"}
+        crumbs["est_cost"] = round(float(np.nansum(model.cost(signed[ok], price[ok], vol[ok]))), 2)
+        crumbs["cost_filtered"] = int((~ok).sum())
+        intents = kept
+    return {"intents_delta": intents, "crumbs_delta": {**noop, **crumbs}}
+
+def stage_coalesce(intents_delta: List[OrderIntent], positions_before: dict, alloc_capped: dict,
+                   last_prices_map: dict, equity_now: float, sides: list) -> dict:
+    """Side-flip coalescing (risk.coalescing); replaces the intent list when it produces one."""
+    coal = (_risk_cfg().get("coalescing") or {})
+    intents = list(intents_delta)
+    crumbs: Dict[str, Any] = {}
+    if bool(coal.get("enabled", True)):
+        c_intents, c_note = coalesce_side_flip(
+            positions_before=positions_before,
+            target_weights=alloc_capped,
+            prices=last_prices_map,
+            equity=equity_now,
+            long_sym=sides[0],
+            short_sym=sides[1],
+            close_dust_shares=float(coal.get("close_dust_shares", 1.0)),
+            min_open_notional=float(coal.get("min_open_notional", 200.0)),
+            prefer_single_leg_if_net_small=bool(coal.get("prefer_single_leg_if_net_small", True)),
+        )
+        if c_intents:
+            RF.print_log(f"Coalesced flip → {c_note}; intents={len(c_intents)}", "INFO")
+            intents = [
+                OrderIntent(
+                    symbol=sym_upper(it["symbol"]),
+                    side=it["side"].upper(),
+                    qty=float(it["qty"]),
+                    order_type="market",  # default for coalesced intents
+                    time_in_force="day",  # default for coalesced intents
+                    limit_price=None,
+                    reason=it["reason"]
+                ) for it in c_intents
+            ]
+            crumbs = {"coalesced_flip": True, "coalesce_note": c_note}
+        else:
+            crumbs = {"coalesced_flip": False, "coalesce_note": c_note}
+    return {"intents": intents, "crumbs_coalesce": crumbs}
+
+def stage_decide(intents: List[OrderIntent], turnover: dict, alloc_capped: dict, positions_before: dict,
+                 last_prices_map: dict, equity_now: float, sides: list) -> dict:
+    """Explain a zero-intent day and halt before any writes."""
+    if intents:
+        return {"crumbs_decide": {"no_op": False}}
+
+    tov_note = turnover.get("turnover_note", "")
+    if isinstance(tov_note, str) and "skip" in tov_note.lower():
+        noop_reason = "TURNOVER_SKIP"
+    else:
+        # desired == current exposure within epsilon → no change; else sizing filtered tiny trades
+        try:
+            eps = 1e-4
+            desired_w = [float(alloc_capped.get(s, 0.0)) for s in sides]
+            # recompute prev_w against equity_now to avoid key/equity drift
+            prev_w_map = current_exposure_weights(positions_before, last_prices_map, equity_now, sides)
+            prev_w = [float(prev_w_map.get(s, 0.0)) for s in sides]
+            noop_reason = "NO_CHANGE" if all(abs(d - p) <= eps for d, p in zip(desired_w, prev_w)) else "SIZING_FILTER"
+        except Exception:
+            noop_reason = "NO_CHANGE"
+    RF.print_log("No trade planned (flat, blocked, or below threshold).", "SUCCESS")
+    return {"crumbs_decide": {"no_op": True, "no_op_reason": noop_reason}, "halt": "NO_INTENTS"}
+
+# ---------- IO ----------
+
+def stage_order_preview(intents_planned: List[OrderIntent], sides: list, price_info: dict, turnover: dict) -> dict:
+    """Order preview CSV (dry_run only) of the planned, pre-filter intents."""
+    broker_cfg = Config(".")._load_yaml("config/broker.yaml")
+    if not (bool((broker_cfg.get("alpaca") or {}).get("dry_run", True)) and intents_planned):
+        return {}
+    # written before the guards run, so no_op/hash are not known yet
+    preview_meta = {
+        "exec_long": sides[0],
+        "exec_short": sides[1],
+        "price_common_date": price_info.get("price_common_date", ""),
+        "turnover_note": turnover.get("turnover_note", ""),
+        "no_op": False,
+        "no_op_reason": "",
+        "config_hash16": "",
+    }
+    try:
+        p = write_order_preview([intent_to_dict(it) for it in intents_planned], meta=preview_meta)
+        RF.print_log(f"Order preview CSV saved → {p}", "INFO")
+    except Exception as e:
+        RF.print_log(f"Order preview CSV failed: {e}", "ERROR")
+    return {}
+
+def stage_audit_plan(intents: List[OrderIntent], paths: AccountPaths = LIVE_PATHS) -> dict:
+    audit = _audit(paths)
+    for it in intents:
+        audit.log(kind="PLAN", data=intent_to_dict(it))
+    return {}
+
+def stage_broker(intents: List[OrderIntent], paths: AccountPaths = LIVE_PATHS,
+                 alpaca: Optional[dict] = None, creds_env: Optional[tuple] = None,
+                 account: Optional[str] = None) -> dict:
+    """
+    alpaca overrides broker.yaml's alpaca section; creds_env=(KEY_VAR, SECRET_VAR) picks account keys;
+    account salts the client_order_ids (multi-account batches).
+    """
+    broker_cfg = Config(".")._load_yaml("config/broker.yaml") if (Config(".").root / "config/broker.yaml").exists() else {}
+    alp = {**(broker_cfg.get("alpaca") or {}), **(alpaca or {})}
+    do_broker = bool(alp.get("enabled", True))  # default on, controlled by dry_run anyway
+    dry_run_broker = bool(alp.get("dry_run", True))
+    base_url = ALPACA_PAPER_URL if (alp.get("mode", "paper") == "paper") else ALPACA_LIVE_URL
+
+    env = load_env()
+    key, secret = env.alpaca_key, env.alpaca_secret
+    if creds_env:
+        key, secret = os.getenv(creds_env[0]), os.getenv(creds_env[1])
+    exe = AlpacaExecutor(AlpacaCreds(key=key, secret=secret, base_url=base_url),
+                         dry_run=dry_run_broker, fills_file=paths.fills, account=account)
+
+    broker_results = []
+    if do_broker and intents:
+        RF.print_log(f"Broker path: mode={alp.get('mode','paper')} dry_run={dry_run_broker}", "INFO")
+        try:
+            broker_results = exe.place_orders(intents)
+        finally:
+            exe.close()
+        # Audit ORDER results (payloads if dry-run, API responses if live)
+        audit = _audit(paths)
+        for res in broker_results:
+            audit.log(kind="ORDER", data={k: v for k, v in res.items()})
+    else:
+        RF.print_log("Broker path skipped (disabled or no intents).", "INFO")
+
+    # Reconciliation (plan vs acknowledged/payload)
+    if broker_results:
+        rec = compare_intents_vs_orders(intents, broker_results)
+        RF.print_log(f"Reconcile: matches={len(rec['matches'])} mismatches={len(rec['mismatches'])} "
+                     f"unmatched_intents={len(rec['unmatched_intents'])}", "INFO")
+    return {"broker_results": broker_results}
+
+def last_bars(sides: list, long_df, short_df) -> tuple:
+    """({SYMBOL: close}, {SYMBOL: {volume, high, low}}) from each leg's last bar."""
+    return frame_bars(dict(zip(sides, (long_df, short_df))))
+
+def frame_bars(frames: Dict[str, Any]) -> tuple:
+    """last_bars over {SYMBOL: frame} (any number of legs)."""
+    prices, bars = {}, {}
+    for sym, df in frames.items():
+        row = df.iloc[-1]
+        prices[sym] = float(row["close"])
+        bars[sym] = {k: float(row[k]) for k in ("volume", "high", "low") if k in df.columns}
+    return prices, bars
+
+def stage_fills(intents: List[OrderIntent], positions_before: dict, sides: list, long_df, short_df,
+                paths: AccountPaths = LIVE_PATHS) -> dict:
+    """Simulate fills (each leg at its own last close, broker.yaml fill_model) → persist positions → FILL records."""
+    prices, bars = last_bars(sides, long_df, short_df)
+    return _fill_and_persist(intents, positions_before, prices, bars, paths)
+
+def _fill_and_persist(intents: List[OrderIntent], positions_before: dict, prices: dict, bars: dict,
+                      paths: AccountPaths) -> dict:
+    fills = simulate_fills(intents, prices=prices, bars=bars, model=FillModel.from_config())
+    positions_after = apply_simulated_fills(positions_before, fills, paths.positions)
+    save_positions(positions_after, paths.positions)
+    audit = _audit(paths)
+    for f in fills:
+        audit.log(kind="FILL", data={
+            "symbol": f.symbol, "side": f.side,
+            "qty": round(float(f.qty), 6), "price": float(f.price), "note": f.note
+        })
+    RF.print_log(f"Positions AFTER: {positions_after}", "INFO")
+    return {"positions_after": positions_after}
+
+def stage_snapshot(positions_after: dict, sides: list, long_df, short_df,
+                   paths: AccountPaths = LIVE_PATHS, equity_ref: Optional[float] = None) -> dict:
+    """Daily PnL/exposure snapshot valued at each leg's last close."""
+    last_prices = {
+        sides[0]: float(long_df["close"].iloc[-1]),
+        sides[1]: float(short_df["close"].iloc[-1]),
+    }
+    return _snapshot(positions_after, last_prices, sides, paths, equity_ref)
+
+def _snapshot(positions_after: dict, last_prices: dict, sides: list, paths: AccountPaths,
+              equity_ref: Optional[float]) -> dict:
+    if equity_ref is None:
+        try:
+            equity_ref = float(Config(".").run.get("equity", 25000.0))
+        except Exception:
+            equity_ref = 25000.0
+    snap = snapshot_from_positions(positions_after, last_prices, equity_ref, symbols=sides)
+    append_snapshot_csv(snap, paths.snapshot_csv)
+    return {"snapshot": snap}
+
+def write_run_reports(result: dict) -> None:
+    """CSV change report + run summary JSONL (both best-effort)."""
+    try:
+        csv_path = write_change_report(result)
+        RF.print_log(f"CSV change report saved → {csv_path}", "INFO")
+    except Exception as e:
+        RF.print_log(f"CSV export failed: {e}", "ERROR")
+    try:
+        path = append_run_summary(result)
+        RF.print_log(f"Run summary appended → {path}", "INFO")
+    except Exception as e:
+        RF.print_log(f"Run summary append failed: {e}", "ERROR")
+
+def stage_tsi() -> dict:
+    """Turnover Stability Index over the recent run summaries (logged, warn-only)."""
+    met_cfg = Config(".")._load_yaml("config/metrics.yaml") if (Config(".").root / "config/metrics.yaml").exists() else {}
+    tsi_cfg = (met_cfg.get("turnover_stability") or {})
+    tsi_win = int(tsi_cfg.get("window_days", 7))
+    tsi_warn = float(tsi_cfg.get("warn_threshold", 0.25))
+    tsi = compute_tsi(tsi_win)
+    tsi_warn_flag = bool(tsi["avg_turnover"] > tsi_warn)
+    if tsi_warn_flag:
+        RF.print_log(f"TSI warn: avg turnover {tsi['avg_turnover']:.2%} over {tsi_win}d exceeds {tsi_warn:.2%}", "RISK")
+    return {"tsi": {
+        "tsi_window_days": tsi_win,
+        "tsi_avg_turnover": round(tsi["avg_turnover"], 4),
+        "tsi_days_count": tsi["count_days"],
+        "tsi_warn": tsi_warn_flag,
+        "tsi_warn_threshold": tsi_warn,
+    }}
+
+# ---------- N-leg universe (config/universe.yaml, enabled: true) ----------
+# Same stage names and outputs as the pair graph, so the runner, scenarios, filters and
+# reports run unchanged; `sides` becomes every universe symbol.
+
+def universe_enabled() -> bool:
+    return bool(load_universe_config().get("enabled", False))
+
+def stage_universe_pair() -> dict:
+    """Execution pair (kept for the breadcrumbs) + the universe legs as `sides`."""
+    u = load_universe()
+    if not u.symbols:
+        raise ValueError("config/universe.yaml is enabled but lists no symbols")
+    exec_map = resolve_execution_pair(None)
+    return {"exec_map": exec_map, "sides": list(u.symbols), "universe": u}
+
+def stage_load_universe(sides: list) -> dict:
+    return {"universe_bars": {s: get_daily_bars(s) for s in sides}}
+
+def last_common_closes(frames: Dict[str, Any]) -> tuple:
+    """N-leg last_common_close: (latest date every leg has, {SYMBOL: close}); else each leg's last close."""
+    naive = {s: (df.index.tz_localize(None) if df.index.tz is not None else df.index) for s, df in frames.items()}
+    common = set.intersection(*(set(ix) for ix in naive.values()))
+    if common:
+        d = max(common)
+        return d, {s: float(df["close"].iloc[naive[s].get_loc(d)]) for s, df in frames.items()}
+    d = max(ix.max() for ix in naive.values())
+    return d, {s: float(df["close"].iloc[-1]) for s, df in frames.items()}
+
+def stage_universe_prices(universe_bars: dict) -> dict:
+    common_d, prices = last_common_closes(universe_bars)
+    return {"last_prices_map": map_keys_upper(prices), "price_info": _price_info(common_d)}
+
+def stage_universe_adv(universe_bars: dict) -> dict:
+    days = int(load_cost_config()["adv_days"])
+    return {"adv": {s: adv_shares(df, days) for s, df in universe_bars.items()}}
+
+def stage_universe_target(alloc_raw: dict, universe: Universe, last_prices_map: dict, equity: float) -> dict:
+    """Allocator sleeves + static weights over the universe, capped; the largest leg is the primary target."""
+    w, cap_note = cap_weights(universe, target_weights(universe, alloc_raw))
+    alloc = universe.to_dict(w)
+    weights = " ".join(f"{s}={v:.2f}" for s, v in alloc.items())
+    RF.print_log(f"Allocation (universe) → {weights}" + ("" if cap_note == "OK" else f" | {cap_note}"), "INFO")
+
+    i = int(np.argmax(w))
+    symbol = universe.symbols[i]
+    dollars = float(equity * w[i]) if w[i] > 0 else 0.0
+    price = float(last_prices_map.get(symbol, 0.0))
+    target = TargetExposure(
+        symbol=symbol,
+        direction="LONG" if dollars > 0 else "FLAT",
+        dollars=dollars,
+        shares=dollars / price if price > 0 else 0.0,
+        notes=f"Universe allocator: {weights}",
+    )
+    RF.print_log(f"Target → {target.symbol} | {target.direction} | ${target.dollars:,.2f} "
+                 f"(+{int((w > 0).sum()) - (1 if dollars > 0 else 0)} other legs)", "INFO")
+    return {"alloc": alloc, "target": target, "target_price": price}
+
+def stage_universe_turnover(alloc: dict, positions_before: dict, last_prices_map: dict, universe: Universe,
+                            equity: float, adv: dict) -> dict:
+    """risk.turnover cap over every leg (turnover.enforce_turnover_cap's rule)."""
+    tov = (_risk_cfg().get("turnover") or {})
+    w_now = current_weights(universe.vector(positions_before), universe.vector(last_prices_map), equity)
+    w, frac, note = turnover_cap(universe.vector(alloc), w_now, float(tov.get("max_pct_of_equity", 0.15)),
+                                 str(tov.get("mode", "clamp")))
+    if note != "OK" and not note.startswith("cap=0"):
+        RF.print_log(f"Turnover cap applied: {note}", "RISK")
+    alloc_after = universe.to_dict(w)
+    return {"alloc_capped": alloc_after,
+            "turnover": _turnover_result(frac, note, list(universe.symbols), alloc_after, positions_before,
+                                         last_prices_map, equity, adv)}
+
+def stage_universe_plan(positions_before: dict, universe: Universe, alloc_capped: dict, last_prices_map: dict,
+                        equity: float, minutes_to_close: int, min_trade_value: float) -> dict:
+    """
+    Intents for every leg whose (turnover-capped) weight differs from the book, sells first.
+    Dust closes and small opens follow risk.coalescing; quantities follow broker.yaml constraints.
+    Positions outside the universe are left alone.
+    """
+    cfg = Config(".")
+    broker_cfg = cfg._load_yaml("config/broker.yaml") if cfg.has("config/broker.yaml") else {}
+    coal = (_risk_cfg().get("coalescing") or {})
+    intents = plan_rebalance(
+        universe, positions_before, universe.vector(alloc_capped), universe.vector(last_prices_map),
+        equity, minutes_to_close, load_constraints(broker_cfg), min_trade_value=min_trade_value,
+        close_dust_shares=float(coal.get("close_dust_shares", 1.0)),
+        min_open_notional=float(coal.get("min_open_notional", 200.0)),
+    )
+    return {"intents_planned": intents}
+
+def stage_universe_coalesce(intents_delta: List[OrderIntent]) -> dict:
+    """The universe plan already orders sells before buys and drops dust legs."""
+    return {"intents": list(intents_delta),
+            "crumbs_coalesce": {"coalesced_flip": False, "coalesce_note": "universe plan (sells first)"}}
+
+def stage_universe_fills(intents: List[OrderIntent], positions_before: dict, universe_bars: dict,
+                         paths: AccountPaths = LIVE_PATHS) -> dict:
+    prices, bars = frame_bars(universe_bars)
+    return _fill_and_persist(intents, positions_before, prices, bars, paths)
+
+def stage_universe_snapshot(positions_after: dict, sides: list, universe_bars: dict,
+                            paths: AccountPaths = LIVE_PATHS, equity_ref: Optional[float] = None) -> dict:
+    prices, _ = frame_bars(universe_bars)
+    return _snapshot(positions_after, prices, sides, paths, equity_ref)
+
+def _universe_decision(stages: List[Stage]) -> List[Stage]:
+    swap = {
+        "exec_pair": Stage("exec_pair", stage_universe_pair, outputs=("exec_map", "sides", "universe"),
+                           after=("gate",)),
+        "load_long": Stage("load_universe", stage_load_universe, inputs=("sides",), outputs=("universe_bars",)),
+        "prices": Stage("prices", stage_universe_prices, inputs=("universe_bars",),
+                        outputs=("last_prices_map", "price_info")),
+        "adv": Stage("adv", stage_universe_adv, inputs=("universe_bars",), outputs=("adv",)),
+        "target": Stage("target", stage_universe_target,
+                        inputs=("alloc_raw", "universe", "last_prices_map", "equity"),
+                        outputs=("alloc", "target", "target_price")),
+        "turnover": Stage("turnover", stage_universe_turnover,
+                          inputs=("alloc", "positions_before", "last_prices_map", "universe", "equity", "adv"),
+                          outputs=("alloc_capped", "turnover")),
+        "planning": Stage("planning", stage_universe_plan,
+                          inputs=("positions_before", "universe", "alloc_capped", "last_prices_map", "equity",
+                                  "minutes_to_close", "min_trade_value"),
+                          outputs=("intents_planned",)),
+        "coalesce": Stage("coalesce", stage_universe_coalesce, inputs=("intents_delta",),
+                          outputs=("intents", "crumbs_coalesce")),
+    }
+    drop = {"load_short", "common_close"}
+    return [swap.get(s.name, s) for s in stages if s.name not in drop]
+
+# ---------- graphs ----------
+
+def decision_stages(universe: Optional[bool] = None) -> List[Stage]:
+    """
+    Everything up to the intent list: gate, market data, signals, allocation,
+    account reconcile, turnover, plan, filters. Writes only the CFG audit record,
+    the decision ping and the order preview CSV.
+    Seeds: equity, vix, minutes_to_close, min_trade_value, t0, days_since, positions_raw.
+    universe=None → config/universe.yaml `enabled` (N-leg target/turnover/plan instead of the pair).
+    """
+    stages = [
+        Stage("fingerprint", stage_fingerprint, outputs=("fp", "config_changed")),
+        Stage("gate", stage_gate, inputs=("minutes_to_close",), outputs=("gate",)),
+        Stage("decision_ping", stage_decision_ping, inputs=("minutes_to_close",), after=("gate",)),
+        Stage("calendar", stage_calendar, outputs=("calendar",), after=("gate",)),
+        Stage("exec_pair", stage_exec_pair, outputs=("exec_map", "sides"), after=("gate",)),
+        Stage("load_long", stage_load_long, inputs=("exec_map",), outputs=("long_df",)),
+        Stage("load_short", stage_load_short, inputs=("exec_map",), outputs=("short_df",)),
+        Stage("load_signal", stage_load_signal, outputs=("sig_sym", "sig_df"), after=("gate",)),
+        Stage("phase", stage_phase, inputs=("sig_df",), outputs=("phase",), pure=True),
+        Stage("allocator", stage_allocator, inputs=("sig_df",), outputs=("alloc_raw", "guard_note"), pure=True),
+        Stage("diagnostics", stage_diagnostics, inputs=("sig_df", "phase", "guard_note"),
+              outputs=("plan_reason",), pure=True),
+        Stage("target", stage_target, inputs=("alloc_raw", "sides", "long_df", "short_df", "equity"),
+              outputs=("alloc", "target", "target_price")),
+        Stage("reconcile", stage_reconcile, inputs=("positions_raw",),
+              outputs=("positions_before", "positions_source"), after=("gate",)),
+        Stage("common_close", stage_common_close, inputs=("long_df", "short_df"), outputs=("common_close",), pure=True),
+        Stage("prices", stage_prices, inputs=("common_close", "sides"), outputs=("last_prices_map", "price_info")),
+        Stage("adv", stage_adv, inputs=("long_df", "short_df", "sides"), outputs=("adv",)),
+        Stage("exposure", stage_exposure,
+              inputs=("positions_before", "positions_source", "last_prices_map", "alloc", "sides", "equity"),
+              outputs=("equity_now", "prev_w", "delta_w")),
+        Stage("turnover", stage_turnover,
+              inputs=("alloc", "positions_before", "last_prices_map", "sides", "equity", "adv"),
+              outputs=("alloc_capped", "turnover")),
+        Stage("exposure_crumbs", stage_exposure_crumbs,
+              inputs=("sides", "prev_w", "alloc_capped", "delta_w", "turnover", "positions_source",
+                      "equity_now", "price_info", "t0"),
+              outputs=("crumbs_exposure",)),
+        Stage("planning", stage_plan,
+              inputs=("positions_before", "target", "target_price", "minutes_to_close", "min_trade_value"),
+              outputs=("intents_planned",)),
+        Stage("order_preview", stage_order_preview, inputs=("intents_planned", "sides", "price_info", "turnover")),
+        Stage("cadence", stage_cadence, inputs=("intents_planned", "days_since"),
+              outputs=("intents_cadence", "crumbs_cadence")),
+        Stage("delta_filter", stage_delta_filter,
+              inputs=("intents_cadence", "crumbs_exposure", "positions_before", "last_prices_map", "adv"),
+              outputs=("intents_delta", "crumbs_delta")),
+        Stage("coalesce", stage_coalesce,
+              inputs=("intents_delta", "positions_before", "alloc_capped", "last_prices_map", "equity_now", "sides"),
+              outputs=("intents", "crumbs_coalesce")),
+        Stage("decide", stage_decide,
+              inputs=("intents", "turnover", "alloc_capped", "positions_before", "last_prices_map",
+                      "equity_now", "sides"),
+              # halting here ends the run: everything build_crumbs reads must be in ctx first
+              outputs=("crumbs_decide",), after=("order_preview", "fingerprint", "calendar", "phase", "diagnostics")),
+    ]
+    if universe is None:
+        universe = universe_enabled()
+    return _universe_decision(stages) if universe else stages
+
+# market stages depend only on bars + config; planning stages on equity/positions/minutes
+MARKET_STAGES = ("exec_pair", "load_long", "load_short", "load_universe", "load_signal", "phase", "allocator",
+                 "diagnostics", "common_close", "prices", "adv")
+PLANNING_STAGES = ("target", "exposure", "turnover", "exposure_crumbs", "planning",
+                   "cadence", "delta_filter", "coalesce", "decide")
+
+def subgraph(stages: List[Stage], names: tuple) -> List[Stage]:
+    """Stages named in `names` (declaration order); ordering-only deps outside the subset are dropped."""
+    keep = [s for s in stages if s.name in names]
+    return [replace(s, after=tuple(a for a in s.after if a in names)) for s in keep]
+
+def execution_stages(universe: Optional[bool] = None) -> List[Stage]:
+    """Broker + persistence, strictly sequential (ledger order PLAN → ORDER → FILL)."""
+    if universe is None:
+        universe = universe_enabled()
+    if universe:
+        fills = Stage("fills", stage_universe_fills, inputs=("intents", "positions_before", "universe_bars"),
+                      outputs=("positions_after",), after=("broker",))
+        snapshot = Stage("snapshot", stage_universe_snapshot, inputs=("positions_after", "sides", "universe_bars"),
+                         outputs=("snapshot",))
+    else:
+        fills = Stage("fills", stage_fills, inputs=("intents", "positions_before", "sides", "long_df", "short_df"),
+                      outputs=("positions_after",), after=("broker",))
+        snapshot = Stage("snapshot", stage_snapshot, inputs=("positions_after", "sides", "long_df", "short_df"),
+                         outputs=("snapshot",))
+    return [
+        Stage("audit_plan", stage_audit_plan, inputs=("intents",)),
+        Stage("broker", stage_broker, inputs=("intents",), outputs=("broker_results",), after=("audit_plan",)),
+        fills,
+        snapshot,
+    ]
+
+def build_crumbs(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """Breadcrumbs in the order the daily cycle has always produced them."""
+    crumbs: Dict[str, Any] = {
+        "vix": ctx["vix"],
+        "fomc_blackout": ctx["calendar"]["fomc_blackout"],
+        "opex": ctx["calendar"]["opex"],
+        "target_notes": ctx["target"].notes,
+        "signal_underlier": ctx["sig_sym"],
+        "phase": ctx["phase"],
+        "plan_reason": ctx["plan_reason"],
+    }
+    for key in ("crumbs_exposure", "crumbs_cadence", "crumbs_delta", "crumbs_coalesce", "crumbs_decide"):
+        crumbs.update(ctx.get(key) or {})
+    return crumbs
+
+def build_result(ctx: Dict[str, Any], stage_timings: dict) -> Dict[str, Any]:
+    fp = ctx["fp"]
+    result = {
+        "target": asdict(ctx["target"]),
+        "positions_before": ctx["positions_before"],
+        "intents": [intent_to_dict(it) for it in ctx.get("intents") or []],
+        "positions_after": ctx.get("positions_after", ctx["positions_before"]),
+        "breadcrumbs": {**build_crumbs(ctx), "config_hash16": fp["sha256_16"],
+                        "config_changed": ctx.get("config_changed", []), "stage_timings": stage_timings},
+    }
+    if "snapshot" in ctx:
+        result["snapshot"] = ctx["snapshot"]
+    result["config_fingerprint"] = fp
+    return result
+
+def build_early_exit(ctx: Dict[str, Any], stage_timings: dict) -> Dict[str, Any]:
+    """Result for a run stopped by the gate (kill switch / EOD guard)."""
+    gate = ctx["gate"]
+    fp = ctx["fp"]
+    return {
+        "target": {"symbol": "NA", "direction": "FLAT", "dollars": 0.0, "shares": 0.0, "notes": gate["notes"]},
+        "positions_before": load_positions(),
+        "intents": [],
+        "positions_after": load_positions(),
+        "breadcrumbs": {
+            "no_op": True,
+            "no_op_reason": gate["no_op_reason"],
+            **gate["crumbs"],
+            "config_hash16": fp["sha256_16"],
+            "config_changed": ctx.get("config_changed", []),
+            "run_duration_sec": round(time.perf_counter() - ctx["t0"], 3),
+            "versions": runtime_versions(),
+            "stage_timings": stage_timings,
+        },
+        "snapshot": {},
+        "config_fingerprint": fp,
+    }
@@ -2,16 +2,25 @@ from __future__ import annotations
 from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime, timezone
+import hashlib
+import json
+import os
+import threading
 import pandas as pd
 
 from .config import Config
 from .identity import RegimeFlexIdentity as RF
 from .env import load_env
-from .data_providers import fetch_polygon_daily, fetch_alpaca_daily
+from .statcache import StatCache
+from .barstore import PartitionedStore
 
 CACHE_DIR = Path("data/cache")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+STORE_DEFAULTS = {
+    "enabled": True,     # mirror cache writes into the store and serve windowed reads from it
+}
+
 @dataclass(frozen=True)
 class DailyBar:
     date: pd.Timestamp
@@ -24,23 +33,180 @@ class DailyBar:
 class DataError(Exception): ...
 class ValidationError(DataError): ...
 
+def _cache_key(symbol: str) -> str:
+    return symbol.upper().replace("/", "_")
+
 def _cache_path(symbol: str) -> Path:
-    safe = symbol.upper().replace("/", "_")
-    return CACHE_DIR / f"{safe}.csv"
+    return CACHE_DIR / f"{_cache_key(symbol)}.csv"
+
+MANIFEST_NAME = "_manifest.json"
+STORE_NAME = "_store"     # columnar mirror: <CACHE_DIR>/_store/<SYMBOL>/<YYYY>.npz
+_manifest_lock = threading.Lock()
+
+def _manifest_path() -> Path:
+    return CACHE_DIR / MANIFEST_NAME
+
+def daily_store() -> PartitionedStore:
+    """
+    Columnar mirror of the CSV cache, one npz per symbol-year (engine/barstore.py).
+    The CSV stays canonical; the store is only read when its tag matches the manifest sha.
+    """
+    return PartitionedStore(CACHE_DIR / STORE_NAME, freq="Y")
+
+def read_manifest() -> dict:
+    """symbol → {first_date, last_date, rows, sha256, provider, fetched_at, size, mtime_ns}; {} if absent/corrupt."""
+    path = _manifest_path()
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")) or {}
+    except (OSError, ValueError):
+        return {}
+
+def _write_manifest(manifest: dict) -> None:
+    path = _manifest_path()
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _update_manifest(symbol: str, entry: dict) -> None:
+    with _manifest_lock:
+        manifest = read_manifest()
+        manifest[_cache_key(symbol)] = entry
+        _write_manifest(manifest)
 
-def save_to_cache(symbol: str, df: pd.DataFrame) -> None:
-    """Expect columns: [open,high,low,close,volume]; index = date (UTC-normalized)."""
+def _meta_entry(df: pd.DataFrame, path: Path, sha: str, provider: str, fetched_at: str) -> dict:
+    st = path.stat()
+    return {
+        "first_date": df.index[0].date().isoformat() if len(df) else None,
+        "last_date": df.index[-1].date().isoformat() if len(df) else None,
+        "rows": int(len(df)),
+        "sha256": sha,
+        "provider": provider,
+        "fetched_at": fetched_at,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+def cache_meta(symbol: str) -> dict | None:
+    """
+    Manifest entry for a cached symbol, or None if there is no cache file or the file
+    changed behind the manifest's back (size/mtime mismatch) — callers then fall back to the CSV.
+    """
+    path = _cache_path(symbol)
+    entry = read_manifest().get(_cache_key(symbol))
+    if entry is None or not path.exists():
+        return None
+    st = path.stat()
+    if st.st_size != entry.get("size") or st.st_mtime_ns != entry.get("mtime_ns"):
+        return None
+    return entry
+
+def save_to_cache(symbol: str, df: pd.DataFrame, provider: str = "cache") -> bool:
+    """
+    Expect columns: [open,high,low,close,volume]; index = date (UTC-normalized).
+    Returns False (and leaves the file untouched) when the content is identical to the cached copy.
+    """
     path = _cache_path(symbol)
-    df.to_csv(path, index_label="date")
+    text = df.to_csv(index_label="date")
+    data = text.encode("utf-8")
+    sha = hashlib.sha256(data).hexdigest()
+    fetched_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    prev = cache_meta(symbol)
+    if prev is not None and prev.get("sha256") == sha:
+        _update_manifest(symbol, {**prev, "provider": provider, "fetched_at": fetched_at})
+        return False
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)        # readers never see a half-written CSV
+    _update_manifest(symbol, _meta_entry(df, path, sha, provider, fetched_at))
+    if load_store_config()["enabled"]:
+        _sync_store(symbol, path, sha)
+    return True
+
+def rebuild_manifest() -> dict:
+    """Recreate the manifest from the CSVs on disk (e.g. caches written before it existed)."""
+    manifest = {}
+    for path in sorted(CACHE_DIR.glob("*.csv")):
+        data = path.read_bytes()
+        df = pd.read_csv(path, parse_dates=["date"]).set_index("date").sort_index()
+        manifest[path.stem] = _meta_entry(df, path, hashlib.sha256(data).hexdigest(), "unknown", None)
+    with _manifest_lock:
+        _write_manifest(manifest)
+    return manifest
+
+def _read_cache_csv(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, parse_dates=["date"])
+    return df.set_index("date").sort_index()
+
+# parsed bars per cache file; a rewrite (new size/mtime) triggers a fresh parse
+FRAME_CACHE = StatCache(_read_cache_csv, copier=lambda df: df.copy())
 
 def load_from_cache(symbol: str) -> pd.DataFrame | None:
     path = _cache_path(symbol)
     if not path.exists():
         return None
-    df = pd.read_csv(path, parse_dates=["date"])
-    df = df.set_index("date").sort_index()
+    return FRAME_CACHE.get(path)
+
+# ----- Windowed reads (columnar store) -----
+
+def load_store_config() -> dict:
+    data = Config(".")._load_yaml("config/data.yaml") if (Config(".").root / "config/data.yaml").exists() else {}
+    return {**STORE_DEFAULTS, **(data.get("store") or {})}
+
+def _sync_store(symbol: str, path: Path, sha: str) -> pd.DataFrame:
+    """Rewrite the symbol's partitions from the CSV as parsed (so both paths return identical frames)."""
+    df = FRAME_CACHE.get(path)
+    daily_store().write(symbol, df, replace=True, tag=sha)
     return df
 
+def _window(df: pd.DataFrame, start, end, columns, tail) -> pd.DataFrame:
+    idx = df.index
+    if start is not None:
+        df = df[idx >= _bound(start, idx)]
+    if end is not None:
+        df = df[df.index <= _bound(end, idx)]
+    if columns is not None:
+        df = df[list(columns)]
+    return df.iloc[-tail:] if tail is not None else df
+
+def _bound(ts, idx: pd.DatetimeIndex) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    if idx.tz is not None and ts.tz is None:
+        return ts.tz_localize(idx.tz)
+    if idx.tz is None and ts.tz is not None:
+        return ts.tz_convert("UTC").tz_localize(None)
+    return ts
+
+def load_window(symbol: str, start=None, end=None, columns=None, tail: int | None = None) -> pd.DataFrame | None:
+    """
+    Cached bars restricted to [start, end] (inclusive), optionally to `columns` and/or the last
+    `tail` rows. Served from the partitioned store when it mirrors the current CSV (only the
+    overlapping years and requested columns are read); otherwise from the CSV, rebuilding
+    the store on the way. None if the symbol has no cache.
+    """
+    path = _cache_path(symbol)
+    if not path.exists():
+        return None
+    meta = cache_meta(symbol)
+    if not load_store_config()["enabled"] or meta is None:
+        return _window(load_from_cache(symbol), start, end, columns, tail)
+    store = daily_store()
+    if store.meta(symbol).get("tag") != meta["sha256"]:
+        return _window(_sync_store(symbol, path, meta["sha256"]), start, end, columns, tail)
+    if tail is not None and start is None and end is None:
+        return store.tail(symbol, tail, columns)
+    return _window(store.read(symbol, start, end, columns), None, None, None, tail)
+
+def rebuild_store() -> dict:
+    """Mirror every cached CSV into the store (e.g. caches written before it existed). symbol → rows."""
+    out = {}
+    for path in sorted(CACHE_DIR.glob("*.csv")):
+        meta = cache_meta(path.stem)
+        sha = meta["sha256"] if meta else hashlib.sha256(path.read_bytes()).hexdigest()
+        out[path.stem] = int(len(_sync_store(path.stem, path, sha)))
+    return out
+
 # ----- Validation hooks (extend later) -----
 
 def validate_non_empty(df: pd.DataFrame, symbol: str):
@@ -95,9 +261,21 @@ def get_daily_bars(symbol: str) -> pd.DataFrame:
     if df is None:
         raise DataError(f"No cached data for {symbol}. Add a provider or seed the cache.")
 
+    df = _with_intraday(symbol, df)
     run_validations(df, symbol)
     return df
 
+def _with_intraday(symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+    """data.yaml intraday.synthetic_today: decide on today's near-close price, not yesterday's close."""
+    from .intraday import load_intraday_config, synthetic_today_bar, with_synthetic_bar
+    icfg = load_intraday_config()
+    if not icfg["synthetic_today"]:
+        return df
+    bar = synthetic_today_bar(symbol, timeframe=str(icfg["timeframe"]))
+    if bar is not None:
+        RF.print_log(f"{symbol}: synthetic session bar {bar.index[0].date()} close={bar['close'].iloc[0]:.2f}", "INFO")
+    return with_synthetic_bar(df, bar)
+
 # Utility to seed cache with a dataframe (for tests/mock runs)
 def seed_cache(symbol: str, df: pd.DataFrame) -> None:
     """Normalize index to UTC date and save."""
@@ -106,7 +284,16 @@ def seed_cache(symbol: str, df: pd.DataFrame) -> None:
         df.index = pd.to_datetime(df.index).tz_localize("UTC").normalize()
     else:
         df.index = pd.to_datetime(df.index).tz_convert("UTC").normalize()
-    save_to_cache(symbol, df)
+    save_to_cache(symbol, df, provider="seed")
+
+def last_bar_final(meta: dict) -> bool:
+    """Whether the manifest's last bar was fetched after that session's close (16:00 New York)."""
+    from .intraday import SESSION_TZ, SESSION_CLOSE
+    last, fetched = meta.get("last_date"), meta.get("fetched_at")
+    if not last or not fetched:
+        return False
+    close = datetime.combine(datetime.fromisoformat(last).date(), SESSION_CLOSE, tzinfo=SESSION_TZ)
+    return datetime.fromisoformat(fetched.replace("Z", "+00:00")) >= close
 
 def get_daily_bars_with_provider(symbol: str, force_refresh: bool = False) -> pd.DataFrame:
     cfg = Config(".").run  # not needed; just to ensure config loads? we need data.yaml
@@ -122,6 +309,18 @@ def get_daily_bars_with_provider(symbol: str, force_refresh: bool = False) -> pd
         run_validations(df_cached, symbol)
         return df_cached
 
+    # Cache already holds today's final bar → nothing newer to fetch (a bar cached during the
+    # session is partial and is refetched)
+    meta = cache_meta(symbol)
+    today = datetime.now(timezone.utc).date().isoformat()
+    if (df_cached is not None and not force_refresh and meta and (meta.get("last_date") or "") >= today
+            and last_bar_final(meta)):
+        RF.print_log(f"{symbol}: cache current through {meta['last_date']}; skipping provider fetch", "INFO")
+        run_validations(df_cached, symbol)
+        return df_cached
+
+    # providers (and their HTTP stack) are only loaded when a live fetch is needed
+    from .data_providers import fetch_polygon_daily, fetch_alpaca_daily
     live_df = None
     if provider == "polygon":
         poly = data_cfg.get("polygon", {}) or {}
@@ -134,8 +333,10 @@ def get_daily_bars_with_provider(symbol: str, force_refresh: bool = False) -> pd
         # normalize + validate + write cache
         live_df = live_df.copy()
         live_df.index = pd.to_datetime(live_df.index).tz_convert("UTC").normalize()
-        save_to_cache(symbol, live_df)
-        RF.print_log(f"Cached {symbol}: {len(live_df)} rows", "SUCCESS")
+        if save_to_cache(symbol, live_df, provider=provider):
+            RF.print_log(f"Cached {symbol}: {len(live_df)} rows", "SUCCESS")
+        else:
+            RF.print_log(f"{symbol}: provider data unchanged; cache kept", "INFO")
         run_validations(live_df, symbol)
         return live_df
 
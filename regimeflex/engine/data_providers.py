@@ -2,10 +2,12 @@ from __future__ import annotations
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 import os
-import requests
 import pandas as pd
 
 from .identity import RegimeFlexIdentity as RF
+from .lazy import lazy_module
+
+requests = lazy_module("requests")   # only needed when a provider is actually called
 
 def _iso_days_ago(days: int) -> str:
     return (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
@@ -81,3 +83,39 @@ def fetch_alpaca_daily(symbol: str, days: int, base_url: str, key: Optional[str]
         "volume":df[col("v","volume")].astype(int),
     }, index=df["date"]).sort_index()
     return out
+
+def fetch_alpaca_intraday(symbol: str, timeframe: str, days: int, base_url: str,
+                          key: Optional[str], secret: Optional[str]) -> Optional[pd.DataFrame]:
+    """Minute/5-minute bars (timestamp index, UTC) over the last `days`, following page tokens."""
+    if not (key and secret):
+        RF.print_log("Alpaca creds missing — dry-run, returning None", "RISK")
+        return None
+    start, end = _iso_days_ago(days), _iso_today()
+    url = base_url.format(symbol=symbol, timeframe=timeframe, **{"from": start, "to": end})
+    headers = {"APCA-API-KEY-ID": key, "APCA-API-SECRET-KEY": secret}
+    RF.print_log(f"Alpaca GET {symbol} {timeframe} {start}→{end}", "INFO")
+    bars, token = [], None
+    try:
+        while True:
+            r = requests.get(url, headers=headers, params={"page_token": token} if token else None, timeout=30)
+            r.raise_for_status()
+            j = r.json()
+            bars += (j.get("bars") or [])
+            token = j.get("next_page_token")
+            if not token:
+                break
+    except Exception as e:
+        RF.print_log(f"Alpaca API error: {e}", "RISK")
+        return None
+    if not bars:
+        RF.print_log(f"Alpaca: no intraday results for {symbol}", "RISK")
+        return None
+    df = pd.DataFrame(bars)
+    idx = pd.to_datetime(df["t"], utc=True)
+    return pd.DataFrame({
+        "open": df["o"].astype(float).to_numpy(),
+        "high": df["h"].astype(float).to_numpy(),
+        "low": df["l"].astype(float).to_numpy(),
+        "close": df["c"].astype(float).to_numpy(),
+        "volume": df["v"].astype(float).to_numpy(),
+    }, index=pd.DatetimeIndex(idx, name="ts")).sort_index()
@@ -1,11 +1,19 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, Any, List, Optional
-import requests
+import threading
+import time
 
+from .config import Config
 from .exec_planner import OrderIntent
 from .identity import RegimeFlexIdentity as RF
-from .fills_state import append_fill_record
+from .fills_state import append_fill_record, journaled_broker_ids
+from .storage import short_hash, block_height
+from .lazy import lazy_module
+
+requests = lazy_module("requests")   # imported on the first live submission
 
 ALPACA_PAPER_URL = "https://paper-api.alpaca.markets"
 ALPACA_LIVE_URL  = "https://api.alpaca.markets"
@@ -34,13 +42,115 @@ def _alpaca_payload(intent: OrderIntent) -> Dict[str, Any]:
         payload["time_in_force"] = "cls"
     return payload
 
+SUBMISSION_DEFAULTS = {
+    "max_concurrency": 4,       # legs in flight at once
+    "sells_first": True,        # free buying power before buys go out
+    "connect_timeout_sec": 3.05,
+    "read_timeout_sec": 10.0,
+    "max_retries": 3,           # transient errors only (timeouts, connection, 429, 5xx)
+    "backoff_sec": 0.25,        # doubles per attempt
+}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+def load_submission_config() -> Dict[str, Any]:
+    cfg = Config(".")
+    broker = cfg._load_yaml("config/broker.yaml") if (cfg.root / "config/broker.yaml").exists() else {}
+    return {**SUBMISSION_DEFAULTS, **(broker.get("submission") or {})}
+
+def plan_client_order_ids(payloads: List[Dict[str, Any]], block: Optional[str] = None,
+                          account: Optional[str] = None) -> List[str]:
+    """
+    Deterministic client_order_ids: same plan on the same trading day → same ids,
+    so a retried or re-triggered submission is rejected as a duplicate instead of doubling up.
+    `account` salts the hash so two accounts submitting the same plan get distinct ids.
+    """
+    key = {"block": block or block_height(), "orders": payloads}
+    if account:
+        key["account"] = str(account)
+    plan_hash = short_hash(key)
+    return [f"rf-{plan_hash}-{i}-{p['symbol']}-{p['side']}".lower() for i, p in enumerate(payloads)]
+
 class AlpacaExecutor:
-    def __init__(self, creds: AlpacaCreds, dry_run: bool = True):
+    def __init__(self, creds: AlpacaCreds, dry_run: bool = True, submission: Optional[Dict[str, Any]] = None,
+                 fills_file: Optional[Path] = None, account: Optional[str] = None):
         self.creds = creds
+        self.account = account         # multi-account batches: salts the client_order_ids
         self.dry_run = dry_run
+        self.fills_file = fills_file   # None → logs/trading/fills_state.jsonl
+        self.submission = {**SUBMISSION_DEFAULTS, **(submission if submission is not None else load_submission_config())}
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
 
     def build_payloads(self, intents: List[OrderIntent]) -> List[Dict[str, Any]]:
-        return [_alpaca_payload(it) for it in intents]
+        payloads = [_alpaca_payload(it) for it in intents]
+        for p, coid in zip(payloads, plan_client_order_ids(payloads, account=self.account)):
+            p["client_order_id"] = coid
+        return payloads
+
+    def session(self) -> requests.Session:
+        """Keep-alive session; pool sized to the submission concurrency."""
+        with self._session_lock:
+            if self._session is None:
+                n = max(1, int(self.submission["max_concurrency"]))
+                s = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=n, max_retries=0)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.headers.update(self._headers())
+                self._session = s
+            return self._session
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def _lookup_by_client_id(self, coid: str) -> Optional[Dict[str, Any]]:
+        url = self.creds.base_url.rstrip("/") + "/v2/orders:by_client_order_id"
+        timeout = (float(self.submission["connect_timeout_sec"]), float(self.submission["read_timeout_sec"]))
+        try:
+            r = self.session().get(url, params={"client_order_id": coid}, timeout=timeout)
+            return r.json() if r.status_code < 300 else None
+        except Exception:
+            return None
+
+    def _submit_one(self, url: str, p: Dict[str, Any]) -> Dict[str, Any]:
+        """POST with retry on transient failures; the fixed client_order_id makes retries safe."""
+        sub = self.submission
+        timeout = (float(sub["connect_timeout_sec"]), float(sub["read_timeout_sec"]))
+        attempts = 1 + max(0, int(sub["max_retries"]))
+        coid = p.get("client_order_id")
+        t0 = time.perf_counter()
+        last_err: Dict[str, Any] = {}
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(float(sub["backoff_sec"]) * (2 ** (attempt - 1)))
+            try:
+                r = self.session().post(url, json=p, timeout=timeout)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                # the order may have landed: ask before resending
+                existing = self._lookup_by_client_id(coid) if coid else None
+                if existing:
+                    return {**existing, "_latency_ms": round((time.perf_counter() - t0) * 1000, 1), "_attempts": attempt + 1}
+                last_err = {"error": str(e), "request": p}
+                continue
+            except Exception as e:
+                return {"error": str(e), "request": p}
+
+            if r.status_code < 300:
+                return {**r.json(), "_latency_ms": round((time.perf_counter() - t0) * 1000, 1), "_attempts": attempt + 1}
+            if r.status_code == 422 and coid:
+                # duplicate client_order_id → already accepted by an earlier attempt/run
+                existing = self._lookup_by_client_id(coid)
+                if existing:
+                    RF.print_log(f"[LIVE] {coid} already submitted → reusing order id={existing.get('id','?')}", "INFO")
+                    return {**existing, "_latency_ms": round((time.perf_counter() - t0) * 1000, 1), "_attempts": attempt + 1}
+            last_err = {"error": r.text, "status": r.status_code, "request": p}
+            if r.status_code not in RETRY_STATUS:
+                break
+        return last_err
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -52,7 +162,8 @@ class AlpacaExecutor:
     def place_orders(self, intents: List[OrderIntent]) -> List[Dict[str, Any]]:
         """
         If dry_run: just format and print payloads.
-        Else: POST to /v2/orders for each intent. Returns list of results (payload or API response).
+        Else: POST to /v2/orders over the pooled session, legs in parallel (sells wave first
+        by default). Returns results in intent order (payload, API response, or error dict).
         """
         payloads = self.build_payloads(intents)
 
@@ -66,7 +177,8 @@ class AlpacaExecutor:
                     qty=p.get("qty", 0.0),
                     status="sim_accepted",
                     filled_qty=None,
-                    broker_id=None
+                    broker_id=None,
+                    path=self.fills_file,
                 )
             return payloads
 
@@ -75,34 +187,50 @@ class AlpacaExecutor:
             RF.print_log("Alpaca creds missing — refusing to place orders.", "ERROR")
             return []
 
-        results: List[Dict[str, Any]] = []
         url = self.creds.base_url.rstrip("/") + "/v2/orders"
-        headers = self._headers()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        idx = list(range(len(payloads)))
+        if bool(self.submission["sells_first"]):
+            waves = [[i for i in idx if payloads[i]["side"] == "sell"], [i for i in idx if payloads[i]["side"] != "sell"]]
+        else:
+            waves = [idx]
 
-        for p in payloads:
-            try:
-                RF.print_log(f"[LIVE] POST {url} → {p}", "INFO")
-                r = requests.post(url, json=p, headers=headers, timeout=30)
-                if r.status_code >= 300:
-                    RF.print_log(f"Alpaca order error {r.status_code}: {r.text}", "ERROR")
-                    results.append({"error": r.text, "status": r.status_code, "request": p})
-                else:
-                    resp = r.json()
-                    results.append(resp)
-                    RF.print_log(f"[LIVE] Accepted order id={resp.get('id','?')} status={resp.get('status','?')}", "SUCCESS")
-                    
-                    # Record live fill
-                    status = str(resp.get("status") or resp.get("response","")).lower()
-                    filled = resp.get("filled_qty") or resp.get("filled_qty_amount") or resp.get("request",{}).get("qty_filled")
-                    append_fill_record(
-                        symbol=p.get("symbol", ""),
-                        side=p.get("side", ""),
-                        qty=p.get("qty", 0.0),
-                        status=status,
-                        filled_qty=filled,
-                        broker_id=resp.get("id")
-                    )
-            except Exception as e:
-                RF.print_log(f"Alpaca POST failed: {e}", "ERROR")
-                results.append({"error": str(e), "request": p})
+        workers = max(1, int(self.submission["max_concurrency"]))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rf-alpaca") as pool:
+            for wave in waves:
+                if not wave:
+                    continue
+                for i in wave:
+                    RF.print_log(f"[LIVE] POST {url} → {payloads[i]}", "INFO")
+                futs = {i: pool.submit(self._submit_one, url, payloads[i]) for i in wave}
+                for i, fut in futs.items():
+                    results[i] = fut.result()
+
+        # log + fills journal on this thread, in plan order; an order resolved by client_order_id
+        # (422 / timeout on a retry or re-trigger) is journaled once, under its first submission
+        seen = journaled_broker_ids(self.fills_file)
+        for p, resp in zip(payloads, results):
+            if "error" in resp:
+                RF.print_log(f"Alpaca order error {resp.get('status', '')}: {resp['error']}", "ERROR")
+                continue
+            RF.print_log(f"[LIVE] Accepted order id={resp.get('id','?')} status={resp.get('status','?')} "
+                         f"({resp.pop('_latency_ms', '?')}ms, attempts={resp.pop('_attempts', 1)})", "SUCCESS")
+
+            if resp.get("id") and resp["id"] in seen:
+                RF.print_log(f"[LIVE] order id={resp['id']} already journaled — not recorded again", "INFO")
+                continue
+            seen.add(resp.get("id"))
+
+            # Record live fill
+            status = str(resp.get("status") or resp.get("response","")).lower()
+            filled = resp.get("filled_qty") or resp.get("filled_qty_amount") or resp.get("request",{}).get("qty_filled")
+            append_fill_record(
+                symbol=p.get("symbol", ""),
+                side=p.get("side", ""),
+                qty=p.get("qty", 0.0),
+                status=status,
+                filled_qty=filled,
+                broker_id=resp.get("id"),
+                path=self.fills_file,
+            )
         return results
@@ -20,36 +20,30 @@ def ndx_extension(df: pd.DataFrame, slow_ma: int) -> float:
     close = df["close"].iloc[-1]
     return (close / sma_slow - 1.0) if sma_slow > 0 else 0.0
 
+def _std0(windows: np.ndarray) -> np.ndarray:
+    """Population stdev over the last axis, with the same arithmetic as pandas' Series.std(ddof=0)."""
+    n = windows.shape[-1]
+    avg = windows.sum(axis=-1, dtype=np.float64) / n
+    return np.sqrt(((np.expand_dims(avg, -1) - windows) ** 2).sum(axis=-1, dtype=np.float64) / n)
+
 def _realized_vol(series: pd.Series, n: int) -> float:
     # daily pct-change annualized stdev over n days
     r = series.pct_change().dropna().tail(n)
     if r.empty:
         return 0.0
-    return float(r.std(ddof=0) * np.sqrt(252))
+    return float(_std0(r.to_numpy(dtype=np.float64)) * np.sqrt(252))
 
-def exposure_allocator(df: pd.DataFrame) -> dict:
-    """
-    Returns desired exposure weights for TQQQ and SQQQ based on
-    trend (fast vs slow), extension, Bollinger momentum (with confirmation),
-    and a realized-volatility dampener.
-    """
-    cfg = Config(".")._load_yaml("config/exposure.yaml")
-    fast, slow = cfg["trend"]["fast_ma"], cfg["trend"]["slow_ma"]
+def _load_exposure_cfg() -> dict:
+    return Config(".")._load_yaml("config/exposure.yaml")
+
+def _allocate(cfg: dict, close, sma_fast, sma_fast_prev, sma_slow, upper_now, rvol: float, log: bool = True) -> dict:
+    """Allocator decision for one bar from precomputed indicator values (shared by the scalar and series paths)."""
     ext_factor = cfg["weights"]["extension_factor"]
-    bb_p, bb_std = cfg["weights"]["bb_period"], cfg["weights"]["bb_std"]
     max_exp, min_exp = cfg["weights"]["max_exposure_pct"], cfg["weights"]["min_exposure_pct"]
 
-    # MAs and BBs
-    sma_fast_series = compute_sma(df, fast)
-    sma_fast = sma_fast_series.iloc[-1]
-    sma_slow = compute_sma(df, slow).iloc[-1]
-    close = df["close"].iloc[-1]
-    upper, lower = compute_bbands(df, bb_p, bb_std)
-    upper_now = upper.iloc[-1]
-
     # Basic states
     in_downtrend = sma_fast < sma_slow
-    ext = ndx_extension(df, slow)
+    ext = (close / sma_slow - 1.0) if sma_slow > 0 else 0.0
 
     # Momentum with confirmations
     conf = cfg.get("confirmation", {}) or {}
@@ -58,8 +52,8 @@ def exposure_allocator(df: pd.DataFrame) -> dict:
         momentum = momentum and (close > sma_fast)
     if conf.get("momentum_requires_slope_up", True):
         # slope up: fast MA today > fast MA yesterday
-        if len(sma_fast_series) >= 2 and pd.notna(sma_fast_series.iloc[-2]):
-            momentum = momentum and (sma_fast_series.iloc[-1] > sma_fast_series.iloc[-2])
+        if sma_fast_prev is not None and pd.notna(sma_fast_prev):
+            momentum = momentum and (sma_fast > sma_fast_prev)
 
     # Base weight, reduced by extension
     base = max(min(max_exp, cfg["weights"]["base_risk"]), 0.0)
@@ -72,13 +66,13 @@ def exposure_allocator(df: pd.DataFrame) -> dict:
         lookback = int(vd.get("lookback_days", 20))
         cap_rvol = float(vd.get("cap_rvol", 0.25))
         floor_scale = float(vd.get("floor_scale", 0.60))
-        rvol = _realized_vol(df["close"], lookback)
         if rvol > cap_rvol:
             # linear scale-down from 1.0 at cap_rvol to floor_scale at 2×cap
             x = min(2.0, rvol / max(cap_rvol, 1e-9))
             scale = max(floor_scale, 2.0 - x)  # 1 at x=1, → floor at x=2
             weight *= scale
-            RF.print_log(f"Vol dampener active: rVol{lookback}={rvol:.2%} scale={scale:.2f}", "RISK")
+            if log:
+                RF.print_log(f"Vol dampener active: rVol{lookback}={rvol:.2%} scale={scale:.2f}", "RISK")
 
     # Momentum boost (after damping) but capped
     if (not in_downtrend) and momentum:
@@ -92,6 +86,73 @@ def exposure_allocator(df: pd.DataFrame) -> dict:
     else:
         return {"TQQQ": weight, "SQQQ": 0.0}
 
+def exposure_allocator(df: pd.DataFrame) -> dict:
+    """
+    Returns desired exposure weights for TQQQ and SQQQ based on
+    trend (fast vs slow), extension, Bollinger momentum (with confirmation),
+    and a realized-volatility dampener.
+    """
+    cfg = _load_exposure_cfg()
+    fast, slow = cfg["trend"]["fast_ma"], cfg["trend"]["slow_ma"]
+    bb_p, bb_std = cfg["weights"]["bb_period"], cfg["weights"]["bb_std"]
+
+    # MAs and BBs
+    sma_fast_series = compute_sma(df, fast)
+    upper, lower = compute_bbands(df, bb_p, bb_std)
+    vd = cfg.get("vol_dampener", {}) or {}
+    rvol = _realized_vol(df["close"], int(vd.get("lookback_days", 20))) if vd.get("enabled", True) else 0.0
+    return _allocate(cfg,
+                     close=df["close"].iloc[-1],
+                     sma_fast=sma_fast_series.iloc[-1],
+                     sma_fast_prev=sma_fast_series.iloc[-2] if len(sma_fast_series) >= 2 else None,
+                     sma_slow=compute_sma(df, slow).iloc[-1],
+                     upper_now=upper.iloc[-1],
+                     rvol=rvol)
+
+def _realized_vol_series(close: pd.Series, n: int) -> np.ndarray:
+    """_realized_vol evaluated on every prefix close[:i+1], in one pass."""
+    r = close.pct_change()
+    valid = r.notna().to_numpy()
+    vals = r.to_numpy(dtype=np.float64)[valid]
+    k = np.cumsum(valid)                        # valid returns available up to each bar
+    out = np.zeros(len(close))
+    if len(vals) >= n:
+        full = _std0(np.lib.stride_tricks.sliding_window_view(vals, n)) * np.sqrt(252)
+        mask = k >= n
+        out[mask] = full[k[mask] - n]
+    for i in np.flatnonzero((k > 0) & (k < n)):
+        out[i] = float(_std0(vals[:k[i]]) * np.sqrt(252))
+    return out
+
+def exposure_allocator_series(df: pd.DataFrame) -> list:
+    """
+    exposure_allocator evaluated as of every bar of df (each result equals
+    exposure_allocator(df.iloc[:i+1])), computing the indicator series once.
+    """
+    cfg = _load_exposure_cfg()
+    fast, slow = cfg["trend"]["fast_ma"], cfg["trend"]["slow_ma"]
+    bb_p, bb_std = cfg["weights"]["bb_period"], cfg["weights"]["bb_std"]
+    vd = cfg.get("vol_dampener", {}) or {}
+
+    close = df["close"].to_numpy()
+    sma_fast = compute_sma(df, fast).to_numpy()
+    sma_slow = compute_sma(df, slow).to_numpy()
+    upper = compute_bbands(df, bb_p, bb_std)[0].to_numpy()
+    rvol = (_realized_vol_series(df["close"], int(vd.get("lookback_days", 20)))
+            if vd.get("enabled", True) else np.zeros(len(df)))
+    return [_allocate(cfg, close[i], sma_fast[i], sma_fast[i - 1] if i >= 1 else None,
+                      sma_slow[i], upper[i], float(rvol[i]), log=False)
+            for i in range(len(df))]
+
+def _phase(c, upper_now, fast_now, fast_prev) -> str:
+    mom = (c > upper_now)
+    # confirmations
+    if mom and c > fast_now:
+        if fast_prev is not None and pd.notna(fast_prev) and fast_now > fast_prev:
+            return "MOMENTUM"
+    # accumulate vs mean-revert
+    return "ACCUMULATE" if c >= fast_now else "MEANREVERT"
+
 def classify_phase(df: pd.DataFrame, fast: int, bb_p: int, bb_std: float) -> str:
     """
     Returns one of: 'MOMENTUM', 'ACCUMULATE', 'MEANREVERT'
@@ -101,11 +162,13 @@ def classify_phase(df: pd.DataFrame, fast: int, bb_p: int, bb_std: float) -> str
     """
     sma_fast = compute_sma(df, fast)
     upper, _ = compute_bbands(df, bb_p, bb_std)
-    c = df["close"].iloc[-1]
-    mom = (c > upper.iloc[-1])
-    # confirmations
-    if mom and c > sma_fast.iloc[-1]:
-        if len(sma_fast) >= 2 and pd.notna(sma_fast.iloc[-2]) and sma_fast.iloc[-1] > sma_fast.iloc[-2]:
-            return "MOMENTUM"
-    # accumulate vs mean-revert
-    return "ACCUMULATE" if c >= sma_fast.iloc[-1] else "MEANREVERT"
+    return _phase(df["close"].iloc[-1], upper.iloc[-1], sma_fast.iloc[-1],
+                  sma_fast.iloc[-2] if len(sma_fast) >= 2 else None)
+
+def classify_phase_series(df: pd.DataFrame, fast: int, bb_p: int, bb_std: float) -> list:
+    """classify_phase as of every bar of df, in one pass."""
+    close = df["close"].to_numpy()
+    sma_fast = compute_sma(df, fast).to_numpy()
+    upper = compute_bbands(df, bb_p, bb_std)[0].to_numpy()
+    return [_phase(close[i], upper[i], sma_fast[i], sma_fast[i - 1] if i >= 1 else None)
+            for i in range(len(df))]
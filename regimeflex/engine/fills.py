@@ -1,7 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
 
+import numpy as np
+
+from .config import Config
+from .costs import CostModel
 from .exec_planner import OrderIntent
 from .positions import apply_fills
 from .identity import RegimeFlexIdentity as RF
@@ -13,29 +18,130 @@ class SimFill:
     side: str            # "BUY" | "SELL"
     price: float         # executed price
     note: str
+    requested_qty: Optional[float] = None   # intent qty when the fill was capped (partial)
+
+# ---------- fill model ----------
+# Prices come from the shared CostModel (risk.yaml `costs:` — spread, slippage, square-root
+# impact, commissions/fees), with the bar's volume standing in for ADV; broker.yaml
+# `fill_model:` only holds the execution mechanics below.
+
+FILL_DEFAULTS = {
+    "max_participation": 0.0,   # cap fills at this fraction of the bar's volume; 0 = unlimited
+    "limit_touch": False,       # with bar highs/lows: passive limits fill only if the bar traded through them
+}
+
+@dataclass(frozen=True)
+class FillModel:
+    cost: CostModel = CostModel()
+    max_participation: float = 0.0
+    limit_touch: bool = False
+
+    @classmethod
+    def from_config(cls) -> "FillModel":
+        """risk.yaml `costs:` prices the fills; broker.yaml `fill_model:` over FILL_DEFAULTS for the rest."""
+        cfg = Config(".")
+        broker = cfg._load_yaml("config/broker.yaml") if cfg.has("config/broker.yaml") else {}
+        m = {**FILL_DEFAULTS, **(broker.get("fill_model") or {})}
+        return cls(cost=CostModel.from_config(), max_participation=float(m["max_participation"]),
+                   limit_touch=bool(m["limit_touch"]))
 
-def simulate_fills(intents: List[OrderIntent], last_price: float) -> List[SimFill]:
+def _prior_same_symbol(codes: np.ndarray, qty: np.ndarray) -> np.ndarray:
+    """For each order, shares requested by earlier orders on the same symbol (batch order)."""
+    order = np.argsort(codes, kind="stable")
+    q = qty[order]
+    cum = np.cumsum(q)
+    start = np.r_[True, codes[order][1:] != codes[order][:-1]]
+    base = np.maximum.accumulate(np.where(start, cum - q, 0.0))
+    prior = np.empty_like(qty)
+    prior[order] = cum - q - base
+    return prior
+
+def fill_arrays(sign: np.ndarray, qty: np.ndarray, ref: np.ndarray, model: FillModel,
+                limit: Optional[np.ndarray] = None, volume: Optional[np.ndarray] = None,
+                low: Optional[np.ndarray] = None, high: Optional[np.ndarray] = None,
+                codes: Optional[np.ndarray] = None):
     """
-    Very simple simulator:
-    - limit BUY → fills at min(limit, last_price)
-    - limit SELL → fills at max(limit, last_price)
-    - market/MOC → fills at last_price
+    Vectorized fills for a batch of orders. sign +1 buy / -1 sell; ref = reference price
+    (the close); limit NaN = market/MOC; volume/low/high are each order's bar (NaN = unknown).
+    codes group orders on the same symbol so they share the participation cap.
+    Returns (filled_qty, fill_price).
     """
+    sign = np.asarray(sign, dtype=float)
+    qty = np.abs(np.asarray(qty, dtype=float))
+    ref = np.asarray(ref, dtype=float)
+    n = len(qty)
+    nan = np.full(n, np.nan)
+    limit = nan if limit is None else np.asarray(limit, dtype=float)
+    volume = nan if volume is None else np.asarray(volume, dtype=float)
+    codes = np.arange(n) if codes is None else np.asarray(codes)
+
+    filled = qty.copy()
+    if model.max_participation > 0:
+        cap = model.max_participation * volume
+        room = np.clip(cap - _prior_same_symbol(codes, qty), 0.0, None)
+        filled = np.where(np.isfinite(cap), np.minimum(qty, room), qty)
+
+    price = ref * (1.0 + sign * model.cost.cost_bps(filled, volume) / 1e4)
+
+    is_limit = np.isfinite(limit)
+    if is_limit.any():
+        buy = sign > 0
+        capped = np.where(buy, np.minimum(price, limit), np.maximum(price, limit))
+        price = np.where(is_limit, capped, price)
+        if model.limit_touch and low is not None and high is not None:
+            low, high = np.asarray(low, dtype=float), np.asarray(high, dtype=float)
+            touched = np.where(buy, low <= limit, high >= limit) | ~(np.isfinite(low) & np.isfinite(high))
+            filled = np.where(is_limit & ~touched, 0.0, filled)
+    return filled, price
+
+def simulate_fills(intents: List[OrderIntent], last_price: Optional[float] = None,
+                   prices: Optional[Mapping[str, float]] = None,
+                   bars: Optional[Mapping[str, Mapping[str, float]]] = None,
+                   model: Optional[FillModel] = None) -> List[SimFill]:
+    """
+    Fill a batch of intents, each at its own symbol's reference price:
+      prices = {SYMBOL: close}; last_price alone prices every intent (legacy single-price callers).
+      bars   = {SYMBOL: {"volume", "high", "low"}} enables participation caps and limit touch checks.
+      model  = FillModel (CostModel pricing + participation / limit touch); default = zero-cost model.
+    Limit BUY fills at min(price, limit), limit SELL at max(price, limit); market/MOC at the
+    modelled price. Unfilled intents produce no SimFill; capped ones carry requested_qty.
+    """
+    if not intents:
+        return []
+    model = model or FillModel()
+    syms = [str(it.symbol).upper() for it in intents]
+    if prices is not None:
+        prices = {str(k).upper(): float(v) for k, v in prices.items()}
+        missing = sorted({s for s in syms if s not in prices})
+        if missing and last_price is None:
+            raise KeyError(f"No fill price for {missing}")
+    ref = np.array([(prices or {}).get(s, last_price) for s in syms], dtype=float)
+    sign = np.array([1.0 if it.side == "BUY" else -1.0 for it in intents])
+    qty = np.array([float(it.qty) for it in intents])
+    limit = np.array([float(it.limit_price) if it.order_type == "limit" and it.limit_price is not None
+                      else np.nan for it in intents])
+    bars = {str(k).upper(): v for k, v in (bars or {}).items()}
+    col = lambda key: np.array([float((bars.get(s) or {}).get(key, np.nan)) for s in syms])
+    codes = np.unique(syms, return_inverse=True)[1]
+    filled, px = fill_arrays(sign, qty, ref, model, limit=limit, volume=col("volume"),
+                             low=col("low"), high=col("high"), codes=codes)
+
     fills: List[SimFill] = []
-    for it in intents:
-        px = last_price
+    for it, sym, q, fq, p in zip(intents, syms, qty, filled, px):
         if it.order_type == "limit" and it.limit_price is not None:
-            if it.side == "BUY":
-                px = min(last_price, float(it.limit_price))
-            else:
-                px = max(last_price, float(it.limit_price))
             note = "limit simulated"
         elif it.order_type in ("market", "moc"):
             note = it.order_type + " simulated"
         else:
             note = "unknown type → market fallback"
-
-        fills.append(SimFill(symbol=it.symbol, qty=float(it.qty), side=it.side, price=float(px), note=note))
+        if fq <= 0:
+            RF.print_log(f"Fill sim: {sym} {it.side} {q:g} unfilled ({note.split()[0]})", "RISK")
+            continue
+        partial = fq < q - 1e-12
+        if partial:
+            note += f" (partial {fq / q:.0%} of {q:g})"
+        fills.append(SimFill(symbol=it.symbol, qty=float(fq), side=it.side, price=float(p), note=note,
+                             requested_qty=float(q) if partial else None))
     return fills
 
 def fills_to_position_deltas(fills: List[SimFill]) -> Dict[str, float]:
@@ -48,7 +154,8 @@ def fills_to_position_deltas(fills: List[SimFill]) -> Dict[str, float]:
         deltas[f.symbol] = deltas.get(f.symbol, 0.0) + signed
     return deltas
 
-def apply_simulated_fills(current_positions: Dict[str, float], fills: List[SimFill]) -> Dict[str, float]:
+def apply_simulated_fills(current_positions: Dict[str, float], fills: List[SimFill],
+                          path: Optional[Path] = None) -> Dict[str, float]:
     deltas = fills_to_position_deltas(fills)
     RF.print_log(f"Applying fills → deltas {deltas}", "INFO")
-    return apply_fills(current_positions, deltas)
+    return apply_fills(current_positions, deltas, path)
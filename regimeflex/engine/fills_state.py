@@ -7,8 +7,10 @@ from .symnorm import sym_upper
 
 FILLS_FILE = Path("logs/trading/fills_state.jsonl")
 
-def append_fill_record(symbol: str, side: str, qty: float, status: str, filled_qty: float | None, broker_id: str | None):
-    FILLS_FILE.parent.mkdir(parents=True, exist_ok=True)
+def append_fill_record(symbol: str, side: str, qty: float, status: str, filled_qty: float | None, broker_id: str | None,
+                       path: Path | None = None):
+    path = path or FILLS_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
     rec = {
         "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
         "symbol": sym_upper(symbol),
@@ -18,5 +20,21 @@ def append_fill_record(symbol: str, side: str, qty: float, status: str, filled_q
         "filled_qty": float(filled_qty) if filled_qty is not None else None,
         "broker_id": broker_id,
     }
-    with FILLS_FILE.open("a", encoding="utf-8") as f:
+    with path.open("a", encoding="utf-8") as f:
         f.write(json.dumps(rec) + "\n")
+
+def journaled_broker_ids(path: Path | None = None) -> set:
+    """broker_ids already in the fills journal (a resubmitted plan resolves to these orders)."""
+    path = path or FILLS_FILE
+    ids = set()
+    if not path.exists():
+        return ids
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                bid = json.loads(line).get("broker_id")
+            except Exception:
+                continue
+            if bid:
+                ids.add(bid)
+    return ids
@@ -1,7 +1,12 @@
 # engine/fingerprint.py
 from __future__ import annotations
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 import hashlib
+import json
+import os
+
+from .statcache import StatCache
 
 CANDIDATE_FILES = [
     "config/run.yaml",
@@ -15,25 +20,60 @@ CANDIDATE_FILES = [
     "config/strategies.yaml",
 ]
 
+LAST_FP_PATH = Path("data/state/fingerprint.json")
+
 def file_bytes(path: Path) -> bytes:
     try:
         return path.read_bytes()
     except Exception:
         return b""  # missing files are treated as empty
 
+def _read_digest(path: Path) -> Tuple[bytes, str]:
+    data = file_bytes(path)
+    return data, hashlib.sha256(data).hexdigest()
+
+# (bytes, sha256) per config file; re-read only when (size, mtime_ns, inode) changes
+FILE_DIGESTS = StatCache(_read_digest, copier=lambda v: v)
+
 def compute_fingerprint(root: str = ".") -> dict:
-    """Return dict with sha256 hash and the list of files included."""
+    """Return dict with sha256 hash, the list of files included and each file's sha256."""
     rootp = Path(root)
     h = hashlib.sha256()
     included: list[str] = []
+    file_hashes: Dict[str, str] = {}
     for rel in CANDIDATE_FILES:
         p = rootp / rel
-        if p.exists():
-            h.update(rel.encode("utf-8") + b"\n")
-            h.update(file_bytes(p) + b"\n")
-            included.append(rel)
+        try:
+            data, sha = FILE_DIGESTS.get(p)
+        except OSError:
+            continue
+        h.update(rel.encode("utf-8") + b"\n")
+        h.update(data + b"\n")
+        included.append(rel)
+        file_hashes[rel] = sha
     return {
         "sha256_16": h.hexdigest()[:16],  # short display
         "sha256": h.hexdigest(),
         "files": included,
+        "file_hashes": file_hashes,
     }
+
+def diff_fingerprints(prev: Optional[dict], cur: dict) -> list[str]:
+    """Config files added, removed or edited between two fingerprints (empty if no previous)."""
+    if not prev or "file_hashes" not in prev:
+        return []
+    a, b = prev["file_hashes"], cur.get("file_hashes", {})
+    return sorted(rel for rel in set(a) | set(b) if a.get(rel) != b.get(rel))
+
+def load_last_fingerprint(path: Path = LAST_FP_PATH) -> Optional[dict]:
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return None
+
+def save_last_fingerprint(fp: dict, path: Path = LAST_FP_PATH) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(fp, indent=2, sort_keys=True))
+    os.replace(tmp, path)
@@ -1,17 +1,19 @@
 # engine/guardrails.py
 from __future__ import annotations
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 from .config import Config
 from .identity import RegimeFlexIdentity as RF
 
-def enforce_exposure_caps(weights: Dict[str, float]) -> Tuple[Dict[str, float], str]:
+def enforce_exposure_caps(weights: Dict[str, float], limits: Optional[dict] = None) -> Tuple[Dict[str, float], str]:
     """
     Caps per-side and total gross exposure. Returns (new_weights, note).
     Input/Output weights are fractions of equity (e.g., 0.85 == 85%).
       keys expected: "TQQQ", "SQQQ" (missing keys treated as 0).
+    `limits` (exposure.yaml `limits:`) can be passed by batch callers to skip the config read.
     """
-    cfg = Config(".")._load_yaml("config/exposure.yaml")
-    lim = (cfg.get("limits") or {})
+    if limits is None:
+        limits = Config(".")._load_yaml("config/exposure.yaml").get("limits")
+    lim = (limits or {})
     cap_gross = float(lim.get("max_gross", 1.0))
     cap_t = float(lim.get("max_tqqq", 1.0))
     cap_s = float(lim.get("max_sqqq", 1.0))
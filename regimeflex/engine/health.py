@@ -1,16 +1,18 @@
 # engine/health.py
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from datetime import datetime, timezone
+import os
+import threading
+import time
 
 from .config import Config
 from .env import load_env
 from .identity import RegimeFlexIdentity as RF
 from .killswitch import is_killed
-from .data import load_from_cache
-from .data import save_to_cache  # used only to test write access if needed
 
 @dataclass
 class CheckResult:
@@ -24,31 +26,71 @@ class HealthReport:
     checks: List[CheckResult]
     timestamp: str
 
-def _ok_dir_write(path: Path) -> Tuple[bool, str]:
+# seconds a check result stays valid; 0 = evaluate on every call
+HEALTH_DEFAULTS = {
+    "max_workers": 4,
+    "default_ttl_sec": 60,
+    "ttl_sec": {
+        "kill_switch": 0,
+        "configs_present": 60,
+        "broker_mode": 60,
+        "data_cache": 300,
+        "fs_permissions": 60,
+        "telemetry": 300,
+        "eod_guard": 300,
+    },
+}
+
+def load_health_config() -> dict:
+    cfg = Config(".")
+    raw = cfg._load_yaml("config/health.yaml") if (cfg.root / "config/health.yaml").exists() else {}
+    out = {**HEALTH_DEFAULTS, **{k: v for k, v in raw.items() if k != "ttl_sec"}}
+    out["ttl_sec"] = {**HEALTH_DEFAULTS["ttl_sec"], **(raw.get("ttl_sec") or {})}
+    return out
+
+def _dir_writable(path: Path) -> Tuple[bool, str]:
     try:
         path.mkdir(parents=True, exist_ok=True)
-        test = path / ".health_write_test"
-        test.write_text("ok", encoding="utf-8")
-        test.unlink(missing_ok=True)
-        return True, "writable"
     except Exception as e:
         return False, f"not writable: {e}"
+    if os.access(path, os.W_OK | os.X_OK):
+        return True, "writable"
+    return False, "not writable: permission denied"
 
 def _bool_to_status(ok: bool, warn: bool = False) -> str:
     if ok: return "PASS"
     return "WARN" if warn else "FAIL"
 
-def run_health() -> HealthReport:
-    checks: List[CheckResult] = []
-    cfg = Config(".")
-    now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+def last_cached_date(symbol: str, tail_bytes: int = 4096):
+    """
+    Date of the last cached bar: from the cache manifest when it matches the file,
+    else from the CSV tail (no full parse). None if absent/empty.
+    """
+    # imported here so the web process can answer health without loading pandas up front
+    from .data import _cache_path, cache_meta
+    meta = cache_meta(symbol)
+    if meta is not None:
+        return datetime.fromisoformat(meta["last_date"]).date() if meta.get("last_date") else None
+    path = _cache_path(symbol)
+    if not path.exists():
+        return None
+    with path.open("rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - tail_bytes))
+        lines = [ln for ln in f.read().decode("utf-8", errors="replace").splitlines() if ln.strip()]
+    if not lines or lines[-1].startswith("date,"):
+        return None
+    import pandas as pd
+    return pd.Timestamp(lines[-1].split(",", 1)[0]).date()
+
+# ---------- individual checks ----------
 
-    # 1) Kill-switch
+def check_kill_switch() -> CheckResult:
     killed = is_killed()
-    checks.append(CheckResult("kill_switch", "FAIL" if killed else "PASS",
-                              "enabled" if killed else "disabled"))
+    return CheckResult("kill_switch", "FAIL" if killed else "PASS", "enabled" if killed else "disabled")
 
-    # 2) Config presence (essential ones only)
+def check_configs_present() -> CheckResult:
     essential = [
         "config/run.yaml",
         "config/exposure.yaml",
@@ -59,87 +101,200 @@ def run_health() -> HealthReport:
         "config/logs.yaml",
     ]
     missing = [p for p in essential if not (Path(p).exists())]
-    checks.append(CheckResult("configs_present",
-                              _bool_to_status(len(missing) == 0),
-                              "missing: " + ", ".join(missing) if missing else "all present"))
+    return CheckResult("configs_present", _bool_to_status(len(missing) == 0),
+                       "missing: " + ", ".join(missing) if missing else "all present")
 
-    # 3) Broker safety
-    broker = cfg._load_yaml("config/broker.yaml")
+def check_broker_mode() -> CheckResult:
+    broker = Config(".")._load_yaml("config/broker.yaml")
     alp = (broker.get("alpaca") or {})
     dry_run = bool(alp.get("dry_run", True))
     mode = alp.get("mode", "paper")
+    if dry_run:
+        return CheckResult("broker_mode", "PASS", f"dry_run=true ({mode})")
     env = load_env()
     has_keys = bool(env.alpaca_key and env.alpaca_secret)
-    if dry_run:
-        checks.append(CheckResult("broker_mode", "PASS", f"dry_run=true ({mode})"))
-    else:
-        checks.append(CheckResult("broker_mode",
-                                  _bool_to_status(has_keys, warn=False),
-                                  "ready" if has_keys else "dry_run=false but missing Alpaca keys"))
-
-    # 4) Data readiness (cache freshness present at least for QQQ/PSQ)
-    data_cfg = cfg._load_yaml("config/data.yaml")
+    return CheckResult("broker_mode", _bool_to_status(has_keys, warn=False),
+                       "ready" if has_keys else "dry_run=false but missing Alpaca keys")
+
+def check_data_cache() -> CheckResult:
+    data_cfg = Config(".")._load_yaml("config/data.yaml")
     symbols = data_cfg.get("symbols", ["QQQ", "PSQ"])
+    today = datetime.now(timezone.utc).date()
     stale: List[str] = []
     absent: List[str] = []
     for sym in symbols:
-        df = load_from_cache(sym)
-        if df is None or df.empty:
+        last_date = last_cached_date(sym)
+        if last_date is None:
             absent.append(sym)
-        else:
-            # consider "fresh" if last bar date within 7 calendar days (EOD systems tolerate lag)
-            last_date = df.index[-1].date()
-            age = (datetime.now(timezone.utc).date() - last_date).days
-            if age > 7:
-                stale.append(f"{sym}({age}d)")
+            continue
+        # consider "fresh" if last bar date within 7 calendar days (EOD systems tolerate lag)
+        age = (today - last_date).days
+        if age > 7:
+            stale.append(f"{sym}({age}d)")
     if absent:
-        checks.append(CheckResult("data_cache", "WARN", f"missing cache: {', '.join(absent)}"))
-    elif stale:
-        checks.append(CheckResult("data_cache", "WARN", f"stale cache: {', '.join(stale)}"))
-    else:
-        checks.append(CheckResult("data_cache", "PASS", "QQQ/PSQ cache OK"))
-
-    # 5) Logs/Audit write access
-    writable_dirs = ["logs/audit", "logs/trading", "reports"]
+        return CheckResult("data_cache", "WARN", f"missing cache: {', '.join(absent)}")
+    if stale:
+        return CheckResult("data_cache", "WARN", f"stale cache: {', '.join(stale)}")
+    return CheckResult("data_cache", "PASS", "QQQ/PSQ cache OK")
+
+def check_fs_permissions() -> CheckResult:
     write_issues = []
-    for d in writable_dirs:
-        ok, msg = _ok_dir_write(Path(d))
+    for d in ["logs/audit", "logs/trading", "reports"]:
+        ok, msg = _dir_writable(Path(d))
         if not ok: write_issues.append(f"{d}({msg})")
-    checks.append(CheckResult("fs_permissions",
-                              _bool_to_status(len(write_issues) == 0),
-                              "OK" if not write_issues else "; ".join(write_issues)))
+    return CheckResult("fs_permissions", _bool_to_status(len(write_issues) == 0),
+                       "OK" if not write_issues else "; ".join(write_issues))
 
-    # 6) Telemetry (won't fail the system if missing, only warn)
+def check_telemetry() -> CheckResult:
+    # won't fail the system if missing, only warn
     try:
-        tele = cfg.telemetry or {}
+        tele = Config(".").telemetry or {}
     except Exception:
         tele = {}
-    if tele.get("enabled", True):
-        # if enabled but no token/chat → WARN
-        token_present = bool(getattr(env, "telegram_bot_token", None))
-        chat_present  = bool(getattr(env, "telegram_chat_id", None))
-        if token_present and chat_present:
-            checks.append(CheckResult("telemetry", "PASS", "telegram configured"))
-        else:
-            checks.append(CheckResult("telemetry", "WARN", "enabled but token/chat missing → will DRY-RUN"))
-    else:
-        checks.append(CheckResult("telemetry", "PASS", "disabled"))
-
-    # 7) EOD guard config sanity
-    sched = cfg._load_yaml("config/schedule.yaml")
+    if not tele.get("enabled", True):
+        return CheckResult("telemetry", "PASS", "disabled")
+    env = load_env()
+    token_present = bool(getattr(env, "telegram_bot_token", None))
+    chat_present  = bool(getattr(env, "telegram_chat_id", None))
+    if token_present and chat_present:
+        return CheckResult("telemetry", "PASS", "telegram configured")
+    return CheckResult("telemetry", "WARN", "enabled but token/chat missing → will DRY-RUN")
+
+def check_eod_guard() -> CheckResult:
+    sched = Config(".")._load_yaml("config/schedule.yaml")
     guard = (sched.get("eod_guard") or {})
     try:
         win = int(guard.get("min_minutes_before_close", 30))
-        checks.append(CheckResult("eod_guard", "PASS", f"window={win}m; override={bool(guard.get('allow_early_override', False))}"))
+        return CheckResult("eod_guard", "PASS", f"window={win}m; override={bool(guard.get('allow_early_override', False))}")
     except Exception as e:
-        checks.append(CheckResult("eod_guard", "FAIL", f"invalid config: {e}"))
+        return CheckResult("eod_guard", "FAIL", f"invalid config: {e}")
+
+CHECKS: List[Tuple[str, Callable[[], CheckResult]]] = [
+    ("kill_switch", check_kill_switch),
+    ("configs_present", check_configs_present),
+    ("broker_mode", check_broker_mode),
+    ("data_cache", check_data_cache),
+    ("fs_permissions", check_fs_permissions),
+    ("telemetry", check_telemetry),
+    ("eod_guard", check_eod_guard),
+]
 
-    # Overall status
-    overall = "PASS"
+def _overall(checks: List[CheckResult]) -> str:
     if any(c.status == "FAIL" for c in checks):
-        overall = "FAIL"
-    elif any(c.status == "WARN" for c in checks):
-        overall = "WARN"
+        return "FAIL"
+    if any(c.status == "WARN" for c in checks):
+        return "WARN"
+    return "PASS"
+
+class HealthMonitor:
+    """
+    Runs checks concurrently and keeps each result for its TTL, so repeated calls
+    only re-evaluate what has expired. A check that raises is reported as FAIL.
+      run(force)   → fresh-enough HealthReport (re-runs expired checks inline)
+      snapshot()   → last report immediately; TTL-0 checks (cheap, e.g. the kill switch) are
+                     re-evaluated inline, expired cached ones refresh in the background
+    """
+    def __init__(self, checks: List[Tuple[str, Callable[[], CheckResult]]] = CHECKS,
+                 ttl_sec: Optional[Dict[str, float]] = None, default_ttl_sec: float = 60,
+                 max_workers: int = 4, clock: Callable[[], float] = time.monotonic):
+        self.checks = list(checks)
+        self.ttl_sec = dict(ttl_sec or {})
+        self.default_ttl_sec = float(default_ttl_sec)
+        self.max_workers = max(1, int(max_workers))
+        self._clock = clock
+        self._results: Dict[str, Tuple[float, CheckResult]] = {}   # name → (expires_at, result)
+        self._report: Optional[HealthReport] = None
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._refreshing = False
+
+    def _expired(self, now: float) -> List[Tuple[str, Callable[[], CheckResult]]]:
+        with self._lock:
+            return [(n, fn) for n, fn in self.checks
+                    if n not in self._results or self._results[n][0] <= now]
+
+    def _ttl(self, name: str) -> float:
+        return float(self.ttl_sec.get(name, self.default_ttl_sec))
+
+    def _store(self, todo: List[Tuple[str, Callable[[], CheckResult]]], fresh: List[CheckResult]) -> HealthReport:
+        """Record results (each valid for its TTL) and publish the report built from all of them."""
+        done_at = self._clock()
+        stamp = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        with self._lock:
+            for (name, _), res in zip(todo, fresh):
+                self._results[name] = (done_at + self._ttl(name), res)
+            checks = [self._results[n][1] for n, _ in self.checks]
+            self._report = HealthReport(status=_overall(checks), checks=checks, timestamp=stamp)
+            return self._report
+
+    @staticmethod
+    def _safe(name: str, fn: Callable[[], CheckResult]) -> CheckResult:
+        try:
+            return fn()
+        except Exception as e:
+            return CheckResult(name, "FAIL", f"check error: {e}")
+
+    def run(self, force: bool = False) -> HealthReport:
+        with self._run_lock:
+            now = self._clock()
+            todo = list(self.checks) if force else self._expired(now)
+            workers = min(self.max_workers, len(todo))
+            if workers <= 1:
+                fresh = [self._safe(n, fn) for n, fn in todo]
+            else:
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rf-health") as pool:
+                    fresh = list(pool.map(lambda item: self._safe(*item), todo))
+            report = self._store(todo, fresh)
+
+        RF.print_log(f"Health overall: {report.status}", "RISK" if report.status != "PASS" else "SUCCESS")
+        return report
+
+    def snapshot(self) -> HealthReport:
+        """Cheap read for pollers: never blocks on checks once a first report exists."""
+        with self._lock:
+            report = self._report
+        if report is None:
+            return self.run()
+        expired = self._expired(self._clock())
+        inline = [(n, fn) for n, fn in expired if self._ttl(n) <= 0]
+        if len(inline) < len(expired):
+            with self._lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                threading.Thread(target=self._refresh, name="rf-health-refresh", daemon=True).start()
+        if inline:
+            report = self._store(inline, [self._safe(n, fn) for n, fn in inline])
+        return report
+
+    def _refresh(self) -> None:
+        try:
+            self.run()
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._report = None
+
+_monitor: Optional[HealthMonitor] = None
+_monitor_lock = threading.Lock()
+
+def get_monitor() -> HealthMonitor:
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            hc = load_health_config()
+            _monitor = HealthMonitor(CHECKS, ttl_sec=hc["ttl_sec"], default_ttl_sec=hc["default_ttl_sec"],
+                                     max_workers=hc["max_workers"])
+        return _monitor
+
+def run_health(force: bool = False) -> HealthReport:
+    """Health report; checks still inside their TTL are served from cache unless force=True."""
+    return get_monitor().run(force=force)
 
-    RF.print_log(f"Health overall: {overall}", "RISK" if overall != "PASS" else "SUCCESS")
-    return HealthReport(status=overall, checks=checks, timestamp=now)
+def health_snapshot() -> HealthReport:
+    """Last health report without waiting on checks (stale ones refresh in the background)."""
+    return get_monitor().snapshot()
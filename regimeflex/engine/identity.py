@@ -36,7 +36,8 @@ class RegimeFlexIdentity:
     @classmethod
     def print_log(cls, message, level="INFO"):
         color = cls.LEVEL_COLORS.get(level, Fore.WHITE)
-        print(color + cls.formatted_log(message, level) + Style.RESET_ALL)
+        # single write so lines from concurrent pipeline stages do not interleave
+        print(color + cls.formatted_log(message, level) + Style.RESET_ALL + "\n", end="")
 
 
 
@@ -1,12 +1,13 @@
 # engine/instruments.py
 from __future__ import annotations
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 from .config import Config
 from .identity import RegimeFlexIdentity as RF
 
-def resolve_execution_pair() -> Dict[str, str]:
+def resolve_execution_pair(pair: Optional[str] = None) -> Dict[str, str]:
+    """Symbols for `pair` (default: execution.yaml's active pair)."""
     ex = Config(".")._load_yaml("config/execution.yaml")
-    pair = (ex.get("pair") or "QQQ_PSQ").upper()
+    pair = (pair or ex.get("pair") or "QQQ_PSQ").upper()
     mp = (ex.get("mapping") or {}).get(pair, {})
     long_symbol  = mp.get("long_symbol", "QQQ")
     short_symbol = mp.get("short_symbol", "PSQ")
@@ -0,0 +1,138 @@
+# engine/intraday.py
+from __future__ import annotations
+from datetime import datetime, time as dtime, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from .config import Config
+from .identity import RegimeFlexIdentity as RF
+from .barstore import PartitionedStore
+
+# Minute/5-minute bars in a chunked columnar store:
+#   data/intraday/<timeframe>/<SYMBOL>/<YYYY-MM>.npz   arrays ts (int64 ns UTC), open/high/low/close/volume
+# One month is one chunk, so reads only touch the months they need and a whole year of
+# 1-minute bars never has to be in memory at once (engine/barstore.py, monthly partitions).
+
+INTRADAY_DIR = Path("data/intraday")
+COLUMNS = ("open", "high", "low", "close", "volume")
+SESSION_TZ = ZoneInfo("America/New_York")
+SESSION_OPEN = dtime(9, 30)
+SESSION_CLOSE = dtime(16, 0)
+
+INTRADAY_DEFAULTS = {
+    "enabled": False,           # fetch + store intraday bars
+    "timeframe": "1Min",        # stored resolution
+    "synthetic_today": False,   # append today's partial session bar to daily bars at decision time
+    "lookback_days": 5,         # provider fetch window
+}
+
+def load_intraday_config() -> dict:
+    data = Config(".")._load_yaml("config/data.yaml") if (Config(".").root / "config/data.yaml").exists() else {}
+    return {**INTRADAY_DEFAULTS, **(data.get("intraday") or {})}
+
+def _store(timeframe: str, root: Path) -> PartitionedStore:
+    return PartitionedStore(Path(root) / timeframe, freq="M")
+
+def _utc_frame(df: pd.DataFrame) -> pd.DataFrame:
+    idx = pd.DatetimeIndex(df.index)
+    idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+    out = pd.DataFrame({c: df[c].to_numpy(dtype=float) for c in COLUMNS}, index=idx)
+    out.index.name = "ts"
+    return out
+
+def ingest(symbol: str, df: pd.DataFrame, timeframe: str = "1Min", root: Path = INTRADAY_DIR) -> int:
+    """
+    Merge bars (DatetimeIndex + OHLCV) into the monthly chunks; newer rows win on equal
+    timestamps. Only the touched months are read and rewritten (atomically). Returns rows written.
+    """
+    if df is None or df.empty:
+        return 0
+    return _store(timeframe, root).write(symbol, _utc_frame(df))
+
+def months(symbol: str, timeframe: str = "1Min", root: Path = INTRADAY_DIR) -> List[str]:
+    return _store(timeframe, root).partitions(symbol)
+
+def _utc(ts) -> Optional[pd.Timestamp]:
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+
+def _empty() -> pd.DataFrame:
+    idx = pd.DatetimeIndex([], tz="UTC", name="ts")
+    return pd.DataFrame({c: np.array([]) for c in COLUMNS}, index=idx)
+
+def iter_chunks(symbol: str, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                timeframe: str = "1Min", root: Path = INTRADAY_DIR) -> Iterator[pd.DataFrame]:
+    """Yield one DataFrame per month chunk overlapping [start, end] (UTC, inclusive)."""
+    for chunk in _store(timeframe, root).scan(symbol, start, end, columns=COLUMNS):
+        if len(chunk):
+            yield chunk
+
+def load_bars(symbol: str, start=None, end=None, timeframe: str = "1Min", root: Path = INTRADAY_DIR) -> pd.DataFrame:
+    parts = list(iter_chunks(symbol, start, end, timeframe, root))
+    if not parts:
+        return _empty()
+    return pd.concat(parts)
+
+def resample(df: pd.DataFrame, rule: str = "5min") -> pd.DataFrame:
+    """OHLCV resample (left-labelled bins); empty bins are dropped."""
+    out = df.resample(rule, label="left", closed="left").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    return out.dropna(subset=["close"])
+
+def resample_store(symbol: str, src: str = "1Min", dst: str = "5Min", rule: str = "5min",
+                   root: Path = INTRADAY_DIR) -> int:
+    """Build a coarser timeframe chunk by chunk (bins never straddle months for intraday rules)."""
+    n = 0
+    for chunk in iter_chunks(symbol, timeframe=src, root=root):
+        n += ingest(symbol, resample(chunk, rule), timeframe=dst, root=root)
+    return n
+
+# ---------- decision-time bar ----------
+
+def session_date(asof: Optional[datetime] = None) -> pd.Timestamp:
+    asof = asof or datetime.now(timezone.utc)
+    return pd.Timestamp(pd.Timestamp(asof).tz_convert(SESSION_TZ).date())
+
+def synthetic_today_bar(symbol: str, asof: Optional[datetime] = None, timeframe: str = "1Min",
+                        root: Path = INTRADAY_DIR) -> Optional[pd.DataFrame]:
+    """
+    Today's regular session so far (09:30 NY → asof) collapsed into one daily row, indexed
+    like the daily cache (session date at 00:00 UTC). None if no bars yet.
+    """
+    asof = _utc(asof or datetime.now(timezone.utc))
+    day = session_date(asof)
+    open_utc = pd.Timestamp(datetime.combine(day.date(), SESSION_OPEN, SESSION_TZ)).tz_convert("UTC")
+    bars = load_bars(symbol, open_utc, asof, timeframe, root)
+    if bars.empty:
+        return None
+    row = {"open": float(bars["open"].iloc[0]), "high": float(bars["high"].max()),
+           "low": float(bars["low"].min()), "close": float(bars["close"].iloc[-1]),
+           "volume": int(bars["volume"].sum())}
+    return pd.DataFrame([row], index=pd.DatetimeIndex([day.tz_localize("UTC")], name="date"))
+
+def with_synthetic_bar(daily: pd.DataFrame, bar: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Daily bars with today's synthetic row appended (or replacing a same-date row)."""
+    if bar is None or bar.empty:
+        return daily
+    out = pd.concat([daily[~daily.index.isin(bar.index)], bar[list(daily.columns)]])
+    return out.sort_index()
+
+def fetch_to_store(symbol: str, cfg: Optional[dict] = None) -> int:
+    """Pull recent intraday bars from the configured provider into the store."""
+    from .data_providers import fetch_alpaca_intraday
+    from .env import load_env
+    cfg = cfg or load_intraday_config()
+    data = Config(".")._load_yaml("config/data.yaml")
+    alp = (data.get("alpaca") or {})
+    env = load_env()
+    df = fetch_alpaca_intraday(symbol, cfg["timeframe"], int(cfg["lookback_days"]),
+                               alp.get("intraday_url", ""), env.alpaca_key, env.alpaca_secret)
+    n = ingest(symbol, df, timeframe=cfg["timeframe"]) if df is not None else 0
+    RF.print_log(f"Intraday {symbol}: {n} {cfg['timeframe']} bar(s) stored", "INFO" if n else "RISK")
+    return n
@@ -0,0 +1,185 @@
+# engine/jobs.py
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, asdict, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import os
+import queue
+import threading
+import time
+import traceback
+import uuid
+
+from .identity import RegimeFlexIdentity as RF
+from . import telemetry
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: in-process dedupe only
+    fcntl = None  # type: ignore
+
+LOCK_PATH = Path("data/state/run.lock")
+
+ACTIVE = ("queued", "running")
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def session_key() -> str:
+    """Trading session a trigger belongs to (UTC date; the EOD window is inside one UTC day)."""
+    return datetime.now(timezone.utc).date().isoformat()
+
+@dataclass
+class Job:
+    id: str
+    session: str
+    status: str                      # queued | running | succeeded | failed | skipped
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Small JSON-safe view of a run result for job status."""
+    bc = result.get("breadcrumbs", {}) or {}
+    return {
+        "target": result.get("target", {}),
+        "intents": result.get("intents", []),
+        "positions_after": result.get("positions_after", {}),
+        "no_op": bool(bc.get("no_op", False)),
+        "no_op_reason": bc.get("no_op_reason", ""),
+        "run_duration_sec": bc.get("run_duration_sec"),
+    }
+
+class _FileLock:
+    """Non-blocking exclusive lock across processes (e.g. several gunicorn workers)."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fh = None
+
+    def acquire(self) -> bool:
+        if fcntl is None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fh = open(self.path, "a+")
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        fh.seek(0)
+        fh.truncate()
+        fh.write(f"{os.getpid()}\n")
+        fh.flush()
+        self._fh = fh
+        return True
+
+    def release(self) -> None:
+        if self._fh is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            self._fh.close()
+            self._fh = None
+
+class JobManager:
+    """
+    Runs daily cycles on one background worker thread.
+      submit()  → (job, created); a queued/running job for the same session is returned
+                  instead of starting a second cycle
+      get(id)   → Job | None
+    Callers get snapshots; only the worker mutates the stored jobs.
+    The worker also takes a file lock, so cycles in other processes are never overlapped
+    (a job that finds the lock held ends as 'skipped').
+    """
+    def __init__(self, runner: Callable[[], Dict[str, Any]], history: int = 50,
+                 lock_path: Path = LOCK_PATH, session_fn: Callable[[], str] = session_key):
+        self._runner = runner
+        self._history = max(1, int(history))
+        self._lock_path = Path(lock_path)
+        self._session_fn = session_fn
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._worker = threading.Thread(target=self._work, name="rf-jobs", daemon=True)
+        self._worker.start()
+
+    def submit(self, session: Optional[str] = None) -> Tuple[Job, bool]:
+        session = session or self._session_fn()
+        with self._lock:
+            for job in self._jobs.values():
+                if job.session == session and job.status in ACTIVE:
+                    return replace(job), False
+            job = Job(id=uuid.uuid4().hex[:12], session=session, status="queued", created_at=_now())
+            self._jobs[job.id] = job
+            self._trim()
+            snap = replace(job)
+        self._queue.put(job.id)
+        RF.print_log(f"Job {job.id} queued (session {session})", "INFO")
+        return snap, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job is not None else None
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return [replace(j) for j in reversed(self._jobs.values())]
+
+    def wait(self, job_id: str, timeout: float = 30.0) -> Optional[Job]:
+        """Block until the job leaves queued/running (tests, CLI)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job.status not in ACTIVE or time.monotonic() >= deadline:
+                return job
+            time.sleep(0.02)
+
+    def _trim(self) -> None:
+        # keep active jobs; drop the oldest finished ones beyond `history`
+        while len(self._jobs) > self._history:
+            oldest = next((k for k, j in self._jobs.items() if j.status not in ACTIVE), None)
+            if oldest is None:
+                break
+            self._jobs.pop(oldest)
+
+    def _set(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                for k, v in fields.items():
+                    setattr(job, k, v)
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run_one(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run_one(self, job_id: str) -> None:
+        flock = _FileLock(self._lock_path)
+        if not flock.acquire():
+            RF.print_log(f"Job {job_id} skipped: another process holds {self._lock_path}", "RISK")
+            self._set(job_id, status="skipped", finished_at=_now(), error="cycle already running in another process")
+            return
+        self._set(job_id, status="running", started_at=_now())
+        try:
+            try:
+                result = self._runner()
+            finally:
+                telemetry.flush_notifications()   # the cycle's messages are delivered before the job reports done
+            self._set(job_id, status="succeeded", finished_at=_now(), result=summarize_result(result))
+            RF.print_log(f"Job {job_id} finished", "SUCCESS")
+        except Exception as e:
+            RF.print_log(f"Job {job_id} failed: {e}", "ERROR")
+            self._set(job_id, status="failed", finished_at=_now(),
+                      error=f"{type(e).__name__}: {e}\n{traceback.format_exc(limit=5)}")
+        finally:
+            flock.release()
@@ -0,0 +1,63 @@
+# engine/lazy.py
+from __future__ import annotations
+from typing import Any, Dict, Optional
+import importlib
+import importlib.util
+import threading
+import types
+
+_lock = threading.Lock()
+_available: Dict[str, bool] = {}
+
+def available(name: str) -> bool:
+    """True if `name` can be imported, without importing it (find_spec only; cached)."""
+    with _lock:
+        if name not in _available:
+            try:
+                _available[name] = importlib.util.find_spec(name) is not None
+            except (ImportError, ValueError):
+                _available[name] = False
+        return _available[name]
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a heavy module: the real import happens on first attribute access.
+      requests = lazy_module("requests")     # module load stays cheap
+      requests.get(...)                      # imports requests here
+    Import errors surface at that first use, like a normal import would.
+    """
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> types.ModuleType:
+        mod = self.__dict__["_lazy_target"]
+        if mod is None:
+            with _lock:
+                mod = self.__dict__["_lazy_target"]
+                if mod is None:
+                    mod = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_target"] = mod
+        return mod
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_lazy_target"] is not None
+
+def lazy_module(name: str) -> LazyModule:
+    return LazyModule(name)
+
+def optional_attr(module: str, attr: str) -> Optional[Any]:
+    """`from module import attr`, or None if the module is missing or fails to import."""
+    if not available(module):
+        return None
+    try:
+        return getattr(importlib.import_module(module), attr)
+    except Exception:
+        return None
@@ -1,12 +1,42 @@
 # engine/logrotate.py
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, Executor
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-import gzip, shutil
+from typing import Optional
+import gzip
+import os
+import re
+import shutil
+import threading
 
 from .identity import RegimeFlexIdentity as RF
 from .config import Config
 
+try:
+    import zstandard as zstd
+except ImportError:  # optional codec
+    zstd = None
+
+ARCHIVE_SUFFIXES = (".gz", ".zst")
+ROTATED = re.compile(r"\.r\d{12}$")       # ledger_20251019.r143012123456.jsonl (size-rotated part)
+
+ROTATE_DEFAULTS = {
+    "rotate_on_run": True,
+    "retention_days": 30,
+    "paths": [],
+    "patterns": ["*.jsonl", "*.log"],
+    "max_bytes": 0,          # 0 = rotate by age only
+    "codec": "gzip",         # gzip | zstd (falls back to gzip if zstandard is missing)
+    "level": 6,
+    "workers": 4,
+    "background": True,
+}
+
+def load_rotate_config() -> dict:
+    cfg = Config(".")._load_yaml("config/logs.yaml") if (Config(".").root / "config/logs.yaml").exists() else {}
+    return {**ROTATE_DEFAULTS, **{k: v for k, v in cfg.items() if v is not None}}
+
 def _is_today(p: Path) -> bool:
     try:
         # expect names like ledger_YYYYMMDD.jsonl or timestamps in mtime
@@ -23,58 +53,140 @@ def _is_today(p: Path) -> bool:
     # fallback to mtime
     return datetime.fromtimestamp(p.stat().st_mtime, tz=timezone.utc).date() == datetime.now(timezone.utc).date()
 
-def _gzip_file(p: Path) -> Path:
-    gz = p.with_suffix(p.suffix + ".gz")
-    with p.open("rb") as fin, gzip.open(gz, "wb") as fout:
-        shutil.copyfileobj(fin, fout)
+def _codec(codec: str) -> str:
+    codec = (codec or "gzip").lower()
+    if codec == "zstd" and zstd is None:
+        RF.print_log("Logrotate: zstandard not installed, using gzip", "RISK")
+        return "gzip"
+    return "zstd" if codec == "zstd" else "gzip"
+
+def _compress_file(p: Path, codec: str = "gzip", level: int = 6) -> Path:
+    """Stream p into p.<ext>.tmp, atomically rename to p.<ext>, then drop p."""
+    dst = p.with_suffix(p.suffix + (".zst" if codec == "zstd" else ".gz"))
+    tmp = dst.with_suffix(dst.suffix + ".tmp")
+    try:
+        with p.open("rb") as fin, tmp.open("wb") as raw:
+            if codec == "zstd":
+                with zstd.ZstdCompressor(level=level).stream_writer(raw, closefd=False) as fout:
+                    shutil.copyfileobj(fin, fout, 1 << 20)
+            else:
+                with gzip.GzipFile(filename=p.name, mode="wb", fileobj=raw, compresslevel=level) as fout:
+                    shutil.copyfileobj(fin, fout, 1 << 20)
+        os.replace(tmp, dst)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
     p.unlink()  # remove original after compress
-    return gz
+    return dst
+
+# kept for callers of the old helper
+def _gzip_file(p: Path) -> Path:
+    return _compress_file(p, "gzip")
 
-def rotate_once(dirpath: Path, patterns: list[str], retention_days: int) -> dict:
+def _cut_active(p: Path) -> Path:
+    """Rename an oversized active file aside; writers open by path, so the next append starts a new file."""
+    stamp = "r" + datetime.now(timezone.utc).strftime("%H%M%S%f")
+    part = p.with_name(f"{p.stem}.{stamp}{p.suffix}")
+    os.replace(p, part)
+    return part
+
+def rotate_once(dirpath: Path, patterns: list[str], retention_days: int, max_bytes: int = 0,
+                codec: str = "gzip", level: int = 6, pool: Optional[Executor] = None) -> dict:
+    """
+    One directory scan: expire old archives, compress past-day files, and cut today's
+    files that grew beyond max_bytes. Compression runs on `pool` when given.
+    """
     dirpath.mkdir(parents=True, exist_ok=True)
-    archived, removed = 0, 0
-    now = datetime.now(timezone.utc)
-    cutoff = now - timedelta(days=retention_days)
-
-    # compress non-today files matching patterns
-    for pat in patterns:
-        for p in dirpath.glob(pat):
-            if p.suffix.endswith(".gz"):
-                # enforce retention on gz archives
-                mtime = datetime.fromtimestamp(p.stat().st_mtime, tz=timezone.utc)
-                if mtime < cutoff:
-                    p.unlink()
-                    removed += 1
-                continue
-            # skip today's active files
-            if _is_today(p):
-                continue
-            try:
-                _gzip_file(p)
-                archived += 1
-            except Exception as e:
-                RF.print_log(f"Rotate failed on {p}: {e}", "ERROR")
-
-    # second pass: delete old .gz beyond retention
-    for p in dirpath.glob("*.gz"):
-        mtime = datetime.fromtimestamp(p.stat().st_mtime, tz=timezone.utc)
-        if mtime < cutoff:
-            p.unlink()
-            removed += 1
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).timestamp()
+    removed, to_compress = 0, []
+
+    for entry in os.scandir(dirpath):
+        if not entry.is_file():
+            continue
+        p = Path(entry.path)
+        if p.name.endswith(".tmp"):
+            # leftover from an interrupted compression; the source is still in place
+            p.unlink(missing_ok=True)
+            continue
+        if p.suffix in ARCHIVE_SUFFIXES:
+            if entry.stat().st_mtime < cutoff:
+                p.unlink(missing_ok=True)
+                removed += 1
+            continue
+        if not any(p.match(pat) for pat in patterns):
+            continue
+        if ROTATED.search(p.stem) or not _is_today(p):
+            to_compress.append(p)
+        elif max_bytes and entry.stat().st_size >= max_bytes:
+            to_compress.append(_cut_active(p))
+
+    def _one(p: Path) -> bool:
+        try:
+            _compress_file(p, codec, level)
+            return True
+        except Exception as e:
+            RF.print_log(f"Rotate failed on {p}: {e}", "ERROR")
+            return False
 
+    if pool is None:
+        archived = sum(_one(p) for p in to_compress)
+    else:
+        archived = sum(pool.map(_one, to_compress))
     return {"archived": archived, "removed": removed}
 
-def rotate_all() -> dict:
-    cfg = Config(".")._load_yaml("config/logs.yaml") if (Config(".").root / "config/logs.yaml").exists() else {}
+def rotate_all(cfg: Optional[dict] = None) -> dict:
+    cfg = cfg or load_rotate_config()
     paths = [Path(p) for p in (cfg.get("paths") or [])]
     patterns = list(cfg.get("patterns") or ["*.jsonl", "*.log"])
-    retention = int(cfg.get("retention_days", 30))
+    codec = _codec(cfg.get("codec", "gzip"))
+    level = int(cfg.get("level", 6))
 
     summary = {"archived": 0, "removed": 0, "dirs": 0}
-    for d in paths:
-        res = rotate_once(d, patterns, retention)
-        summary["archived"] += res["archived"]
-        summary["removed"] += res["removed"]
-        summary["dirs"] += 1
+    with ThreadPoolExecutor(max_workers=max(1, int(cfg.get("workers", 4))), thread_name_prefix="rf-rotate") as pool:
+        for d in paths:
+            res = rotate_once(d, patterns, int(cfg.get("retention_days", 30)),
+                              max_bytes=int(cfg.get("max_bytes", 0) or 0), codec=codec, level=level, pool=pool)
+            summary["archived"] += res["archived"]
+            summary["removed"] += res["removed"]
+            summary["dirs"] += 1
     RF.print_log(f"Logrotate → dirs={summary['dirs']} archived={summary['archived']} removed={summary['removed']}", "INFO")
     return summary
+
+# ---------- after-run scheduling ----------
+
+_bg_thread: Optional[threading.Thread] = None
+_bg_lock = threading.Lock()
+
+def _rotate_quietly() -> None:
+    try:
+        rotate_all()
+    except Exception as e:
+        RF.print_log(f"Logrotate failed: {e}", "ERROR")
+
+def schedule_rotation() -> Optional[threading.Thread]:
+    """
+    Rotate per config/logs.yaml once the run is done. In background mode this returns
+    immediately (one rotation at a time; the thread is non-daemon so the process still
+    lets it finish). Returns the thread, or None if rotation ran inline / is disabled.
+    """
+    global _bg_thread
+    cfg = load_rotate_config()
+    if not cfg.get("rotate_on_run", True):
+        return None
+    if not cfg.get("background", True):
+        _rotate_quietly()
+        return None
+    with _bg_lock:
+        if _bg_thread is not None and _bg_thread.is_alive():
+            return _bg_thread
+        _bg_thread = threading.Thread(target=_rotate_quietly, name="rf-logrotate")
+        _bg_thread.start()
+        return _bg_thread
+
+def wait_for_rotation(timeout: Optional[float] = None) -> bool:
+    """Block until a scheduled background rotation finishes; True if none is running."""
+    t = _bg_thread
+    if t is not None:
+        t.join(timeout)
+        return not t.is_alive()
+    return True
@@ -0,0 +1,244 @@
+# engine/pipeline.py
+from __future__ import annotations
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, asdict, is_dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import contextvars
+import copy
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .config import Config
+from .identity import RegimeFlexIdentity as RF
+from .stage_timer import StageTimer
+
+HALT = "halt"   # a stage returning {"halt": reason} stops scheduling of further stages
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One named step of a pipeline.
+      fn(**{k: ctx[k] for k in inputs}) -> {key: value for key in outputs} (+ optional "halt")
+    `after` lists stage names that must finish first without passing data (side-effect ordering).
+    Pure stages are memoized on a digest of their inputs (+ the pipeline salt).
+    """
+    name: str
+    fn: Callable[..., Dict[str, Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    after: Tuple[str, ...] = ()
+    pure: bool = False
+
+def load_pipeline_config() -> dict:
+    cfg = Config(".")
+    return cfg._load_yaml("config/pipeline.yaml") if (cfg.root / "config/pipeline.yaml").exists() else {}
+
+# ---------- input hashing ----------
+
+def _feed(h, value: Any) -> None:
+    if isinstance(value, pd.DataFrame):
+        h.update(b"df:" + "|".join(map(str, value.columns)).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, pd.Series):
+        h.update(b"s:" + str(value.name).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(b"nd:" + str(value.dtype).encode() + str(value.shape).encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif is_dataclass(value) and not isinstance(value, type):
+        h.update(b"dc:" + type(value).__name__.encode())
+        _feed(h, asdict(value))
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for k in sorted(value, key=str):
+            _feed(h, k)
+            _feed(h, value[k])
+        h.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for v in value:
+            _feed(h, v)
+        h.update(b"]")
+    else:
+        h.update(f"{type(value).__name__}:{value!r}".encode())
+
+def digest(*values: Any) -> str:
+    """Stable sha256 over frames, arrays, dataclasses and plain containers."""
+    h = hashlib.sha256()
+    for v in values:
+        _feed(h, v)
+    return h.hexdigest()
+
+# ---------- memo ----------
+
+class StageMemo:
+    """Session-level LRU of pure-stage outputs; callers always get deep copies."""
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = int(maxsize)
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            val = self._data.get(key)
+            if val is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(val)
+
+    def put(self, key: str, outputs: Dict[str, Any]) -> None:
+        val = copy.deepcopy(outputs)
+        with self._lock:
+            self._data[key] = val
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+SESSION_MEMO = StageMemo()
+
+# ---------- pipeline ----------
+
+class Pipeline:
+    """
+    DAG of Stages. A stage becomes ready once the producers of its inputs and its
+    `after` stages have finished; ready stages run concurrently on a thread pool
+    (declaration order breaks ties, max_workers=1 runs inline).
+    Seed keys passed to run() have no producer. Pure stages also wait for the
+    producer of `salt_key` (e.g. the config fingerprint) and mix it into the memo key.
+    """
+    def __init__(self, stages: Iterable[Stage], max_workers: int = 4,
+                 memo: Optional[StageMemo] = None, salt_key: Optional[str] = None):
+        self.stages: List[Stage] = list(stages)
+        self.max_workers = max(1, int(max_workers))
+        self.memo = memo
+        self.salt_key = salt_key
+        self.memo_hits: List[str] = []
+
+        names = [s.name for s in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate stage names in pipeline")
+        self._producer: Dict[str, str] = {}
+        for s in self.stages:
+            for out in s.outputs:
+                if out in self._producer:
+                    raise ValueError(f"Output '{out}' produced by both {self._producer[out]} and {s.name}")
+                self._producer[out] = s.name
+        self._deps: Dict[str, set] = {}
+        for s in self.stages:
+            deps = {self._producer[k] for k in s.inputs if k in self._producer} | set(s.after)
+            if s.pure and salt_key and salt_key in self._producer:
+                deps.add(self._producer[salt_key])
+            unknown = deps - set(names)
+            if unknown:
+                raise ValueError(f"Stage {s.name} depends on unknown stage(s) {sorted(unknown)}")
+            deps.discard(s.name)
+            self._deps[s.name] = deps
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        done: set = set()
+        pending = dict(self._deps)
+        while pending:
+            ready = [n for n, d in pending.items() if d <= done]
+            if not ready:
+                raise ValueError(f"Pipeline has a dependency cycle among {sorted(pending)}")
+            for n in ready:
+                done.add(n)
+                pending.pop(n)
+
+    def _call(self, stage: Stage, ctx: Dict[str, Any], timer: StageTimer) -> Dict[str, Any]:
+        missing = [k for k in stage.inputs if k not in ctx]
+        if missing:
+            raise KeyError(f"Stage {stage.name} missing inputs {missing}")
+        kwargs = {k: ctx[k] for k in stage.inputs}
+        with timer.span(stage.name):
+            key = None
+            if stage.pure and self.memo is not None:
+                salt = ctx.get(self.salt_key) if self.salt_key else None
+                key = f"{stage.name}:{digest(salt, kwargs)}"
+                cached = self.memo.get(key)
+                if cached is not None:
+                    self.memo_hits.append(stage.name)
+                    RF.print_log(f"Stage {stage.name}: inputs unchanged, reusing memoized outputs", "INFO")
+                    return cached
+            out = stage.fn(**kwargs) or {}
+        extra = set(out) - set(stage.outputs) - {HALT}
+        if extra:
+            raise KeyError(f"Stage {stage.name} returned undeclared outputs {sorted(extra)}")
+        if key is not None and HALT not in out:
+            self.memo.put(key, out)
+        return out
+
+    def run(self, seed: Optional[Dict[str, Any]] = None, timer: Optional[StageTimer] = None) -> Dict[str, Any]:
+        """
+        Execute all stages; returns the context (seed + every stage output).
+        If a stage returns {"halt": reason}, in-flight stages finish, nothing new starts,
+        and ctx["halt"] / ctx["halted_by"] say why. Stage exceptions propagate.
+        """
+        ctx: Dict[str, Any] = dict(seed or {})
+        timer = timer or StageTimer(enabled=False)
+        self.memo_hits = []
+        done: set = set()
+        started: set = set()
+        order = {s.name: i for i, s in enumerate(self.stages)}
+        by_name = {s.name: s for s in self.stages}
+
+        def _ready() -> List[Stage]:
+            if HALT in ctx:
+                return []
+            return [by_name[n] for n in sorted(self._deps, key=order.get)
+                    if n not in started and self._deps[n] <= done]
+
+        def _merge(stage: Stage, out: Dict[str, Any]) -> None:
+            if HALT in out and HALT not in ctx:
+                ctx[HALT] = out[HALT]
+                ctx["halted_by"] = stage.name
+            for k in stage.outputs:
+                if k in out:
+                    ctx[k] = out[k]
+            done.add(stage.name)
+
+        if self.max_workers == 1:
+            while True:
+                ready = _ready()
+                if not ready:
+                    break
+                stage = ready[0]
+                started.add(stage.name)
+                _merge(stage, self._call(stage, ctx, timer))
+            return ctx
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="rf-stage") as pool:
+            running: Dict[Any, Stage] = {}
+            while True:
+                for stage in _ready():
+                    started.add(stage.name)
+                    running[pool.submit(contextvars.copy_context().run, self._call, stage, dict(ctx), timer)] = stage
+                if not running:
+                    break
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                error: Optional[BaseException] = None
+                for fut in finished:
+                    stage = running.pop(fut)
+                    try:
+                        _merge(stage, fut.result())
+                    except BaseException as e:
+                        error = error or e
+                if error is not None:
+                    # let in-flight stages finish (they may hold file handles), then surface the first error
+                    wait(list(running))
+                    raise error
+        return ctx
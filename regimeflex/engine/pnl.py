@@ -3,7 +3,9 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from pathlib import Path
 import csv
-from typing import Dict
+import math
+import os
+from typing import Dict, Sequence
 
 from .identity import RegimeFlexIdentity as RF
 
@@ -14,30 +16,53 @@ SNAP_CSV = SNAP_DIR / "daily_snapshot.csv"
 def _utc_date_str() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
-def _ensure_header(path: Path):
-    if path.exists() and path.stat().st_size > 0:
-        return
-    with path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow([
-            "date",
-            "equity_ref",
-            "total_mv",
-            "gross_exposure_pct",
-            # per-symbol pairs will follow (symbol_mv, symbol_w)
-            # we'll keep generic columns for QQQ and PSQ, since that's what we use
-            "QQQ_mv","QQQ_w",
-            "PSQ_mv","PSQ_w",
-        ])
+SNAP_SYMBOLS = ("QQQ", "PSQ")
+
+def _columns(symbols) -> list:
+    # per-symbol pairs follow the totals (symbol_mv, symbol_w)
+    cols = ["date", "equity_ref", "total_mv", "gross_exposure_pct"]
+    for sym in symbols:
+        cols += [f"{sym}_mv", f"{sym}_w"]
+    return cols
+
+def _ensure_header(path: Path, cols: list) -> list:
+    """
+    The file's columns, created/extended so every column in `cols` exists. A row with new
+    symbols rewrites the file (atomically) under the union header — existing columns first,
+    new ones appended, old rows blank in them — so no row is ever written by position.
+    """
+    if not (path.exists() and path.stat().st_size > 0):
+        with path.open("w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerow(cols)
+        return list(cols)
+    with path.open("r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        head = list(reader.fieldnames or [])
+        extra = [c for c in cols if c not in head]
+        if not extra:
+            return head
+        rows = list(reader)
+    union = head + extra
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=union, restval="")
+        w.writeheader()
+        w.writerows(rows)
+    os.replace(tmp, path)
+    RF.print_log(f"Snapshot header extended in {path.name} (+{','.join(extra)})", "RISK")
+    return union
 
 def snapshot_from_positions(positions: Dict[str, float],
                             prices: Dict[str, float],
-                            equity_ref: float) -> Dict[str, float]:
+                            equity_ref: float,
+                            symbols: Sequence[str] = SNAP_SYMBOLS) -> Dict[str, float]:
     """
     Simple valuation snapshot:
       mv_sym = shares * price (signed long-only since ETFs are long positions)
-      total_mv = sum(abs(mv_sym))    # gross
+      gross_exposure_pct = sum(abs(mv_sym)) / equity_ref over every position
+      total_mv = signed net MV over `symbols` (default QQQ, PSQ)
       weights = mv_sym / equity_ref  # as a fraction of reference equity
+    NaN prices count as 0.
     """
     mv = {}
     for sym, sh in positions.items():
@@ -48,49 +73,31 @@ def snapshot_from_positions(positions: Dict[str, float],
 
     total_gross = sum(abs(v) for v in mv.values())
     gross_exposure_pct = (total_gross / equity_ref) if equity_ref > 0 else 0.0
-
-    # Build row dict for our two core symbols; others default to 0
-    qqq_mv = mv.get("QQQ", 0.0)
-    psq_mv = mv.get("PSQ", 0.0)
-    qqq_w  = qqq_mv / equity_ref if equity_ref > 0 else 0.0
-    psq_w  = psq_mv / equity_ref if equity_ref > 0 else 0.0
-
-    # Handle NaN values
-    import math
-    if math.isnan(qqq_mv):
-        qqq_mv = 0.0
-    if math.isnan(psq_mv):
-        psq_mv = 0.0
-    if math.isnan(qqq_w):
-        qqq_w = 0.0
-    if math.isnan(psq_w):
-        psq_w = 0.0
     if math.isnan(gross_exposure_pct):
         gross_exposure_pct = 0.0
 
+    legs: Dict[str, float] = {}
+    for sym in symbols:
+        m = mv.get(sym, 0.0)
+        m = 0.0 if math.isnan(m) else m
+        legs[f"{sym}_mv"] = float(m)
+        legs[f"{sym}_w"] = float(m / equity_ref) if equity_ref > 0 else 0.0
+
     return {
         "date": _utc_date_str(),
         "equity_ref": float(equity_ref),
-        "total_mv": float(qqq_mv + psq_mv),     # signed net MV
+        "total_mv": float(sum(legs[f"{sym}_mv"] for sym in symbols)),     # signed net MV
         "gross_exposure_pct": float(gross_exposure_pct),
-        "QQQ_mv": float(qqq_mv),
-        "QQQ_w": float(qqq_w),
-        "PSQ_mv": float(psq_mv),
-        "PSQ_w": float(psq_w),
+        **legs,
     }
 
-def append_snapshot_csv(row: Dict[str, float]) -> None:
-    _ensure_header(SNAP_CSV)
-    with SNAP_CSV.open("a", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow([
-            row["date"],
-            f"{row['equity_ref']:.2f}",
-            f"{row['total_mv']:.2f}",
-            f"{row['gross_exposure_pct']:.4f}",
-            f"{row['QQQ_mv']:.2f}",
-            f"{row['QQQ_w']:.4f}",
-            f"{row['PSQ_mv']:.2f}",
-            f"{row['PSQ_w']:.4f}",
-        ])
-    RF.print_log(f"Snapshot appended → {SNAP_CSV}", "SUCCESS")
+def append_snapshot_csv(row: Dict[str, float], path: Path | None = None) -> None:
+    """Append a snapshot row by column name; symbols missing from the row stay blank."""
+    path = path or SNAP_CSV
+    header = _ensure_header(path, list(row))
+    cells = {c: (v if c == "date" else
+                 f"{float(v):.4f}" if c.endswith("_w") or c == "gross_exposure_pct" else f"{float(v):.2f}")
+             for c, v in row.items()}
+    with path.open("a", newline="", encoding="utf-8") as f:
+        csv.DictWriter(f, fieldnames=header, restval="").writerow(cells)
+    RF.print_log(f"Snapshot appended → {path}", "SUCCESS")
@@ -11,11 +11,12 @@ from .symnorm import map_keys_upper, sym_upper
 
 FILLS_FILE = Path("logs/trading/fills_state.jsonl")
 
-def _read_fills() -> List[dict]:
-    if not FILLS_FILE.exists():
+def _read_fills(path: Path | None = None) -> List[dict]:
+    path = path or FILLS_FILE
+    if not path.exists():
         return []
     out = []
-    with FILLS_FILE.open("r", encoding="utf-8") as f:
+    with path.open("r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line: continue
@@ -28,6 +29,7 @@ def _read_fills() -> List[dict]:
 def effective_positions_before(
     raw_positions_before: Dict[str, float],
     broker_positions_snapshot: Dict[str, float] | None = None,
+    fills_file: Path | None = None,
 ) -> Tuple[Dict[str, float], str]:
     """
     Returns (positions_effective, note)
@@ -43,7 +45,7 @@ def effective_positions_before(
 
     # 2) Apply last known filled_qty to local view
     eff = map_keys_upper(raw_positions_before)
-    fills = _read_fills()
+    fills = _read_fills(fills_file)
     # Sort by ts to apply in-order
     def _parse_ts(s: str) -> datetime:
         try:
@@ -1,154 +1,148 @@
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
-from .health import run_health   # NEW
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+
+from .health import run_health
+
+CSS_NAME = "report.css"
+RENDER_INDEX = ".render_index.json"
+TEMPLATE_VERSION = "2"   # bump when markup/CSS changes so incremental renders redo every page
+
+REPORT_CSS = """:root{
+  --pass:#10b981; /* emerald */
+  --warn:#f59e0b; /* gold */
+  --fail:#ef4444; /* ruby */
+  --ink:#0f172a;  --panel:#fff; --bg:#f8fafc; --brand:#1a237e;
+}
+body{font-family:Inter,system-ui,Arial,sans-serif;margin:24px;background:var(--bg);color:var(--ink)}
+h1{color:var(--brand);margin:0 0 8px}
+.card{background:var(--panel);border-radius:12px;padding:16px;margin:12px 0;box-shadow:0 1px 3px rgba(0,0,0,.05)}
+.muted{color:#475569} code{background:#e2e8f0;padding:2px 6px;border-radius:6px}
+.banner{padding:10px 14px;border-radius:10px;margin:0 0 14px;font-weight:600;display:inline-block}
+.pass{background:rgba(16,185,129,.10);color:var(--pass);border:1px solid rgba(16,185,129,.35)}
+.warn{background:rgba(245,158,11,.10);color:var(--warn);border:1px solid rgba(245,158,11,.35)}
+.fail{background:rgba(239,68,68,.10);color:var(--fail);border:1px solid rgba(239,68,68,.35)}
+table{border-collapse:collapse;width:100%} th,td{padding:6px 8px;border-bottom:1px solid #e5e7eb;text-align:left}
+.footer{margin-top:18px;font-size:12px;color:#475569}
+.footer code{background:#e2e8f0;padding:1px 4px;border-radius:4px}
+"""
+
+PAGE = (
+    "<!doctype html><html><head><meta charset='utf-8'>"
+    "<meta name='viewport' content='width=device-width, initial-scale=1' />"
+    "<title>RegimeFlex Daily Report</title>"
+    "<link rel='stylesheet' href='{css_href}' />"
+    "</head><body>"
+    "<h1>RegimeFlex Daily Report</h1>"
+    "<div class='muted'>Generated {stamp}</div>"
+    "<div class='banner {health_cls}'>{health_icon} Health: {health}</div>"
+    "{target}{breadcrumbs}{intents}{positions}{snapshot}{footer}"
+    "<div class='muted'>© RegimeFlex</div></body></html>"
+)
+
+def _compile(template: str) -> Callable[[Dict[str, str]], str]:
+    """Split a {field} template once into literal/field parts; rendering is a single join."""
+    parts: List[Tuple[str, Optional[str]]] = [(lit, field) for lit, field, _, _ in Formatter().parse(template)]
+    def render(fields: Dict[str, str]) -> str:
+        out = []
+        for lit, field in parts:
+            out.append(lit)
+            if field is not None:
+                out.append(fields[field])
+        return "".join(out)
+    return render
+
+_render_page = _compile(PAGE)
 
 def _esc(s: str) -> str:
     return (s or "").replace("&","&amp;").replace("<","&lt;").replace(">","&gt;")
 
-def write_daily_html(result: dict, out_dir: str, filename_prefix: str = "daily_report") -> str:
-    Path(out_dir).mkdir(parents=True, exist_ok=True)
-    t = result.get("target", {})
-    bc = result.get("breadcrumbs", {}) or {}
-    intents = result.get("intents", [])
-    pos_after = result.get("positions_after", {})
-    snap = result.get("snapshot", {}) or {}
+def _pct(x) -> str:
+    try: return f"{float(x)*100:.2f}%"
+    except: return "0.00%"
 
-    # NEW: health snapshot for this render
-    health = run_health()
-    hstatus = health.status  # "PASS" | "WARN" | "FAIL"
+# ---------- sections ----------
 
-    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H%MZ")
-    fname = f"{filename_prefix}_{stamp}.html"
-    fpath = Path(out_dir) / fname
-
-    html = []
-    html.append("<!doctype html><html><head><meta charset='utf-8'>")
-    html.append("<meta name='viewport' content='width=device-width, initial-scale=1' />")
-    html.append("<title>RegimeFlex Daily Report</title>")
-    # styles + banner theme
-    html.append("""
-    <style>
-      :root{
-        --pass:#10b981; /* emerald */
-        --warn:#f59e0b; /* gold */
-        --fail:#ef4444; /* ruby */
-        --ink:#0f172a;  --panel:#fff; --bg:#f8fafc; --brand:#1a237e;
-      }
-      body{font-family:Inter,system-ui,Arial,sans-serif;margin:24px;background:var(--bg);color:var(--ink)}
-      h1{color:var(--brand);margin:0 0 8px}
-      .card{background:var(--panel);border-radius:12px;padding:16px;margin:12px 0;box-shadow:0 1px 3px rgba(0,0,0,.05)}
-      .muted{color:#475569} code{background:#e2e8f0;padding:2px 6px;border-radius:6px}
-      .banner{padding:10px 14px;border-radius:10px;margin:0 0 14px;font-weight:600;display:inline-block}
-      .pass{background:rgba(16,185,129,.10);color:var(--pass);border:1px solid rgba(16,185,129,.35)}
-      .warn{background:rgba(245,158,11,.10);color:var(--warn);border:1px solid rgba(245,158,11,.35)}
-      .fail{background:rgba(239,68,68,.10);color:var(--fail);border:1px solid rgba(239,68,68,.35)}
-      table{border-collapse:collapse;width:100%} th,td{padding:6px 8px;border-bottom:1px solid #e5e7eb;text-align:left}
-      .footer{margin-top:18px;font-size:12px;color:#475569}
-      .footer code{background:#e2e8f0;padding:1px 4px;border-radius:4px}
-    </style>
-    """)
-    html.append("</head><body>")
-    html.append("<h1>RegimeFlex Daily Report</h1>")
-    html.append(f"<div class='muted'>Generated {stamp}</div>")
-
-    # NEW: banner
-    cls = "pass" if hstatus=="PASS" else ("warn" if hstatus=="WARN" else "fail")
-    icon = "✅" if hstatus=="PASS" else ("⚠️" if hstatus=="WARN" else "❌")
-    html.append(f"<div class='banner {cls}'>{icon} Health: {hstatus}</div>")
-
-    # Target
-    html.append("<div class='card'>")
-    html.append("<h2>Target</h2>")
-    html.append("<ul>")
-    html.append(f"<li>Direction: <b>{_esc(t.get('direction','FLAT'))}</b></li>")
-    html.append(f"<li>Symbol: <code>{_esc(t.get('symbol','NA'))}</code></li>")
-    html.append(f"<li>Notional: <b>${t.get('dollars',0.0):,.2f}</b></li>")
-    html.append(f"<li>Shares: <b>{t.get('shares',0.0):,.4f}</b></li>")
-    html.append(f"<li class='muted'>Notes: <code>{_esc(t.get('notes',''))}</code></li>")
-    
+def _target_html(result: dict, bc: dict) -> str:
+    t = result.get("target", {})
+    html = ["<div class='card'>", "<h2>Target</h2>", "<ul>",
+            f"<li>Direction: <b>{_esc(t.get('direction','FLAT'))}</b></li>",
+            f"<li>Symbol: <code>{_esc(t.get('symbol','NA'))}</code></li>",
+            f"<li>Notional: <b>${t.get('dollars',0.0):,.2f}</b></li>",
+            f"<li>Shares: <b>{t.get('shares',0.0):,.4f}</b></li>",
+            f"<li class='muted'>Notes: <code>{_esc(t.get('notes',''))}</code></li>"]
     # Show no-op reason if present
-    no_op = bool((result.get("breadcrumbs",{}) or {}).get("no_op", False))
-    if no_op:
-        reason = (result.get("breadcrumbs",{}) or {}).get("no_op_reason","")
-        html.append(f"<div class='muted'>No-op day: <b>{_esc(str(reason))}</b></div>")
-    
-    html.append("</ul>")
-    html.append("</div>")
+    if bool(bc.get("no_op", False)):
+        html.append(f"<div class='muted'>No-op day: <b>{_esc(str(bc.get('no_op_reason','')))}</b></div>")
+    html += ["</ul>", "</div>"]
+    return "".join(html)
+
+def _breadcrumbs_html(result: dict, bc: dict) -> str:
+    html = ["<div class='card'>", "<h2>Breadcrumbs</h2>", "<ul>",
+            f"<li>VIX assumption: <b>{bc.get('vix','?')}</b></li>",
+            f"<li>FOMC blackout: <b>{bc.get('fomc_blackout', False)}</b></li>",
+            f"<li>OPEX: <b>{bc.get('opex', False)}</b></li>",
+            f"<li>Phase: <b>{_esc(str(bc.get('phase','')))}</b></li>",
+            f"<li>Positions source: <b>{_esc(str(bc.get('positions_source','')))}</b></li>",
+            f"<li>Equity (live): <b>${float(bc.get('equity_now',0.0)):.2f}</b></li>",
+            f"<li>Price common date: <b>{_esc(str(bc.get('price_common_date','')))}</b></li>"]
 
-    # Breadcrumbs
-    html.append("<div class='card'>")
-    html.append("<h2>Breadcrumbs</h2>")
-    html.append("<ul>")
-    html.append(f"<li>VIX assumption: <b>{bc.get('vix','?')}</b></li>")
-    html.append(f"<li>FOMC blackout: <b>{bc.get('fomc_blackout', False)}</b></li>")
-    html.append(f"<li>OPEX: <b>{bc.get('opex', False)}</b></li>")
-    html.append(f"<li>Phase: <b>{_esc(str(bc.get('phase','')))}</b></li>")
-    html.append(f"<li>Positions source: <b>{_esc(str(bc.get('positions_source','')))}</b></li>")
-    html.append(f"<li>Equity (live): <b>${float((bc or {}).get('equity_now',0.0)):.2f}</b></li>")
-    html.append(f"<li>Price common date: <b>{_esc(str(bc.get('price_common_date','')))}</b></li>")
-    
     # Show price staleness information
-    stale = (result.get("breadcrumbs",{}) or {}).get("price_stale", False)
-    lag  = (result.get("breadcrumbs",{}) or {}).get("price_staleness_days", 0)
-    note = (result.get("breadcrumbs",{}) or {}).get("price_stale_note", "")
-    
+    stale = bc.get("price_stale", False)
+    lag = bc.get("price_staleness_days", 0)
+    note = bc.get("price_stale_note", "")
     html.append(f"<li>Price staleness: <b>{int(lag)}d</b> <span class='muted'>{_esc(str(note))}</span></li>")
-    
-    html.append(f"<li>Plan reason: <code>{_esc(str(result.get('breadcrumbs',{}).get('plan_reason','')))}</code></li>")
-    html.append(f"<li>Turnover: <b>{float(bc.get('turnover_frac',0.0))*100:.2f}%</b> <span class='muted'>{_esc(str(bc.get('turnover_note','')))}</span></li>")
-    html.append(f"<li>Config hash: <code>{_esc(str(bc.get('config_hash16','')))}</code></li>")
-    html.append(f"<li>Cadence: <b>{'on' if (result.get('breadcrumbs',{}) or {}).get('cadence_enabled') else 'off'}</b> (min {int((result.get('breadcrumbs',{}) or {}).get('cadence_min_days',0))}d)</li>")
-    html.append(f"<li>Min Δ exposure: <b>{result.get('breadcrumbs',{}).get('exposure_min_delta','')}</b></li>")
-    
+    html += [f"<li>Plan reason: <code>{_esc(str(bc.get('plan_reason','')))}</code></li>",
+             f"<li>Turnover: <b>{float(bc.get('turnover_frac',0.0))*100:.2f}%</b> <span class='muted'>{_esc(str(bc.get('turnover_note','')))}</span></li>",
+             f"<li>Config hash: <code>{_esc(str(bc.get('config_hash16','')))}</code>"
+             + (f" <span class='muted'>changed: {_esc(', '.join(bc['config_changed']))}</span>" if bc.get("config_changed") else "")
+             + "</li>",
+             f"<li>Cadence: <b>{'on' if bc.get('cadence_enabled') else 'off'}</b> (min {int(bc.get('cadence_min_days',0))}d)</li>",
+             f"<li>Min Δ exposure: <b>{bc.get('exposure_min_delta','')}</b></li>"]
+
     # TSI (Turnover Stability Index)
-    avg = float((result.get("breadcrumbs",{}) or {}).get("tsi_avg_turnover", 0.0))
-    win = int((result.get("breadcrumbs",{}) or {}).get("tsi_window_days", 7))
-    cnt = int((result.get("breadcrumbs",{}) or {}).get("tsi_days_count", 0))
-    thr = float((result.get("breadcrumbs",{}) or {}).get("tsi_warn_threshold", 0.25))
-    warn = bool((result.get("breadcrumbs",{}) or {}).get("tsi_warn", False))
-    
+    avg = float(bc.get("tsi_avg_turnover", 0.0))
+    win = int(bc.get("tsi_window_days", 7))
+    cnt = int(bc.get("tsi_days_count", 0))
+    thr = float(bc.get("tsi_warn_threshold", 0.25))
+    warn = bool(bc.get("tsi_warn", False))
     html.append(f"<li>TSI (avg {win}d): <b>{avg*100:.2f}%</b> over {cnt} day(s) "
                 f"{'(warn > ' + f'{thr*100:.0f}%' + ')' if warn else ''}</li>")
-    html.append(f"<li>Coalesced flip: <b>{str((result.get('breadcrumbs',{}) or {}).get('coalesced_flip', False))}</b> "
-                f"<span class='muted'>{_esc(str((result.get('breadcrumbs',{}) or {}).get('coalesce_note','')))}</span></li>")
+    html.append(f"<li>Coalesced flip: <b>{str(bc.get('coalesced_flip', False))}</b> "
+                f"<span class='muted'>{_esc(str(bc.get('coalesce_note','')))}</span></li>")
     html.append("</ul>")
-    
-    # Optional: small amber badge if stale
+
     if stale:
         html.append("<div class='banner warn'>⚠️ Data staleness: prices are older than configured threshold</div>")
-    
-    # Optional amber banner if TSI warning
     if warn:
         html.append("<div class='banner warn'>⚠️ Elevated turnover: 7-day average above threshold</div>")
-    
-    # Exposure delta mini-table
-    prev = (result.get("breadcrumbs",{}) or {}).get("prev_exposure", {})
-    des  = (result.get("breadcrumbs",{}) or {}).get("desired_exposure", {})
-    dlt  = (result.get("breadcrumbs",{}) or {}).get("delta_exposure", {})
+
+    # Exposure delta mini-table (dynamic execution pair labels)
+    prev = bc.get("prev_exposure", {})
+    des = bc.get("desired_exposure", {})
+    dlt = bc.get("delta_exposure", {})
     html.append("<h3>Exposure Change</h3>")
     html.append("<table><thead><tr><th>Side</th><th>Prev</th><th>Desired</th><th>Δ</th></tr></thead><tbody>")
-    def pct(x): 
-        try: return f"{float(x)*100:.2f}%"
-        except: return "0.00%"
-    
-    # Use dynamic execution pair labels
-    exec_long = (result.get("breadcrumbs",{}) or {}).get("exec_long","LONG")
-    exec_short = (result.get("breadcrumbs",{}) or {}).get("exec_short","SHORT")
-    sides = [exec_long, exec_short]
-    
-    for side in sides:
+    for side in (bc.get("exec_long", "LONG"), bc.get("exec_short", "SHORT")):
         html.append("<tr>"
                     f"<td>{_esc(side)}</td>"
-                    f"<td>{pct(prev.get(side,0))}</td>"
-                    f"<td>{pct(des.get(side,0))}</td>"
-                    f"<td>{pct(dlt.get(side,0))}</td>"
+                    f"<td>{_pct(prev.get(side,0))}</td>"
+                    f"<td>{_pct(des.get(side,0))}</td>"
+                    f"<td>{_pct(dlt.get(side,0))}</td>"
                     "</tr>")
     html.append("</tbody></table>")
     html.append("</div>")
+    return "".join(html)
 
-    # Intents
-    html.append("<div class='card'><h2>Planned Orders</h2>")
+def _intents_html(intents: list) -> str:
+    html = ["<div class='card'><h2>Planned Orders</h2>"]
     if not intents:
         html.append("<div class='muted'>No orders planned.</div>")
     else:
@@ -164,9 +158,10 @@ def write_daily_html(result: dict, out_dir: str, filename_prefix: str = "daily_r
                         "</tr>")
         html.append("</tbody></table>")
     html.append("</div>")
+    return "".join(html)
 
-    # Positions after
-    html.append("<div class='card'><h2>Positions After</h2>")
+def _positions_html(pos_after: dict) -> str:
+    html = ["<div class='card'><h2>Positions After</h2>"]
     if not pos_after:
         html.append("<div class='muted'>No holdings.</div>")
     else:
@@ -175,40 +170,137 @@ def write_daily_html(result: dict, out_dir: str, filename_prefix: str = "daily_r
             html.append(f"<li><code>{_esc(str(sym))}</code> — {float(sh):.4f} shares</li>")
         html.append("</ul>")
     html.append("</div>")
+    return "".join(html)
 
-    # Snapshot
-    html.append("<div class='card'><h2>Daily Snapshot</h2>")
+def _snapshot_html(snap: dict) -> str:
+    html = ["<div class='card'><h2>Daily Snapshot</h2>"]
     if not snap:
         html.append("<div class='muted'>No snapshot available.</div>")
     else:
-        html.append("<ul>")
-        html.append(f"<li>Date (UTC): <b>{_esc(str(snap.get('date','')))}</b></li>")
-        html.append(f"<li>Equity (ref): <b>${float(snap.get('equity_ref',0.0)):.2f}</b></li>")
-        html.append(f"<li>Total MV (net): <b>${float(snap.get('total_mv',0.0)):.2f}</b></li>")
-        html.append(f"<li>Gross Exposure: <b>{float(snap.get('gross_exposure_pct',0.0))*100:.2f}%</b></li>")
-        html.append("</ul>")
-        html.append("<h3>By Symbol</h3>")
-        html.append("<ul>")
-        html.append(f"<li>QQQ — MV: ${float(snap.get('QQQ_mv',0.0)):.2f} | Wgt: {float(snap.get('QQQ_w',0.0))*100:.2f}%</li>")
-        html.append(f"<li>PSQ — MV: ${float(snap.get('PSQ_mv',0.0)):.2f} | Wgt: {float(snap.get('PSQ_w',0.0))*100:.2f}%</li>")
-        html.append("</ul>")
+        html += ["<ul>",
+                 f"<li>Date (UTC): <b>{_esc(str(snap.get('date','')))}</b></li>",
+                 f"<li>Equity (ref): <b>${float(snap.get('equity_ref',0.0)):.2f}</b></li>",
+                 f"<li>Total MV (net): <b>${float(snap.get('total_mv',0.0)):.2f}</b></li>",
+                 f"<li>Gross Exposure: <b>{float(snap.get('gross_exposure_pct',0.0))*100:.2f}%</b></li>",
+                 "</ul>",
+                 "<h3>By Symbol</h3>",
+                 "<ul>",
+                 f"<li>QQQ — MV: ${float(snap.get('QQQ_mv',0.0)):.2f} | Wgt: {float(snap.get('QQQ_w',0.0))*100:.2f}%</li>",
+                 f"<li>PSQ — MV: ${float(snap.get('PSQ_mv',0.0)):.2f} | Wgt: {float(snap.get('PSQ_w',0.0))*100:.2f}%</li>",
+                 "</ul>"]
     html.append("</div>")
+    return "".join(html)
 
-    # Footer: duration + versions
-    bc = result.get("breadcrumbs",{}) or {}
+def _footer_html(bc: dict) -> str:
+    # duration + versions
     dur = float(bc.get("run_duration_sec", 0.0))
     vers = bc.get("versions", {}) or {}
-    html.append("<div class='footer'>")
-    html.append(f"⏱️ Run duration: <b>{dur:.3f}s</b><br/>")
+    html = ["<div class='footer'>", f"⏱️ Run duration: <b>{dur:.3f}s</b><br/>"]
     if vers:
-        html.append("🔧 Runtime: ")
-        html.append(f"<code>python {vers.get('python','')}</code> · ")
-        html.append(f"<code>pandas {vers.get('pandas','')}</code> · ")
-        html.append(f"<code>numpy {vers.get('numpy','')}</code> · ")
-        html.append(f"<code>alpaca_trade_api {vers.get('alpaca_trade_api','')}</code> · ")
-        html.append(f"<code>python-telegram-bot {vers.get('python_telegram_bot','')}</code>")
+        html += ["🔧 Runtime: ",
+                 f"<code>python {vers.get('python','')}</code> · ",
+                 f"<code>pandas {vers.get('pandas','')}</code> · ",
+                 f"<code>numpy {vers.get('numpy','')}</code> · ",
+                 f"<code>alpaca_trade_api {vers.get('alpaca_trade_api','')}</code> · ",
+                 f"<code>python-telegram-bot {vers.get('python_telegram_bot','')}</code>"]
     html.append("</div>")
+    return "".join(html)
+
+# ---------- rendering ----------
 
-    html.append("<div class='muted'>© RegimeFlex</div></body></html>")
-    fpath.write_text("".join(html), encoding="utf-8")
+def render_daily_html(result: dict, health_status: str, stamp: Optional[str] = None, css_href: str = CSS_NAME) -> str:
+    """Pure render of one report page (no I/O); styles come from the shared stylesheet."""
+    bc = result.get("breadcrumbs", {}) or {}
+    stamp = stamp or datetime.now(timezone.utc).strftime("%Y-%m-%d_%H%MZ")
+    return _render_page({
+        "css_href": css_href,
+        "stamp": stamp,
+        "health": health_status,
+        "health_cls": "pass" if health_status == "PASS" else ("warn" if health_status == "WARN" else "fail"),
+        "health_icon": "✅" if health_status == "PASS" else ("⚠️" if health_status == "WARN" else "❌"),
+        "target": _target_html(result, bc),
+        "breadcrumbs": _breadcrumbs_html(result, bc),
+        "intents": _intents_html(result.get("intents", [])),
+        "positions": _positions_html(result.get("positions_after", {})),
+        "snapshot": _snapshot_html(result.get("snapshot", {}) or {}),
+        "footer": _footer_html(bc),
+    })
+
+def write_report_css(out_dir: str) -> Path:
+    """Emit the shared stylesheet once per output directory (rewritten only if it changed)."""
+    path = Path(out_dir) / CSS_NAME
+    if not path.exists() or path.read_text(encoding="utf-8") != REPORT_CSS:
+        path.write_text(REPORT_CSS, encoding="utf-8")
+    return path
+
+def write_daily_html(result: dict, out_dir: str, filename_prefix: str = "daily_report",
+                     filename: Optional[str] = None, health_status: Optional[str] = None) -> str:
+    """
+    Render one report into out_dir. `filename` overrides the timestamped name;
+    `health_status` skips the (cached) health lookup when the caller already has it.
+    """
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    write_report_css(out_dir)
+    hstatus = health_status or run_health().status  # "PASS" | "WARN" | "FAIL"
+    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H%MZ")
+    fpath = Path(out_dir) / (filename or f"{filename_prefix}_{stamp}.html")
+    fpath.write_text(render_daily_html(result, hstatus, stamp), encoding="utf-8")
     return str(fpath)
+
+def input_hash(result: dict, health_status: str) -> str:
+    payload = json.dumps({"v": TEMPLATE_VERSION, "health": health_status, "result": result},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_render_index(out_dir: str) -> Dict[str, str]:
+    """filename → input hash of the last successful render in out_dir."""
+    path = Path(out_dir) / RENDER_INDEX
+    try:
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    except ValueError:
+        return {}
+
+def save_render_index(out_dir: str, index: Dict[str, str]) -> None:
+    path = Path(out_dir) / RENDER_INDEX
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+
+def pending_pages(items: Iterable[Tuple[str, dict]], out_dir: str, health_status: str,
+                  index: Dict[str, str], incremental: bool = True) -> Tuple[List[Tuple[str, dict, str]], int]:
+    """(filename, result, hash) still to render, and how many were skipped as unchanged."""
+    todo, skipped = [], 0
+    for fname, result in items:
+        h = input_hash(result, health_status)
+        if incremental and index.get(fname) == h and (Path(out_dir) / fname).exists():
+            skipped += 1
+            continue
+        todo.append((fname, result, h))
+    return todo, skipped
+
+def render_batch(items: Iterable[Tuple[str, dict]], out_dir: str, health_status: Optional[str] = None,
+                 workers: int = 4, incremental: bool = True) -> Dict[str, int]:
+    """
+    Render many (filename, result) pages into out_dir on a thread pool.
+    With incremental=True a page is skipped when its file exists and its input hash matches
+    the one recorded in out_dir/.render_index.json. Health is looked up once for the batch.
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    write_report_css(out_dir)
+    hstatus = health_status or run_health().status
+    index = load_render_index(out_dir)
+    todo, skipped = pending_pages(items, out_dir, hstatus, index, incremental)
+
+    lock = threading.Lock()
+    def _one(item) -> None:
+        fname, result, h = item
+        (out / fname).write_text(render_daily_html(result, hstatus), encoding="utf-8")
+        with lock:
+            index[fname] = h
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="rf-report") as pool:
+            list(pool.map(_one, todo))
+        save_render_index(out_dir, index)
+    return {"rendered": len(todo), "skipped": skipped}
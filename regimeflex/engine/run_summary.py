@@ -6,7 +6,7 @@ from typing import Dict, Any
 
 RUN_SUM_FILE = Path("logs/audit/run_summaries.jsonl")
 
-def append_run_summary(result: Dict[str, Any]) -> str:
+def append_run_summary(result: Dict[str, Any], path: Path | None = None) -> str:
     bc = (result.get("breadcrumbs") or {})
     tgt = (result.get("target") or {})
 
@@ -29,13 +29,15 @@ def append_run_summary(result: Dict[str, Any]) -> str:
         "price_stale": bc.get("price_stale", False),
         "price_staleness_days": bc.get("price_staleness_days", 0),
         "run_duration_sec": bc.get("run_duration_sec", 0.0),
+        "stage_timings": bc.get("stage_timings") or {},
         "target_symbol": tgt.get("symbol") or "",
         "target_direction": tgt.get("direction") or "",
         "target_dollars": tgt.get("dollars", 0.0),
         "target_shares": tgt.get("shares", 0.0),
     }
 
-    RUN_SUM_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with RUN_SUM_FILE.open("a", encoding="utf-8") as f:
+    path = path or RUN_SUM_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
         f.write(json.dumps(doc) + "\n")
-    return str(RUN_SUM_FILE)
+    return str(path)
@@ -0,0 +1,171 @@
+# engine/sim.py
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from .config import Config, frozen_config
+from .exposure import exposure_allocator_series, compute_sma
+from .guardrails import enforce_exposure_caps
+from .fills import FillModel, simulate_fills, fills_to_position_deltas
+from .costs import adv_series, load_cost_config
+from .positions import merge_fills
+from .compact import day_numbers
+from .symnorm import sym_upper
+from .pipeline import Pipeline, Stage
+from .daily_stages import decision_stages, subgraph, target_exposure, PLANNING_STAGES
+from .backtest import _metrics
+
+# Event-driven replay of the live decision: every simulated day runs the same planning
+# stages as run_daily_offline (target → exposure → turnover → plan → cadence → delta filter
+# → coalesce → decide) on that day's allocator output, closes and in-memory positions.
+# Allocations come from exposure_allocator_series (identical to the per-day allocator),
+# fills go through the runner's fill engine at each leg's bar, and nothing is written to disk.
+
+@dataclass(frozen=True)
+class SimConfig:
+    start_equity: float = 25_000.0
+    min_trade_value: float = 200.0
+    minutes_to_close: int = 15
+    start: Optional[str] = None       # first traded date (earlier bars still feed the signals)
+    end: Optional[str] = None
+    equity_mode: str = "mark"         # "mark": cash + positions at the close; "fixed": start_equity daily
+    fill_model: Optional[FillModel] = None   # None → risk.yaml costs + broker.yaml fill_model (same as the runner)
+    quiet: bool = True                # swallow the stages' console logging
+
+@dataclass(frozen=True)
+class SimResult:
+    equity_curve: pd.Series
+    days: pd.DataFrame                # one row per simulated day (allocation, intents, no-op reason)
+    fills: pd.DataFrame               # one row per simulated fill
+    trades: int
+    cagr: float
+    max_dd: float
+    sharpe: float
+    sec_per_day: float
+
+def stage_sim_target(alloc_raw: dict, sides: list, last_prices_map: dict, equity: float) -> dict:
+    return target_exposure(alloc_raw, sides, last_prices_map[sides[0]], last_prices_map[sides[1]], equity)
+
+def sim_stages() -> List[Stage]:
+    """The live planning subgraph; only the target stage reads the day's closes instead of whole frames."""
+    stages = subgraph(decision_stages(universe=False), PLANNING_STAGES)
+    return [replace(s, fn=stage_sim_target, inputs=("alloc_raw", "sides", "last_prices_map", "equity"))
+            if s.name == "target" else s for s in stages]
+
+def _calendar(sig_df: pd.DataFrame, long_df: pd.DataFrame, short_df: pd.DataFrame):
+    """Positions (into each frame) of the UTC days on which all three have a bar."""
+    ds, dl, dh = day_numbers(sig_df.index), day_numbers(long_df.index), day_numbers(short_df.index)
+    common = np.intersect1d(np.intersect1d(ds, dl), dh)
+    return common, np.searchsorted(ds, common), np.searchsorted(dl, common), np.searchsorted(dh, common)
+
+def run_sim(sig_df: pd.DataFrame, long_df: pd.DataFrame, short_df: pd.DataFrame, sides: List[str],
+            cfg: SimConfig = SimConfig()) -> SimResult:
+    """
+    Replay history through the live planning stages. sig_df drives the allocator (as-of each
+    day), long_df/short_df price the execution pair `sides` = [LONG, SHORT].
+    """
+    sides = [sym_upper(s) for s in sides]
+    LONG, SHORT = sides
+    exec_map = {"long": LONG, "short": SHORT}
+    out = contextlib.redirect_stdout(io.StringIO()) if cfg.quiet else contextlib.nullcontext()
+    with out, frozen_config():
+        exp = Config(".")._load_yaml("config/exposure.yaml")
+        slow_ma = int(exp["trend"]["slow_ma"])
+        allocs = exposure_allocator_series(sig_df)
+        slow = compute_sma(sig_df, slow_ma).to_numpy()
+
+        days, i_sig, i_long, i_short = _calendar(sig_df, long_df, short_df)
+        px_long = long_df["close"].to_numpy(dtype=float)[i_long]
+        px_short = short_df["close"].to_numpy(dtype=float)[i_short]
+        bar_cols = ("volume", "high", "low")
+        bars_long = {c: long_df[c].to_numpy(dtype=float)[i_long] for c in bar_cols if c in long_df.columns}
+        bars_short = {c: short_df[c].to_numpy(dtype=float)[i_short] for c in bar_cols if c in short_df.columns}
+        model = cfg.fill_model or FillModel.from_config()
+        adv_days = int(load_cost_config()["adv_days"])
+        adv_long = adv_series(long_df, adv_days)[i_long]
+        adv_short = adv_series(short_df, adv_days)[i_short]
+        dates = list(sig_df.index[i_sig])
+        keep = (i_sig + 1 >= slow_ma) & ~np.isnan(slow[i_sig])
+        if cfg.start:
+            keep &= days >= day_numbers(pd.DatetimeIndex([pd.Timestamp(cfg.start)]))[0]
+        if cfg.end:
+            keep &= days <= day_numbers(pd.DatetimeIndex([pd.Timestamp(cfg.end)]))[0]
+
+        planning = Pipeline(sim_stages(), max_workers=1)
+        positions: Dict[str, float] = {}
+        cash = float(cfg.start_equity)
+        last_trade: Dict[str, int] = {}
+        rows: List[Dict[str, Any]] = []
+        fill_rows: List[Dict[str, Any]] = []
+        nav_dates, navs = [], []
+
+        t0 = time.perf_counter()
+        for k in np.flatnonzero(keep):
+            day = int(days[k])
+            prices = {LONG: float(px_long[k]), SHORT: float(px_short[k])}
+            nav = cash + sum(sh * prices.get(sym, 0.0) for sym, sh in positions.items())
+            equity = nav if cfg.equity_mode == "mark" else float(cfg.start_equity)
+            alloc_raw, _ = enforce_exposure_caps(allocs[i_sig[k]], limits=exp.get("limits"))
+
+            ctx = planning.run({
+                "alloc_raw": alloc_raw,
+                "sides": sides,
+                "exec_map": exec_map,
+                "equity": equity,
+                "last_prices_map": prices,
+                "adv": {LONG: float(adv_long[k]), SHORT: float(adv_short[k])},
+                "price_info": {"price_common_date": "", "price_staleness_days": 0,
+                               "price_stale": False, "price_stale_note": "fresh"},
+                "positions_before": dict(positions),
+                "positions_source": "sim",
+                "minutes_to_close": int(cfg.minutes_to_close),
+                "min_trade_value": float(cfg.min_trade_value),
+                "t0": time.perf_counter(),
+                "days_since": lambda sym: (day - last_trade[sym]) if sym in last_trade else None,
+            })
+
+            intents = ctx.get("intents") or []
+            if intents:
+                bars = {LONG: {c: a[k] for c, a in bars_long.items()},
+                        SHORT: {c: a[k] for c, a in bars_short.items()}}
+                fills = simulate_fills(intents, prices=prices, bars=bars, model=model)
+                positions = merge_fills(positions, fills_to_position_deltas(fills))
+                for f in fills:
+                    signed = f.qty if f.side == "BUY" else -f.qty
+                    cash -= signed * f.price + float(model.cost.fees(f.qty))
+                    last_trade[f.symbol] = day
+                    fill_rows.append({"date": dates[k], "symbol": f.symbol, "side": f.side,
+                                      "qty": f.qty, "price": f.price, "note": f.note})
+
+            nav = cash + sum(sh * prices.get(sym, 0.0) for sym, sh in positions.items())
+            decide = ctx.get("crumbs_decide") or {}
+            rows.append({
+                "date": dates[k],
+                "alloc_long": float(ctx["alloc_capped"][LONG]),
+                "alloc_short": float(ctx["alloc_capped"][SHORT]),
+                "turnover_frac": float(ctx["turnover"]["turnover_frac"]),
+                "n_intents": len(intents),
+                "no_op_reason": decide.get("no_op_reason", "") or
+                                (ctx.get("crumbs_delta") or {}).get("no_op_reason", ""),
+                "nav": nav,
+            })
+            nav_dates.append(dates[k])
+            navs.append(nav)
+        elapsed = time.perf_counter() - t0
+
+    curve = pd.Series(navs, index=pd.DatetimeIndex(nav_dates, name="date"), dtype=float)
+    cagr, max_dd, sharpe = _metrics(curve)
+    return SimResult(
+        equity_curve=curve,
+        days=pd.DataFrame(rows),
+        fills=pd.DataFrame(fill_rows, columns=["date", "symbol", "side", "qty", "price", "note"]),
+        trades=len(fill_rows),
+        cagr=cagr, max_dd=max_dd, sharpe=sharpe,
+        sec_per_day=elapsed / max(len(rows), 1),
+    )
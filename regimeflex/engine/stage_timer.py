@@ -0,0 +1,139 @@
+# engine/stage_timer.py
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator
+import threading
+import time
+import tracemalloc
+
+from .config import Config
+from .identity import RegimeFlexIdentity as RF
+
+PROFILE_DIR = Path("logs/profiles")
+
+@dataclass
+class StageStat:
+    wall_ms: float = 0.0
+    cpu_ms: float = 0.0
+    alloc_kb: float = 0.0     # net traced allocation (only when track_allocations=true)
+    calls: int = 0
+
+def load_profiling_config() -> dict:
+    cfg = Config(".")
+    return cfg._load_yaml("config/profiling.yaml") if (cfg.root / "config/profiling.yaml").exists() else {}
+
+class StageTimer:
+    """
+    Lightweight span recorder for the daily cycle.
+      with timer.span("allocator"): ...
+    Records wall time (perf_counter), CPU time of the calling thread (thread_time)
+    and, if enabled, net tracemalloc allocation per named stage.
+    Repeated spans with the same name accumulate.
+    """
+    def __init__(self, enabled: bool = True, track_allocations: bool = False,
+                 cprofile: bool = False, tracemalloc_top: int = 0, out_dir: Path = PROFILE_DIR):
+        self.enabled = enabled
+        self.track_allocations = track_allocations
+        self.cprofile = cprofile
+        self.tracemalloc_top = int(tracemalloc_top)
+        self.out_dir = Path(out_dir)
+        self._stats: Dict[str, StageStat] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "StageTimer":
+        cfg = load_profiling_config()
+        dump = (cfg.get("dump") or {})
+        return cls(
+            enabled=bool(cfg.get("stage_timings", True)),
+            track_allocations=bool(cfg.get("track_allocations", False)),
+            cprofile=bool(dump.get("cprofile", False)),
+            tracemalloc_top=int(dump.get("tracemalloc_top", 0)),
+            out_dir=Path(dump.get("out_dir", str(PROFILE_DIR))),
+        )
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        tracing = self.track_allocations and tracemalloc.is_tracing()
+        m0 = tracemalloc.get_traced_memory()[0] if tracing else 0
+        c0 = time.thread_time()
+        w0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = (time.perf_counter() - w0) * 1000.0
+            cpu = (time.thread_time() - c0) * 1000.0
+            alloc = ((tracemalloc.get_traced_memory()[0] - m0) / 1024.0) if tracing else 0.0
+            with self._lock:
+                st = self._stats.setdefault(name, StageStat())
+                st.wall_ms += wall
+                st.cpu_ms += cpu
+                st.alloc_kb += alloc
+                st.calls += 1
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """{stage: {wall_ms, cpu_ms[, alloc_kb]}} in first-recorded order, rounded for JSON."""
+        out: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for name, st in self._stats.items():
+                row = {"wall_ms": round(st.wall_ms, 3), "cpu_ms": round(st.cpu_ms, 3)}
+                if self.track_allocations:
+                    row["alloc_kb"] = round(st.alloc_kb, 1)
+                if st.calls > 1:
+                    row["calls"] = st.calls
+                out[name] = row
+        return out
+
+    def slowest(self, n: int = 3) -> list[tuple[str, float]]:
+        with self._lock:
+            items = [(k, v.wall_ms) for k, v in self._stats.items()]
+        return sorted(items, key=lambda kv: kv[1], reverse=True)[:n]
+
+    @contextmanager
+    def profile(self, label: str = "run") -> Iterator[None]:
+        """
+        Opt-in whole-run dumps (config/profiling.yaml → dump):
+          - cprofile: writes <out_dir>/<label>_<ts>.prof (open with snakeviz / pstats)
+          - tracemalloc_top: writes the top-N allocation sites to <label>_<ts>_alloc.txt
+        Also starts tracemalloc when track_allocations=true so spans can read it.
+        """
+        prof = None
+        started_tm = False
+        if (self.track_allocations or self.tracemalloc_top > 0) and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tm = True
+        if self.cprofile:
+            import cProfile
+            prof = cProfile.Profile()
+            prof.enable()
+        try:
+            yield
+        finally:
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+            if prof is not None:
+                prof.disable()
+                try:
+                    self.out_dir.mkdir(parents=True, exist_ok=True)
+                    path = self.out_dir / f"{label}_{stamp}.prof"
+                    prof.dump_stats(str(path))
+                    RF.print_log(f"cProfile dump → {path}", "INFO")
+                except Exception as e:
+                    RF.print_log(f"cProfile dump failed: {e}", "ERROR")
+            if self.tracemalloc_top > 0 and tracemalloc.is_tracing():
+                try:
+                    snap = tracemalloc.take_snapshot()
+                    top = snap.statistics("lineno")[: self.tracemalloc_top]
+                    self.out_dir.mkdir(parents=True, exist_ok=True)
+                    path = self.out_dir / f"{label}_{stamp}_alloc.txt"
+                    path.write_text("\n".join(str(s) for s in top) + "\n", encoding="utf-8")
+                    RF.print_log(f"tracemalloc top-{self.tracemalloc_top} → {path}", "INFO")
+                except Exception as e:
+                    RF.print_log(f"tracemalloc dump failed: {e}", "ERROR")
+            if started_tm:
+                tracemalloc.stop()
@@ -0,0 +1,62 @@
+# engine/statcache.py
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+import copy
+import os
+import threading
+import time
+
+StatKey = Tuple[int, int, int]   # (size, mtime_ns, inode)
+
+def stat_key(path: Path) -> StatKey:
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+class StatCache:
+    """
+    path → loaded value, reused while the file's (size, mtime_ns, inode) is unchanged.
+    Callers get `copier(value)` so cached objects are never mutated in place.
+    Files modified within `settle_sec` are not cached: a second write inside the same
+    filesystem timestamp tick could otherwise go unnoticed.
+    """
+    def __init__(self, loader: Callable[[Path], Any], copier: Callable[[Any], Any] = copy.deepcopy,
+                 settle_sec: float = 1.0):
+        self._loader = loader
+        self._copier = copier
+        self._settle_ns = int(settle_sec * 1e9)
+        self._data: Dict[str, Tuple[StatKey, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: Path) -> Any:
+        key = os.path.abspath(path)
+        sk = stat_key(path)   # FileNotFoundError propagates like open() would
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None and hit[0] == sk:
+                self.hits += 1
+                value = hit[1]
+            else:
+                self.misses += 1
+                value = None
+        if value is not None:
+            return self._copier(value)
+        value = self._loader(Path(path))
+        if time.time_ns() - sk[1] > self._settle_ns:
+            with self._lock:
+                self._data[key] = (sk, value)
+            return self._copier(value)
+        return value
+
+    def peek(self, path: Path) -> Optional[StatKey]:
+        """Stat key of the cached entry for path (None if not cached)."""
+        with self._lock:
+            hit = self._data.get(os.path.abspath(path))
+        return hit[0] if hit else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
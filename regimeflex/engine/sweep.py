@@ -0,0 +1,126 @@
+# engine/sweep.py
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+import multiprocessing
+import pandas as pd
+
+from .identity import RegimeFlexIdentity as RF
+from .backtest import run_backtest, BTConfig, BTResult
+from .bt_cache import backtest_cache, data_key, result_key
+from .compact import SharedSpec, attach_panel, compact_frames, load_compact_config, share_panel
+
+DEFAULT_GRID = {
+    "z_len": [15, 20, 25],
+    "z_entry_bull": [-1.8, -2.0, -2.2],
+    "z_entry_bear": [1.8, 2.0, 2.2],
+}
+
+def make_sweep_config(z_len: int, z_entry_bull: float, z_entry_bear: float) -> BTConfig:
+    """The BTConfig used for one MR grid point (frictions match sweep_preview)."""
+    return BTConfig(
+        start_cash=25_000.0,
+        vix_assumption=None,
+        min_trade_value=200.0,
+        commission_per_share=0.005,
+        fixed_fee_per_trade=0.00,
+        slippage_bps=10.0,
+        trend_params={},  # keep defaults
+        mr_params={
+            "z_len": z_len,
+            "z_entry_bull": z_entry_bull,
+            "z_exit_bull": 0.0,
+            "z_entry_bear": z_entry_bear,
+            "z_exit_bear": 0.0,
+            "vol_confirm_mult": 1.2
+        }
+    )
+
+def _point(qqq: pd.DataFrame, psq: pd.DataFrame, zlen: int, zbull: float, zbear: float) -> BTResult:
+    # the sweep looks up / stores results itself (one data digest for the whole grid)
+    return run_backtest(qqq, psq, make_sweep_config(zlen, zbull, zbear), cache=False)
+
+def _row(zlen: int, zbull: float, zbear: float, res: BTResult) -> Dict[str, Any]:
+    return {
+        "z_len": zlen,
+        "z_entry_bull": zbull,
+        "z_entry_bear": zbear,
+        "trades": res.trades,
+        "cagr": res.cagr,
+        "maxdd": res.max_dd,
+        "sharpe": res.sharpe
+    }
+
+# per-worker bars over the shared block (views for float64 blocks), set by the pool initializer
+_WORKER_BARS: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+_WORKER_SHARED = None   # keeps the mapping alive for the worker's lifetime
+
+def _attach_worker(spec: SharedSpec) -> None:
+    global _WORKER_BARS, _WORKER_SHARED
+    _WORKER_SHARED = attach_panel(spec)
+    _WORKER_BARS = (_WORKER_SHARED.panel.frame("QQQ"), _WORKER_SHARED.panel.frame("PSQ"))
+
+def _worker_points(points: List[Tuple[int, float, float]]) -> List[BTResult]:
+    qqq, psq = _WORKER_BARS
+    return [_point(qqq, psq, *p) for p in points]
+
+def run_sweep(qqq: pd.DataFrame, psq: pd.DataFrame,
+              z_lens: Iterable[int] = DEFAULT_GRID["z_len"],
+              z_bull_entries: Iterable[float] = DEFAULT_GRID["z_entry_bull"],
+              z_bear_entries: Iterable[float] = DEFAULT_GRID["z_entry_bear"],
+              workers: int = 1, compact: Optional[bool] = None, cache: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Backtest every (z_len, z_entry_bull, z_entry_bear) point; returns one row per point with MAR.
+    Points already in the backtest cache (engine/bt_cache.py; cache=None → data.yaml) are read
+    back, so growing a grid only computes the new points.
+    workers > 1 spreads the grid over a process pool: the bars go into one shared-memory
+    block (float32 prices when compact / data.yaml compact.enabled, else float64) that each
+    worker attaches to read-only instead of receiving its own pickled copy.
+    """
+    points = list(product(z_lens, z_bull_entries, z_bear_entries))
+    store = backtest_cache(cache)
+    results: Dict[Tuple[int, float, float], BTResult] = {}
+    keys: Dict[Tuple[int, float, float], str] = {}
+    if store is not None:
+        dkey = data_key(qqq, psq)
+        for p in points:
+            keys[p] = result_key(dkey, make_sweep_config(*p))
+            hit = store.get(keys[p])
+            if hit is not None:
+                results[p] = hit
+        if results:
+            RF.print_log(f"Sweep: {len(results)} of {len(points)} point(s) from the backtest cache", "INFO")
+    todo = [p for p in points if p not in results]
+
+    storable = True
+    if int(workers) <= 1 or len(todo) <= 1:
+        fresh = [_point(qqq, psq, *p) for p in todo]
+    else:
+        ccfg = load_compact_config()
+        compact = bool(ccfg["enabled"]) if compact is None else bool(compact)
+        # results from float32 bars are not the float64 backtest the cache key describes
+        storable = not compact
+        panel = compact_frames({"QQQ": qqq, "PSQ": psq},
+                               price_dtype=str(ccfg["price_dtype"]) if compact else "float64",
+                               tol=float(ccfg["tol"]))
+        n = min(int(workers), len(todo))
+        batches = [todo[i::n] for i in range(n)]
+        with share_panel(panel) as shared:
+            # forkserver for the same reason as the backfill renderer (parent may hold threads)
+            ctx = multiprocessing.get_context("forkserver")
+            with ProcessPoolExecutor(max_workers=n, mp_context=ctx,
+                                     initializer=_attach_worker, initargs=(shared.spec,)) as pool:
+                done = list(pool.map(_worker_points, batches))
+        by_point = {p: r for batch, out in zip(batches, done) for p, r in zip(batch, out)}
+        fresh = [by_point[p] for p in todo]
+
+    for p, res in zip(todo, fresh):
+        results[p] = res
+        if store is not None and storable:
+            store.put(keys[p], res, make_sweep_config(*p), dkey)
+
+    df = pd.DataFrame([_row(*p, results[p]) for p in points])
+    if not df.empty:
+        df["mar"] = df["cagr"] / (df["maxdd"].replace(0, 1e-9))
+    return df
@@ -1,46 +1,237 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Awaitable, Callable, Optional, Dict, Any, List
 from datetime import datetime
 import asyncio
+import atexit
+import threading
 
 from .identity import RegimeFlexIdentity as RF
+from .config import Config
+from .lazy import available, optional_attr
 
-try:
-    from telegram import Bot
-except Exception:  # library not installed or env missing; we'll dry-run
-    Bot = None  # type: ignore
+# python-telegram-bot is only imported when a live message is actually sent;
+# if it is missing we dry-run
 
 @dataclass(frozen=True)
 class TGCreds:
     token: Optional[str]
     chat_id: Optional[str]
 
-class Notifier:
-    def __init__(self, creds: TGCreds):
+QUEUE_DEFAULTS = {
+    "async_send": True,       # enqueue and return; delivery happens on the notifier thread
+    "max_queue": 100,         # bounded; when full the oldest pending message is dropped
+    "coalesce_ms": 750,       # messages arriving within this window go out as one
+    "max_retries": 3,
+    "backoff_sec": 1.0,       # doubles per retry (Telegram RetryAfter wins when given)
+    "flush_timeout_sec": 10,  # atexit / explicit flush() wait
+}
+
+TG_MAX_CHARS = 4000           # Telegram hard limit is 4096
+BATCH_SEP = "\n\n"
+
+def load_queue_config() -> Dict[str, Any]:
+    tele = (Config(".").telemetry or {}) if (Config(".").root / "config/telemetry.yaml").exists() else {}
+    return {**QUEUE_DEFAULTS, **(tele.get("queue") or {})}
+
+class NotifierService:
+    """
+    One long-lived asyncio loop on a daemon thread for outbound Telegram messages.
+      submit(text)  — thread-safe, never blocks; bounded queue
+      flush()       — wait until everything queued so far was delivered (or gave up)
+    Messages that arrive within coalesce_ms are joined into one send (split at the
+    Telegram size limit). Failed sends retry with exponential backoff.
+    `sender` (async text → None) replaces the Telegram call, e.g. in tests.
+    """
+    def __init__(self, creds: TGCreds, max_queue: int = 100, coalesce_ms: int = 750,
+                 max_retries: int = 3, backoff_sec: float = 1.0, flush_timeout_sec: float = 10,
+                 sender: Optional[Callable[[str], Awaitable[None]]] = None):
         self.creds = creds
-        self._bot = Bot(creds.token) if (Bot and creds.token) else None
-        self._dry = not (self._bot and self.creds.chat_id)
+        self.max_queue = max(1, int(max_queue))
+        self.coalesce_sec = max(0.0, float(coalesce_ms) / 1000.0)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_sec = float(backoff_sec)
+        self.flush_timeout_sec = float(flush_timeout_sec)
+        self._sender = sender
+        self._bot = None
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rf-notifier", daemon=True)
+        self._thread.start()
+        self._ready.wait()
 
-    async def _send_async(self, text: str):
-        if self._dry:
-            RF.print_log(f"[TELEGRAM DRY-RUN]\n{text}", "INFO")
+    # ----- loop thread -----
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        loop.create_task(self._worker())
+        self._ready.set()
+        loop.run_forever()
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.close()
+
+    def _enqueue(self, text: str) -> None:
+        q = self._queue
+        assert q is not None
+        if q.qsize() >= self.max_queue:
+            q.get_nowait()
+            q.task_done()
+            self.dropped += 1
+            RF.print_log(f"[TELEGRAM] queue full ({self.max_queue}); dropped oldest message", "RISK")
+        q.put_nowait(text)
+
+    async def _worker(self) -> None:
+        q = self._queue
+        assert q is not None
+        while True:
+            batch: List[str] = [await q.get()]
+            deadline = self._loop.time() + self.coalesce_sec
+            while True:
+                left = deadline - self._loop.time()
+                if left <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(q.get(), timeout=left))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                for chunk in self._chunks(batch):
+                    await self._deliver(chunk)
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    @staticmethod
+    def _chunks(batch: List[str]) -> List[str]:
+        out: List[str] = []
+        cur = ""
+        for text in batch:
+            if cur and len(cur) + len(BATCH_SEP) + len(text) > TG_MAX_CHARS:
+                out.append(cur)
+                cur = ""
+            cur = text if not cur else cur + BATCH_SEP + text
+        if cur:
+            out.append(cur)
+        return out
+
+    async def _send_raw(self, text: str) -> None:
+        if self._sender is not None:
+            await self._sender(text)
             return
+        if self._bot is None:
+            Bot = optional_attr("telegram", "Bot")
+            if Bot is None:
+                raise RuntimeError("python-telegram-bot not importable")
+            self._bot = Bot(self.creds.token)
+            init = getattr(self._bot, "initialize", None)
+            if init is not None:
+                await init()
+        await self._bot.send_message(chat_id=self.creds.chat_id, text=text, parse_mode="Markdown")
+
+    async def _deliver(self, text: str) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self._send_raw(text)
+                self.sent += 1
+                RF.print_log("Telegram message sent.", "SUCCESS")
+                return
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    self.failed += 1
+                    RF.print_log(f"Telegram send failed after {attempt + 1} attempt(s): {e}", "ERROR")
+                    return
+                retry_after = getattr(e, "retry_after", None)   # telegram.error.RetryAfter: int or timedelta
+                if hasattr(retry_after, "total_seconds"):
+                    retry_after = retry_after.total_seconds()
+                wait = float(retry_after) if retry_after is not None else self.backoff_sec * (2 ** attempt)
+                RF.print_log(f"Telegram send failed ({e}); retry in {wait:.1f}s", "RISK")
+                await asyncio.sleep(wait)
+
+    # ----- caller side -----
+    def submit(self, text: str) -> None:
+        self._loop.call_soon_threadsafe(self._enqueue, text)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued messages are delivered; False on timeout."""
+        if not self._thread.is_alive():
+            return True
+        fut = asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop)
         try:
-            assert self._bot is not None
-            await self._bot.send_message(chat_id=self.creds.chat_id, text=text, parse_mode="Markdown")
-            RF.print_log("Telegram message sent.", "SUCCESS")
-        except Exception as e:
-            RF.print_log(f"Telegram send failed: {e}", "ERROR")
+            fut.result(self.flush_timeout_sec if timeout is None else timeout)
+            return True
+        except Exception:
+            RF.print_log("[TELEGRAM] flush timed out; undelivered messages dropped", "RISK")
+            return False
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        self.flush(timeout)
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2)
+
+_services: Dict[tuple, NotifierService] = {}
+_services_lock = threading.Lock()
+
+def get_notifier_service(creds: TGCreds) -> NotifierService:
+    """Process-wide service per (token, chat_id); flushed at interpreter exit."""
+    key = (creds.token, creds.chat_id)
+    with _services_lock:
+        svc = _services.get(key)
+        if svc is None:
+            q = load_queue_config()
+            svc = NotifierService(
+                creds,
+                max_queue=q["max_queue"],
+                coalesce_ms=q["coalesce_ms"],
+                max_retries=q["max_retries"],
+                backoff_sec=q["backoff_sec"],
+                flush_timeout_sec=q["flush_timeout_sec"],
+            )
+            _services[key] = svc
+        return svc
+
+def flush_notifications(timeout: Optional[float] = None) -> None:
+    with _services_lock:
+        services = list(_services.values())
+    for svc in services:
+        svc.flush(timeout)
+
+@atexit.register
+def _shutdown_notifiers() -> None:
+    with _services_lock:
+        services = list(_services.values())
+        _services.clear()
+    for svc in services:
+        svc.shutdown()
+
+class Notifier:
+    def __init__(self, creds: TGCreds):
+        self.creds = creds
+        self._live = bool(available("telegram") and creds.token and creds.chat_id)
+        self._dry = not self._live
 
     def send(self, text: str):
-        # minimal sync wrapper
-        try:
-            asyncio.run(self._send_async(text))
-        except RuntimeError:
-            # already in an event loop (rare in our CLI); fallback
-            RF.print_log("[TELEGRAM] event loop in use; falling back to dry-run", "RISK")
+        """
+        Dry-run prints inline. Live sends go through the background NotifierService
+        (queued, coalesced, retried) unless telemetry.queue.async_send is false,
+        in which case the call waits for delivery.
+        """
+        if self._dry:
             RF.print_log(f"[TELEGRAM DRY-RUN]\n{text}", "INFO")
+            return
+        svc = get_notifier_service(self.creds)
+        svc.submit(text)
+        if not bool(load_queue_config().get("async_send", True)):
+            svc.flush()
 
     @staticmethod
     def format_run_summary(result: Dict[str, Any], verbosity: str = "brief") -> str:
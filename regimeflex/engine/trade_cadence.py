@@ -18,15 +18,16 @@ def _parse_ts(ts: str) -> Optional[datetime]:
     except Exception:
         return None
 
-def last_trade_dates() -> Dict[str, date]:
+def last_trade_dates(fills_file: Optional[Path] = None) -> Dict[str, date]:
     """
-    Returns {SYMBOL: last_fill_date_utc} using logs/trading/fills_state.jsonl.
+    Returns {SYMBOL: last_fill_date_utc} using logs/trading/fills_state.jsonl (or fills_file).
     Counts any record with filled_qty>0 as a trade.
     """
     out: Dict[str, date] = {}
-    if not FILLS_FILE.exists():
+    fills_file = fills_file or FILLS_FILE
+    if not fills_file.exists():
         return out
-    with FILLS_FILE.open("r", encoding="utf-8") as f:
+    with fills_file.open("r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line: continue
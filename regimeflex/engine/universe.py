@@ -0,0 +1,155 @@
+# engine/universe.py
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import Config
+from .exec_planner import OrderIntent
+from .sizing import SizeConstraints
+from .batch_risk import current_weights_batch, exposure_caps_batch, turnover_cap_batch, turnover_notes
+
+UNIVERSE_DEFAULTS = {
+    "enabled": False,  # true → the daily graph targets/plans every symbol below instead of the pair
+    "max_gross": 1.0,
+    "symbols": {},     # SYMBOL: {max_weight, sleeve: long|short, weight}
+}
+
+@dataclass(frozen=True)
+class Universe:
+    """
+    Fixed symbol index for N-instrument books. Weights, prices and shares are float arrays
+    aligned to `symbols`; caps/turnover/deltas are vector ops instead of per-leg branches.
+      sleeves  symbol → "long" | "short": takes the allocator's long/short sleeve weight
+      static   symbol → fixed weight (sector sleeves, hedges)
+    """
+    symbols: Tuple[str, ...]
+    max_weight: np.ndarray
+    max_gross: float = 1.0
+    sleeves: Dict[str, str] = field(default_factory=dict)
+    static: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def index(self) -> Dict[str, int]:
+        return {s: i for i, s in enumerate(self.symbols)}
+
+    @classmethod
+    def from_symbols(cls, symbols: Sequence[str], max_weight: Optional[Mapping[str, float]] = None,
+                     max_gross: float = 1.0, **kw) -> "Universe":
+        syms = tuple(dict.fromkeys(s.upper() for s in symbols))
+        caps = max_weight or {}
+        return cls(symbols=syms, max_weight=np.array([float(caps.get(s, 1.0)) for s in syms]),
+                   max_gross=float(max_gross), **kw)
+
+    def vector(self, values: Mapping[str, float], default: float = 0.0) -> np.ndarray:
+        """Dict → array over the index (unknown keys ignored, missing → default, NaN → 0)."""
+        idx = self.index
+        out = np.full(len(self.symbols), float(default))
+        for k, v in values.items():
+            i = idx.get(str(k).upper())
+            if i is not None:
+                out[i] = float(v)
+        return np.nan_to_num(out, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def to_dict(self, arr: np.ndarray) -> Dict[str, float]:
+        return {s: float(v) for s, v in zip(self.symbols, arr)}
+
+def load_universe_config() -> dict:
+    cfg = Config(".")._load_yaml("config/universe.yaml") if (Config(".").root / "config/universe.yaml").exists() else {}
+    return {**UNIVERSE_DEFAULTS, **cfg}
+
+def load_universe(cfg: Optional[dict] = None) -> Universe:
+    cfg = cfg or load_universe_config()
+    spec = {str(k).upper(): (v or {}) for k, v in (cfg.get("symbols") or {}).items()}
+    return Universe.from_symbols(
+        list(spec), max_weight={s: v.get("max_weight", 1.0) for s, v in spec.items()},
+        max_gross=float(cfg.get("max_gross", 1.0)),
+        sleeves={s: str(v["sleeve"]).lower() for s, v in spec.items() if v.get("sleeve")},
+        static={s: float(v["weight"]) for s, v in spec.items() if "weight" in v},
+    )
+
+# ---------- weights ----------
+
+def target_weights(u: Universe, alloc_raw: Mapping[str, float]) -> np.ndarray:
+    """Allocator output ({"TQQQ": long sleeve, "SQQQ": short sleeve}) spread over the universe."""
+    sleeve = {"long": float(alloc_raw.get("TQQQ", 0.0)), "short": float(alloc_raw.get("SQQQ", 0.0))}
+    w = u.vector(u.static)
+    idx = u.index
+    for sym, side in u.sleeves.items():
+        w[idx[sym]] = sleeve.get(side, 0.0)
+    return w
+
+def cap_weights(u: Universe, w: np.ndarray) -> Tuple[np.ndarray, str]:
+    """Long-only per-symbol caps, then one gross scale (N-leg enforce_exposure_caps)."""
+    w0 = np.nan_to_num(np.asarray(w, dtype=float), nan=0.0)
+    out, capped, scale = exposure_caps_batch(w0, u.max_weight, u.max_gross)
+    notes = [f"{u.symbols[i]} capped→{u.max_weight[i]:.2f}" for i in np.flatnonzero(capped)]
+    if np.any(w0 < 0):
+        notes.append("negatives→0")
+    if scale != 1.0:
+        notes.append(f"gross scaled×{float(scale):.3f}")
+    return out, (" | ".join(notes) if notes else "OK")
+
+def current_weights(shares: np.ndarray, prices: np.ndarray, equity: float) -> np.ndarray:
+    """Position weights; NaN prices count as 0 like exposure_delta.current_exposure_weights."""
+    return current_weights_batch(shares, prices, equity)
+
+def turnover_cap(w_target: np.ndarray, w_now: np.ndarray, max_frac: float,
+                 mode: str = "clamp") -> Tuple[np.ndarray, float, str]:
+    """(weights, turnover_frac, note) — same rule as turnover.enforce_turnover_cap over N legs."""
+    out, frac, status = turnover_cap_batch(w_target, w_now, max_frac, mode)
+    return out, float(frac), turnover_notes(frac, status, max_frac)[0]
+
+# ---------- planning ----------
+
+def sanitize_qty(qty: np.ndarray, prices: np.ndarray, cons: SizeConstraints) -> np.ndarray:
+    """Vector sizing.sanitize_desired_qty: lot/precision rounding, min_qty and min_notional → 0."""
+    lot = cons.lot_size if cons.lot_size > 0 else 1
+    q = np.floor(np.maximum(qty, 0.0) / lot) * lot
+    q = np.round(q, cons.qty_precision) if cons.qty_precision > 0 else np.trunc(q)
+    q[(q < cons.min_qty) | (q * prices < cons.min_notional)] = 0.0
+    return q
+
+def plan_rebalance(u: Universe, positions: Mapping[str, float], weights: np.ndarray, prices: np.ndarray,
+                   equity: float, minutes_to_close: int, cons: SizeConstraints,
+                   min_trade_value: float = 200.0, close_dust_shares: float = 1.0,
+                   min_open_notional: float = 200.0) -> List[OrderIntent]:
+    """
+    Intents for every leg whose target differs from the book (N-leg plan_orders + coalescing):
+      - full closes below close_dust_shares and new opens below min_open_notional are dropped
+      - changes below min_trade_value are skipped; quantities pass the broker constraints
+      - sells come before buys (a flip between any two legs frees cash first)
+    Order type follows plan_orders: MOC inside 30 minutes, else day limits ±0.5%.
+    """
+    cur = u.vector(positions)
+    px = np.nan_to_num(np.asarray(prices, dtype=float), nan=0.0)
+    ok = px > 0
+    desired = np.where(ok, weights * equity / np.where(ok, px, 1.0), cur)
+    delta = desired - cur
+
+    keep = ok & (np.abs(delta) * px >= min_trade_value)
+    closing = (desired <= 1e-9) & (cur > 0)
+    keep &= ~(closing & (cur < close_dust_shares))
+    opening = (cur <= 1e-9) & (desired > 0)
+    keep &= ~(opening & (desired * px < min_open_notional))
+
+    qty = np.zeros_like(delta)
+    qty[keep] = sanitize_qty(np.abs(delta[keep]), px[keep], cons)
+    moc = minutes_to_close <= 30
+
+    intents: List[OrderIntent] = []
+    order = np.flatnonzero(qty > 0)
+    order = np.concatenate([order[delta[order] < 0], order[delta[order] > 0]])
+    for i in order:
+        buy = bool(delta[i] > 0)
+        intents.append(OrderIntent(
+            symbol=u.symbols[i],
+            side="BUY" if buy else "SELL",
+            qty=float(qty[i]),
+            order_type="moc" if moc else "limit",
+            time_in_force="cls" if moc else "day",
+            limit_price=None if moc else round(float(px[i]) * (0.995 if buy else 1.005), 2),
+            reason=f"rebalance: curr={cur[i]:.2f}, desired={desired[i]:.2f}, delta={delta[i]:.2f}",
+        ))
+    return intents
@@ -10,12 +10,18 @@ def safe_version(mod_name: str) -> str:
     except Exception:
         return "missing"
 
+_VERSIONS: dict | None = None
+
 def runtime_versions() -> dict:
-    return {
-        "python": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
-        "platform": platform.platform(),
-        "pandas": safe_version("pandas"),
-        "numpy": safe_version("numpy"),
-        "alpaca_trade_api": safe_version("alpaca_trade_api"),
-        "python_telegram_bot": safe_version("telegram"),
-    }
+    """Interpreter/library versions; probed once per process (failed imports are slow to retry)."""
+    global _VERSIONS
+    if _VERSIONS is None:
+        _VERSIONS = {
+            "python": f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}",
+            "platform": platform.platform(),
+            "pandas": safe_version("pandas"),
+            "numpy": safe_version("numpy"),
+            "alpaca_trade_api": safe_version("alpaca_trade_api"),
+            "python_telegram_bot": safe_version("telegram"),
+        }
+    return dict(_VERSIONS)
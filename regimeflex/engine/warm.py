@@ -0,0 +1,126 @@
+# engine/warm.py
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import contextlib
+import io
+import threading
+import time
+
+from .config import Config
+from .identity import RegimeFlexIdentity as RF
+from .statcache import stat_key
+
+WARM_DEFAULTS = {
+    "enabled": True,
+    "refresh_interval_sec": 60,   # background poll for changed config/bar files (0 = no poller)
+}
+
+def load_warm_config() -> dict:
+    run = Config(".").run or {}
+    return {**WARM_DEFAULTS, **(run.get("warm_runner") or {})}
+
+def _watched() -> List[Path]:
+    """Files the warm state is derived from: every config YAML plus the bar cache."""
+    files = sorted(Path("config").glob("*.yaml"))
+    cache = Path("data/cache")
+    if cache.exists():
+        files += sorted(cache.glob("*.csv"))
+    return files
+
+def _stats(paths: List[Path]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for p in paths:
+        try:
+            out[str(p)] = stat_key(p)
+        except OSError:
+            out[str(p)] = None
+    return out
+
+class EngineContext:
+    """
+    Long-lived engine state for the web process:
+      warm()      imports the engine, parses every config file, loads the bars and runs the
+                  market stages once, so the stat-keyed YAML/bar caches and the session memo
+                  (phase, allocator, diagnostics, common close) are hot
+      changed()   files whose (size, mtime, inode) moved since the last warm
+      run_daily() re-warms first if anything changed, then runs the normal daily cycle,
+                  which now only parses/recomputes what actually differs
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {}
+        self._poller: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.warmed_at: Optional[float] = None
+        self.warm_sec: Optional[float] = None
+
+    def changed(self) -> List[str]:
+        now = _stats(_watched())
+        keys = set(now) | set(self._stats)
+        return sorted(k for k in keys if now.get(k) != self._stats.get(k))
+
+    def warm(self) -> float:
+        with self._lock:
+            t0 = time.perf_counter()
+            from .runner import warm_market   # pandas & co. load here, not at web-process start
+            stats = _stats(_watched())
+            for p in stats:
+                if p.endswith(".yaml"):
+                    Config(".")._load_yaml(p)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    warm_market()
+            except Exception as e:
+                # a warm failure only costs latency; the cycle itself reports the real error
+                RF.print_log(f"Warm engine: market preload failed ({e})", "RISK")
+            self._stats = stats
+            self.warmed_at = time.time()
+            self.warm_sec = round(time.perf_counter() - t0, 3)
+        RF.print_log(f"Warm engine ready in {self.warm_sec:.2f}s ({len(stats)} files watched)", "INFO")
+        return self.warm_sec
+
+    def refresh(self) -> List[str]:
+        """Re-warm if any watched file changed; returns the changed paths."""
+        changed = self.changed()
+        if changed:
+            RF.print_log(f"Warm engine: {len(changed)} file(s) changed, refreshing", "INFO")
+            self.warm()
+        return changed
+
+    def run_daily(self, **kwargs) -> Dict[str, Any]:
+        from .runner import run_daily_offline
+        if self.warmed_at is None:
+            self.warm()
+        else:
+            self.refresh()
+        return run_daily_offline(**kwargs)
+
+    def start(self, interval_sec: float) -> None:
+        """Warm in the background, then poll for file changes every interval_sec (0 = warm only)."""
+        if self._poller is not None:
+            return
+
+        def _loop():
+            try:
+                self.warm()
+                while interval_sec > 0 and not self._stop.wait(interval_sec):
+                    self.refresh()
+            except Exception as e:
+                RF.print_log(f"Warm engine thread stopped: {e}", "ERROR")
+
+        self._poller = threading.Thread(target=_loop, name="rf-warm", daemon=True)
+        self._poller.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+_context: Optional[EngineContext] = None
+_context_lock = threading.Lock()
+
+def get_context() -> EngineContext:
+    global _context
+    with _context_lock:
+        if _context is None:
+            _context = EngineContext()
+        return _context
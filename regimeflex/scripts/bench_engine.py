@@ -0,0 +1,202 @@
+"""
+Offline benchmark suite for the engine hot paths.
+
+  python scripts/bench_engine.py                      # 1y,10y,30y; best of 3
+  python scripts/bench_engine.py --quick              # 1y only, 1 repeat, small grid
+  python scripts/bench_engine.py --baseline abc123 --fail-on-regression
+
+Runs in a throwaway working directory (copy of config/ + synthetic caches), so the
+real data/, logs/ and positions are never touched. Results are stored in
+reports/bench/bench_history.json keyed by git commit and compared against the
+previous commit (or --baseline); slowdowns beyond --threshold are flagged.
+"""
+import sys
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path to import engine module
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+def _quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+def _clear_files(*dirs: str) -> None:
+    """Delete files but keep directories (engine modules create them at import time)."""
+    for d in dirs:
+        p = Path(d)
+        if not p.exists():
+            continue
+        for f in p.rglob("*"):
+            if f.is_file():
+                f.unlink()
+
+def _load_backfill_main():
+    spec = importlib.util.spec_from_file_location("backfill_reports", ROOT / "scripts" / "backfill_reports.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod.main
+
+def run_benchmarks(sizes, universes, repeat: int, sweep_grid: dict, backfill_days: int, ledger_n: int) -> dict:
+    # engine modules resolve config/, data/cache and logs/ against cwd — import after chdir
+    from engine.bench import make_bench_series, time_call, import_time, HISTORY_LENGTHS, IMPORT_TARGETS
+    from engine.data import seed_cache, load_from_cache
+    from engine.backtest import run_backtest, BTConfig
+    from engine.sweep import run_sweep
+    from engine.exposure import exposure_allocator
+    from engine.storage import ENSStyleAudit
+    from engine.runner import run_daily_offline, _last_common_close
+    from engine.sim import run_sim
+    import yaml
+
+    backfill_main = _load_backfill_main()
+    results = {}
+
+    def bench(name, fn, setup=None):
+        with _quiet():
+            secs = time_call(fn, repeat=repeat, setup=setup)
+        results[name] = secs
+        print(f"  {name:<36} {secs * 1000:10.2f} ms")
+
+    for label in sizes:
+        n = HISTORY_LENGTHS[label]
+        qqq = make_bench_series(n, 400.0, seed=7)
+        psq = make_bench_series(n, 15.0, seed=7, inverse=True)
+        with _quiet():
+            seed_cache("QQQ", qqq)
+            seed_cache("PSQ", psq)
+        # the engine sees the UTC-normalized frames the cache hands back
+        qqq_c, psq_c = load_from_cache("QQQ"), load_from_cache("PSQ")
+        print(f"[{label}] {n} bars")
+
+        bench(f"run_backtest[{label}]", lambda: run_backtest(qqq_c, psq_c, BTConfig(), cache=False))
+        bench(f"sweep[{label}]", lambda: run_sweep(qqq_c, psq_c, cache=False, **sweep_grid))
+        bench(f"exposure_allocator[{label}]", lambda: exposure_allocator(qqq_c))
+        bench(f"last_common_close[{label}]", lambda: _last_common_close(qqq_c, psq_c))
+        bench(f"cache_load[{label}]", lambda: (load_from_cache("QQQ"), load_from_cache("PSQ")))
+
+        # event-driven replay; sim_per_day (replay loop only, best of N) should stay well under 1 ms
+        per_day = []
+        bench(f"run_sim[{label}]",
+              lambda: per_day.append(run_sim(qqq_c, qqq_c, psq_c, ["QQQ", "PSQ"]).sec_per_day))
+        results[f"sim_per_day[{label}]"] = min(per_day)
+        print(f"  {f'sim_per_day[{label}]':<36} {min(per_day) * 1000:10.3f} ms")
+
+        # only days with a full slow-MA warm-up render, so 1y yields just a couple of reports
+        start = qqq_c.index[-backfill_days].date().isoformat()
+        Path("config/backfill.yaml").write_text(yaml.safe_dump({
+            "start_date": start, "end_date": None,
+            "out_dir": "reports/backfill", "skip_if_exists": True}), encoding="utf-8")
+        bench(f"backfill_{backfill_days}d[{label}]", backfill_main,
+              setup=lambda: shutil.rmtree("reports/backfill", ignore_errors=True))
+
+        def _reset_run_state():
+            Path("data/state/positions.json").write_text("{}", encoding="utf-8")
+            _clear_files("logs", "reports/daily")
+        bench(f"run_daily_offline[{label}]",
+              lambda: run_daily_offline(equity=25_000.0, vix=20.0, minutes_to_close=15, min_trade_value=200.0),
+              setup=_reset_run_state)
+
+    # cache load scales with universe size, not history length: fix at 1y of bars
+    bars = make_bench_series(HISTORY_LENGTHS["1y"], 100.0, seed=11)
+    for u in universes:
+        syms = [f"SYM{i:03d}" for i in range(u)]
+        with _quiet():
+            for s in syms:
+                seed_cache(s, bars)
+        bench(f"cache_load_universe[{u}]", lambda: [load_from_cache(s) for s in syms])
+
+    audit = ENSStyleAudit()
+    payload = {"symbol": "TQQQ", "side": "BUY", "qty": 12.0, "notional": 1234.56, "reason": "bench"}
+    def _append():
+        for _ in range(ledger_n):
+            audit.log("PLAN", payload)
+    bench(f"ledger_append[{ledger_n}]", _append, setup=lambda: _clear_files("logs/audit"))
+
+    # cold-start imports (fresh interpreter each time, so best-of-N works as for the others)
+    for name, stmt in IMPORT_TARGETS.items():
+        try:
+            secs = min(import_time(stmt, ROOT)[0] for _ in range(repeat))
+        except Exception as e:   # e.g. flask missing for the web entry point
+            print(f"  import[{name}] skipped: {e}")
+            continue
+        results[f"import[{name}]"] = secs
+        print(f"  {f'import[{name}]':<36} {secs * 1000:10.2f} ms")
+
+    return results
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Offline engine benchmarks with regression tracking.")
+    ap.add_argument("--sizes", default="1y,10y,30y", help="history lengths (1y,10y,30y)")
+    ap.add_argument("--universes", default="2,10,50", help="symbol counts for cache_load_universe")
+    ap.add_argument("--repeat", type=int, default=3, help="best-of-N repetitions")
+    ap.add_argument("--backfill-days", type=int, default=20, help="report days rendered per backfill bench")
+    ap.add_argument("--ledger-n", type=int, default=500, help="records per ledger_append bench")
+    ap.add_argument("--quick", action="store_true", help="1y only, single repeat, 1-point sweep")
+    ap.add_argument("--threshold", type=float, default=0.20, help="regression threshold (0.20 = +20%%)")
+    ap.add_argument("--baseline", default=None, help="commit key to compare against (default: previous entry)")
+    ap.add_argument("--no-save", action="store_true", help="don't write results to history")
+    ap.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any bench regressed")
+    args = ap.parse_args()
+
+    from engine.identity import RegimeFlexIdentity as RF
+    from engine.bench import BENCH_FILE, HISTORY_LENGTHS, git_commit, load_history, record_results, find_baseline, compare
+
+    sizes = ["1y"] if args.quick else [s.strip() for s in args.sizes.split(",") if s.strip()]
+    bad = [s for s in sizes if s not in HISTORY_LENGTHS]
+    if bad:
+        ap.error(f"unknown size(s) {bad}; choose from {list(HISTORY_LENGTHS)}")
+    universes = [int(u) for u in args.universes.split(",") if u.strip()]
+    repeat = 1 if args.quick else args.repeat
+    sweep_grid = ({"z_lens": [20], "z_bull_entries": [-2.0], "z_bear_entries": [2.0]} if args.quick
+                  else {"z_lens": [15, 20], "z_bull_entries": [-2.0], "z_bear_entries": [1.8, 2.2]})
+
+    hist_path = ROOT / BENCH_FILE
+    commit = git_commit(ROOT)
+    RF.print_log(f"Benchmarking commit {commit} (sizes={sizes}, repeat={repeat})", "INFO")
+
+    cwd = os.getcwd()
+    work = tempfile.mkdtemp(prefix="rf_bench_")
+    try:
+        shutil.copytree(ROOT / "config", Path(work) / "config")
+        os.chdir(work)
+        Path("data/state").mkdir(parents=True, exist_ok=True)
+        results = run_benchmarks(sizes, universes, repeat, sweep_grid, args.backfill_days, args.ledger_n)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+    history = load_history(hist_path)
+    base_key = find_baseline(history, commit, args.baseline)
+    regressions = []
+    if base_key:
+        rows = compare(results, history[base_key].get("results", {}), threshold=args.threshold)
+        print(f"\nvs {base_key}:")
+        for r in rows:
+            flag = "  REGRESSION" if r["regression"] else ""
+            print(f"  {r['name']:<36} {r['baseline'] * 1000:10.2f} → {r['current'] * 1000:10.2f} ms  x{r['ratio']:.2f}{flag}")
+        regressions = [r for r in rows if r["regression"]]
+    elif args.baseline:
+        RF.print_log(f"Baseline {args.baseline} not found in {hist_path}", "RISK")
+
+    if not args.no_save:
+        record_results(results, commit, hist_path,
+                       meta={"sizes": sizes, "universes": universes, "repeat": repeat,
+                             "python": sys.version.split()[0]})
+        RF.print_log(f"Saved {len(results)} results → {hist_path}", "SUCCESS")
+
+    if regressions:
+        RF.print_log(f"{len(regressions)} bench(es) slower than +{args.threshold:.0%}: "
+                     + ", ".join(r["name"] for r in regressions), "RISK")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
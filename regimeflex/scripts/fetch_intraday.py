@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import engine module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.config import Config
+from engine.identity import RegimeFlexIdentity as RF
+from engine.intraday import fetch_to_store, load_intraday_config, resample_store
+
+if __name__ == "__main__":
+    # data.yaml symbols → data/intraday/<timeframe>/<SYMBOL>/<YYYY-MM>.npz (+ 5Min rollup from 1Min)
+    cfg = load_intraday_config()
+    if not cfg["enabled"]:
+        RF.print_log("Intraday disabled (config/data.yaml intraday.enabled)", "RISK")
+        sys.exit(0)
+    for sym in Config(".")._load_yaml("config/data.yaml").get("symbols", []):
+        if fetch_to_store(sym, cfg) and cfg["timeframe"] == "1Min":
+            resample_store(sym, "1Min", "5Min", "5min")
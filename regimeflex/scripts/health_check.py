@@ -9,7 +9,7 @@ from engine.health import run_health
 from engine.identity import RegimeFlexIdentity as RF
 
 if __name__ == "__main__":
-    rep = run_health()
+    rep = run_health(force=True)
     # pretty print
     print(json.dumps({
         "status": rep.status,
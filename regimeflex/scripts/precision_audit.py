@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import engine module
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.compact import precision_audit
+from engine.identity import RegimeFlexIdentity as RF
+
+if __name__ == "__main__":
+    # float64 vs compact (float32) bars for every cached data.yaml symbol; exit 1 if any signal moved
+    res = precision_audit()
+    if res.empty:
+        RF.print_log("No cached bars to audit", "RISK")
+        sys.exit(0)
+    print(res.to_string(index=False))
+    changes = int(res[["side_changes", "phase_changes", "regime_changes"]].to_numpy().sum())
+    saved = 1 - res["bytes_compact"].sum() / max(res["bytes_float64"].sum(), 1)
+    if changes:
+        RF.print_log(f"Compact bars changed {changes} signal(s); keep compact.enabled false", "RISK")
+        sys.exit(1)
+    RF.print_log(f"Compact bars: no signal changes, {saved:.0%} smaller", "SUCCESS")
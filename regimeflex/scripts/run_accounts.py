@@ -0,0 +1,22 @@
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import engine module
+sys.path.append(str(Path(__file__).parent.parent))
+import pandas as pd
+
+from engine.identity import RegimeFlexIdentity as RF
+from engine.accounts import run_accounts
+
+if __name__ == "__main__":
+    # every account in config/accounts.yaml against one load of bars + signals
+    t0 = time.perf_counter()
+    out = run_accounts()
+    elapsed = time.perf_counter() - t0
+
+    df = pd.DataFrame(out["summary"])
+    cols = ["account", "pair", "equity", "target_symbol", "target_dollars", "n_intents", "no_op_reason"]
+    with pd.option_context("display.width", 200):
+        print(df[cols].to_string(index=False))
+    RF.print_log(f"{len(df)} account(s) in {elapsed:.3f}s", "SUCCESS")
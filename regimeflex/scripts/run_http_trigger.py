@@ -1,40 +1,73 @@
 import os
 import sys
 from pathlib import Path
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
 
 # Add parent directory to path to import engine module
 sys.path.append(str(Path(__file__).parent.parent))
 
 from engine.identity import RegimeFlexIdentity as RF
 from engine.killswitch import is_killed
-from engine.runner import run_daily_offline
 from engine.config import Config
-from engine.health import run_health
+from engine.health import health_snapshot
+from engine.jobs import JobManager
 
 app = Flask(__name__)
 
-@app.route("/trigger-daily", methods=["GET"])
-def trigger_daily():
-    # Check if this is a health check (no query params, simple GET)
-    import flask
-    if not flask.request.args and flask.request.method == "GET":
-        # Simple health check - just return OK without running the full cycle
-        return jsonify({"status": "ok", "health_check": True}), 200
-    
-    if is_killed():
-        RF.print_log("KILL-SWITCH active — refusing HTTP trigger", "RISK")
-        return jsonify({"status": "killed"}), 423  # 423 = Locked
-    cfg = Config(".")
-    run = cfg.run or {}
-    result = run_daily_offline(
+def _run_cycle() -> dict:
+    # the engine (pandas & co.) loads on the first cycle, not at web-process start
+    from engine.warm import get_context, load_warm_config
+    run = Config(".").run or {}
+    if load_warm_config()["enabled"]:
+        # warm context: configs, bars and market stages are reused unless their files changed
+        run_daily = get_context().run_daily
+    else:
+        from engine.runner import run_daily_offline as run_daily
+    result = run_daily(
         equity=float(run.get("equity", 25000)),
         vix=run.get("vix_assumption", 20.0),
         minutes_to_close=int(run.get("minutes_to_close", 28)),
         min_trade_value=float(run.get("min_trade_value", 200.0))
     )
     RF.print_log("HTTP trigger completed.", "SUCCESS")
-    return jsonify({"status": "ok", "result": {"target": result.get("target", {})}}), 200
+    return result
+
+jobs = JobManager(_run_cycle)
+
+def _enqueue():
+    """Queue a cycle (or return the one already queued/running for this session)."""
+    if is_killed():
+        RF.print_log("KILL-SWITCH active — refusing HTTP trigger", "RISK")
+        return jsonify({"status": "killed"}), 423  # 423 = Locked
+    job, created = jobs.submit()
+    body = {"status": job.status, "job_id": job.id, "session": job.session, "deduped": not created,
+            "status_url": f"/runs/{job.id}"}
+    return jsonify(body), 202, {"Location": f"/runs/{job.id}"}
+
+@app.route("/trigger-daily", methods=["GET"])
+def trigger_daily():
+    # Check if this is a health check (no query params, simple GET)
+    if not request.args and request.method == "GET":
+        # Simple health check - just return OK without running the full cycle
+        return jsonify({"status": "ok", "health_check": True}), 200
+    
+    # Runs in the background; poll /runs/<job_id> for the outcome
+    return _enqueue()
+
+@app.route("/runs", methods=["POST"])
+def create_run():
+    return _enqueue()
+
+@app.route("/runs", methods=["GET"])
+def list_runs():
+    return jsonify({"runs": [j.as_dict() for j in jobs.list()]}), 200
+
+@app.route("/runs/<job_id>", methods=["GET"])
+def get_run(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "not_found", "job_id": job_id}), 404
+    return jsonify(job.as_dict()), 200
 
 @app.route("/health", methods=["GET"])
 def health():
@@ -43,8 +76,9 @@ def health():
 
 @app.route("/health-full", methods=["GET"])
 def health_full():
-    # Full health check for detailed diagnostics
-    rep = run_health()
+    # Full health check for detailed diagnostics; answers from the cached snapshot
+    # (expired checks refresh in the background), so pollers never wait on the checks
+    rep = health_snapshot()
     code = 200 if rep.status == "PASS" else (429 if rep.status == "WARN" else 503)
     return {
         "status": rep.status,
@@ -55,4 +89,9 @@ def health_full():
 if __name__ == "__main__":
     # IMPORTANT: bind to 0.0.0.0 and the PORT env var for Railway
     port = int(os.environ.get("PORT", "5000"))
+    from engine.warm import get_context, load_warm_config
+    warm_cfg = load_warm_config()
+    if warm_cfg["enabled"]:
+        # preload in the background; /health answers while the engine warms
+        get_context().start(float(warm_cfg["refresh_interval_sec"]))
     app.run(host="0.0.0.0", port=port)
@@ -0,0 +1,34 @@
+import sys
+import time
+from itertools import product
+from pathlib import Path
+
+# Add parent directory to path to import engine module
+sys.path.append(str(Path(__file__).parent.parent))
+import pandas as pd
+
+from engine.identity import RegimeFlexIdentity as RF
+from engine.runner import Scenario, run_scenarios
+
+if __name__ == "__main__":
+    # equity × VIX × minutes-to-close × starting book, all against today's cached bars
+    books = {
+        "flat": {"QQQ": 0.0, "PSQ": 0.0},
+        "long": {"QQQ": 40.0, "PSQ": 0.0},
+        "short": {"QQQ": 0.0, "PSQ": 900.0},
+    }
+    scenarios = [
+        Scenario(name=f"{book}/eq{int(eq/1000)}k/vix{vix}/m{mins}", equity=eq, vix=vix,
+                 minutes_to_close=mins, positions=books[book], opex=opex)
+        for book, eq, vix, mins, opex in product(books, (10_000.0, 25_000.0, 100_000.0),
+                                                 (15.0, 28.0, 40.0), (10, 45), (False, True))
+    ]
+
+    t0 = time.perf_counter()
+    df = run_scenarios(scenarios)
+    elapsed = time.perf_counter() - t0
+
+    cols = ["scenario", "opex", "target_symbol", "target_dollars", "n_intents", "no_op_reason", "risk_note"]
+    with pd.option_context("display.width", 200, "display.max_rows", 500):
+        print(df[cols].to_string(index=False))
+    RF.print_log(f"{len(df)} scenarios in {elapsed:.3f}s", "SUCCESS")
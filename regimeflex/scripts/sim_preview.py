@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path to import engine module
+sys.path.append(str(Path(__file__).parent.parent))
+from engine.config import Config
+from engine.identity import RegimeFlexIdentity as RF
+from engine.data import get_daily_bars
+from engine.instruments import resolve_execution_pair
+from engine.symbols import resolve_signal_underlier
+from engine.sim import run_sim, SimConfig
+
+if __name__ == "__main__":
+    # replay the cached history through the live planning stages (no ledgers, no state files)
+    exec_map = resolve_execution_pair()
+    sig_sym, sig_df = resolve_signal_underlier()
+    long_df = get_daily_bars(exec_map["long_ref"])
+    short_df = get_daily_bars(exec_map["short_ref"])
+    equity = float((Config(".").run or {}).get("equity", 25_000.0))
+
+    res = run_sim(sig_df, long_df, short_df, [exec_map["long"], exec_map["short"]],
+                  SimConfig(start_equity=equity))
+
+    RF.print_log(f"Signal {sig_sym} → {exec_map['long']}/{exec_map['short']}, {len(res.days)} days", "INFO")
+    RF.print_log(f"Trades: {res.trades}", "INFO")
+    RF.print_log(f"CAGR:   {res.cagr*100:.2f}%", "SUCCESS")
+    RF.print_log(f"Max DD: {res.max_dd*100:.2f}%", "RISK")
+    RF.print_log(f"Sharpe: {res.sharpe:.2f}", "INFO")
+    RF.print_log(f"Speed:  {res.sec_per_day*1e6:.0f}µs per simulated day", "INFO")
+    if len(res.days):
+        print(res.days["no_op_reason"].replace("", "TRADED").value_counts().to_string())
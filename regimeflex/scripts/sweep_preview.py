@@ -1,14 +1,15 @@
-from itertools import product
 from pathlib import Path
 import pandas as pd
-import matplotlib.pyplot as plt
 import sys
 
 # Add parent directory to path to import engine module
 sys.path.append(str(Path(__file__).parent.parent))
 from engine.identity import RegimeFlexIdentity as RF
+from engine.lazy import lazy_module
 from engine.data import get_daily_bars
-from engine.backtest import run_backtest, BTConfig
+from engine.sweep import run_sweep
+
+plt = lazy_module("matplotlib.pyplot")   # loaded when the first chart is drawn
 
 REPORTS = Path("reports")
 REPORTS.mkdir(parents=True, exist_ok=True)
@@ -18,44 +19,7 @@ def run_grid():
     psq = get_daily_bars("PSQ")
 
     RF.print_log("Running parameter sweep…", "INFO")
-
-    z_lens = [15, 20, 25]
-    z_bull_entries = [-1.8, -2.0, -2.2]
-    z_bear_entries = [1.8, 2.0, 2.2]
-
-    rows = []
-    for zlen, zbull, zbear in product(z_lens, z_bull_entries, z_bear_entries):
-        cfg = BTConfig(
-            start_cash=25_000.0,
-            vix_assumption=None,
-            min_trade_value=200.0,
-            commission_per_share=0.005,
-            fixed_fee_per_trade=0.00,
-            slippage_bps=10.0,
-            trend_params={},  # keep defaults
-            mr_params={
-                "z_len": zlen,
-                "z_entry_bull": zbull,
-                "z_exit_bull": 0.0,
-                "z_entry_bear": zbear,
-                "z_exit_bear": 0.0,
-                "vol_confirm_mult": 1.2
-            }
-        )
-        res = run_backtest(qqq, psq, cfg)
-        rows.append({
-            "z_len": zlen,
-            "z_entry_bull": zbull,
-            "z_entry_bear": zbear,
-            "trades": res.trades,
-            "cagr": res.cagr,
-            "maxdd": res.max_dd,
-            "sharpe": res.sharpe
-        })
-
-    df = pd.DataFrame(rows)
-    df["mar"] = df["cagr"] / (df["maxdd"].replace(0, 1e-9))
-    return df
+    return run_sweep(qqq, psq)
 
 def save_csv(df: pd.DataFrame, name: str = "sweep_results.csv"):
     path = REPORTS / name
@@ -0,0 +1,61 @@
+import sys
+import shutil
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from engine.bench import make_bench_series
+from engine.data import seed_cache
+from engine import daily_stages
+from engine.accounts import Account, load_accounts, run_accounts
+from engine.exec_alpaca import plan_client_order_ids
+
+ROOT = Path(__file__).parent.parent
+
+def test_accounts_share_signals_and_keep_state_apart(tmp_path, monkeypatch):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    Path("data/cache").mkdir(parents=True)
+    Path("logs/audit").mkdir(parents=True)       # shared CFG record
+    seed_cache("QQQ", make_bench_series(400, 400.0, seed=5))
+    seed_cache("PSQ", make_bench_series(400, 15.0, seed=5, inverse=True))
+    monkeypatch.setattr(daily_stages, "eod_ready", lambda m: (True, "test"))
+
+    accounts = [Account(name="core", pair="QQQ_PSQ", equity=50_000.0),
+                Account(name="lev", pair="TQQQ_SQQQ", equity=20_000.0)]
+    out = run_accounts(accounts, vix=20.0, minutes_to_close=15)
+
+    rows = {r["account"]: r for r in out["summary"]}
+    assert set(rows) == {"core", "lev"} and not any(r["error"] for r in rows.values())
+    core, lev = out["results"]["core"], out["results"]["lev"]
+    assert set(core["positions_after"]) <= {"QQQ", "PSQ"}
+    assert set(lev["positions_after"]) <= {"TQQQ", "SQQQ"}
+    assert core["breadcrumbs"]["phase"] == lev["breadcrumbs"]["phase"]
+
+    # each account has its own book and journals; the single-account files are untouched
+    for name in ("core", "lev"):
+        d = tmp_path / "data" / "accounts" / name
+        assert (d / "positions.json").exists() and (d / "run_summaries.jsonl").exists()
+        assert list((d / "audit").glob("ledger_*.jsonl"))
+    assert not (tmp_path / "data" / "state" / "positions.json").exists()
+    assert (tmp_path / "logs" / "audit" / "accounts_summary.jsonl").exists()
+
+def test_live_accounts_need_their_own_keys(tmp_path, monkeypatch):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    cfg = {"accounts": [{"name": "core"}, {"name": "lev", "alpaca": {"dry_run": False}}]}
+    with pytest.raises(ValueError, match="lev"):
+        load_accounts(cfg)
+    cfg["accounts"][1].update(key_env="ALPACA_KEY_LEV", secret_env="ALPACA_SECRET_LEV")
+    assert [a.name for a in load_accounts(cfg)] == ["core", "lev"]
+    with pytest.raises(ValueError):
+        run_accounts([Account(name="lev", alpaca={"dry_run": False})])
+
+def test_same_plan_gets_distinct_ids_per_account():
+    payloads = [{"symbol": "QQQ", "side": "buy", "qty": "10", "type": "market", "time_in_force": "day"}]
+    core = plan_client_order_ids(payloads, block="2024-01-02", account="core")
+    lev = plan_client_order_ids(payloads, block="2024-01-02", account="lev")
+    assert core != lev
+    assert core == plan_client_order_ids(payloads, block="2024-01-02", account="core")
@@ -0,0 +1,59 @@
+import sys
+import shutil
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from engine.bench import make_bench_series
+from engine.data import seed_cache
+from engine.exposure import exposure_allocator, exposure_allocator_series, classify_phase, classify_phase_series
+from engine.backfill import build_pages, render_pages, run_backfill, BACKFILL_DEFAULTS
+from engine.report import RENDER_INDEX
+
+ROOT = Path(__file__).parent.parent
+
+def _workspace(tmp_path, monkeypatch, n=320):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    Path("data/cache").mkdir(parents=True)
+    seed_cache("QQQ", make_bench_series(n, 400.0, seed=5))
+    seed_cache("PSQ", make_bench_series(n, 15.0, seed=5, inverse=True))
+    return {**BACKFILL_DEFAULTS, "start_date": "2000-01-01", "out_dir": "out", "workers": 1}
+
+def test_series_match_per_date_calls(tmp_path, monkeypatch):
+    _workspace(tmp_path, monkeypatch)
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, 400)))
+    df = pd.DataFrame({"close": close}, index=pd.date_range("2020-01-01", periods=400))
+    allocs = exposure_allocator_series(df)
+    phases = classify_phase_series(df, fast=20, bb_p=20, bb_std=2.0)
+    for i in (0, 1, 19, 20, 21, 249, 250, 300, 399):
+        assert allocs[i] == exposure_allocator(df.iloc[:i + 1])
+        assert phases[i] == classify_phase(df.iloc[:i + 1], fast=20, bb_p=20, bb_std=2.0)
+
+def test_backfill_resumes_from_checkpoint(tmp_path, monkeypatch):
+    cfg = _workspace(tmp_path, monkeypatch)
+    first = run_backfill(cfg)
+    pages = sorted(Path("out").glob("daily_report_*.html"))
+    assert first["rendered"] == len(pages) > 0
+    assert (Path("out") / "report.css").exists()
+
+    # nothing changed → nothing re-rendered
+    assert run_backfill(cfg)["rendered"] == 0
+
+    # simulate an interruption: the last pages never got written
+    for p in pages[-5:]:
+        p.unlink()
+    again = run_backfill(cfg)
+    assert again["rendered"] == 5 and again["skipped"] == len(pages) - 5
+
+def test_render_pages_process_pool(tmp_path, monkeypatch):
+    cfg = _workspace(tmp_path, monkeypatch)
+    pages = build_pages(cfg, 25_000.0)
+    res = render_pages(pages, "pool", "PASS", workers=2, chunk_size=20, parallel_min_pages=1)
+    assert res["rendered"] == len(pages)
+    assert len(list(Path("pool").glob("daily_report_*.html"))) == len(pages)
+    assert (Path("pool") / RENDER_INDEX).exists()
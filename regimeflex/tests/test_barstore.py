@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from engine import data as D
+from engine.barstore import PartitionedStore
+
+def _bars(n=800, start="2023-06-01"):
+    idx = pd.date_range(start, periods=n, freq="D", tz="UTC", name="date")
+    close = 100.0 + np.arange(n) * 0.1
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1,
+                         "close": close, "volume": np.arange(n, dtype=np.int64) + 1000}, index=idx)
+
+def test_partitions_prune_and_project(tmp_path):
+    store = PartitionedStore(tmp_path, freq="Y")
+    df = _bars()
+    assert store.write("qqq", df) == 800
+    assert store.partitions("QQQ") == ["2023", "2024", "2025"]
+
+    chunks = list(store.scan("QQQ", "2024-03-01", "2024-03-31", columns=["close"]))
+    assert len(chunks) == 1                                   # only the 2024 partition is opened
+    got = chunks[0]
+    assert list(got.columns) == ["close"] and len(got) == 31
+    pd.testing.assert_frame_equal(got, df.loc["2024-03-01":"2024-03-31", ["close"]], check_freq=False)
+
+    pd.testing.assert_frame_equal(store.read("QQQ"), df, check_freq=False)   # dtypes, tz, index name
+    pd.testing.assert_frame_equal(store.tail("QQQ", 400, ["close", "volume"]),
+                                  df[["close", "volume"]].iloc[-400:], check_freq=False)
+
+def test_merge_and_replace(tmp_path):
+    store = PartitionedStore(tmp_path, freq="Y")
+    df = _bars()
+    store.write("X", df)
+    fix = df.iloc[-5:].copy()
+    fix["close"] = 1.0
+    store.write("X", fix)                                     # newer rows win
+    assert (store.read("X")["close"].iloc[-5:] == 1.0).all() and len(store.read("X")) == 800
+    store.write("X", df.loc["2025"], replace=True)            # partitions not covered are dropped
+    assert store.partitions("X") == ["2025"]
+
+def test_load_window_matches_csv_and_follows_rewrites(tmp_path, monkeypatch):
+    monkeypatch.setattr(D, "CACHE_DIR", tmp_path)
+    D.save_to_cache("QQQ", _bars())
+    assert D.daily_store().partitions("QQQ") == ["2023", "2024", "2025"]
+    full = D.load_from_cache("QQQ")
+
+    win = D.load_window("QQQ", "2024-01-01", "2024-12-31", columns=("close",))
+    pd.testing.assert_frame_equal(win, full.loc["2024-01-01":"2024-12-31", ["close"]])
+    pd.testing.assert_frame_equal(D.load_window("QQQ", tail=10), full.iloc[-10:])
+
+    # CSV rewritten behind the store's back: the stale mirror is ignored, then rebuilt
+    _bars(50).to_csv(tmp_path / "QQQ.csv", index_label="date")
+    D.rebuild_manifest()
+    assert len(D.load_window("QQQ")) == 50
+    assert D.daily_store().partitions("QQQ") == ["2023"]
+    assert D.load_window("NOPE") is None
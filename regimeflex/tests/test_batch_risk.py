@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from engine.turnover import enforce_turnover_cap
+from engine.exposure_delta import current_exposure_weights, exposure_delta
+from engine.guardrails import enforce_exposure_caps
+from engine.batch_risk import (current_weights_batch, exposure_delta_batch, turnover_cap_batch,
+                               turnover_notes, exposure_caps_batch)
+
+SIDES = ["QQQ", "PSQ"]
+
+def _rows(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    shares = rng.integers(0, 600, (n, 2)).astype(float)
+    prices = np.column_stack([rng.uniform(300, 500, n), rng.uniform(10, 20, n)])
+    prices[rng.random((n, 2)) < 0.1] = np.nan                  # missing prices
+    equity = rng.uniform(5_000, 200_000, n)
+    equity[::37] = 0.0
+    target = rng.dirichlet([1, 1, 1], n)[:, :2]
+    return shares, prices, equity, target
+
+def test_batch_matches_dict_functions_row_by_row():
+    shares, prices, equity, target = _rows()
+    w_now = current_weights_batch(shares, prices, equity)
+    for mode in ("clamp", "skip"):
+        w_new, frac, status = turnover_cap_batch(target, w_now, 0.15, mode, equity=equity)
+        notes = turnover_notes(frac, status, 0.15)
+        for i in range(len(equity)):
+            pos = dict(zip(SIDES, shares[i]))
+            px = dict(zip(SIDES, prices[i]))
+            prev = current_exposure_weights(pos, px, equity[i], SIDES)
+            assert np.allclose([prev[s] for s in SIDES], w_now[i])
+            if equity[i] <= 0:
+                continue
+            ref_w, _, ref_frac, ref_note = enforce_turnover_cap(dict(zip(SIDES, target[i])), pos, px,
+                                                                equity[i], 0.15, mode)
+            assert np.isclose(frac[i], ref_frac) and notes[i] == ref_note
+            assert np.allclose([ref_w[s] for s in SIDES], w_new[i])
+            d = exposure_delta(prev, ref_w, SIDES)
+            assert np.allclose([d[s] for s in SIDES], exposure_delta_batch(w_now[i], w_new[i]))
+
+def test_exposure_caps_batch_matches_guardrails():
+    rng = np.random.default_rng(7)
+    w = rng.uniform(-0.2, 1.2, (300, 2))
+    w[::11, 0] = np.nan
+    out, capped, scale = exposure_caps_batch(w, np.array([0.8, 0.6]), 1.0)
+    for i in range(len(w)):
+        ref, _ = enforce_exposure_caps({"TQQQ": np.nan_to_num(w[i, 0]), "SQQQ": w[i, 1]},
+                                       {"max_tqqq": 0.8, "max_sqqq": 0.6, "max_gross": 1.0})
+        assert np.allclose([ref["TQQQ"], ref["SQQQ"]], out[i])
+
+def test_nan_rows_are_zero_turnover():
+    # same case as test_turnover_nan_safe, as one row of a batch
+    shares = np.array([[497.0, 0.0], [0.0, 0.0]])
+    prices = np.array([[400.0, np.nan], [100.0, 100.0]])
+    equity = np.array([497 * 400.0, 100_000.0])
+    w_now = current_weights_batch(shares, prices, equity)
+    target = np.array([[w_now[0, 0], 0.0], [1.0, 0.0]])
+    w_new, frac, status = turnover_cap_batch(target, w_now, np.array([0.15, 0.05]), equity=equity)
+    assert frac[0] == 0.0 and turnover_notes(frac, status, [0.15, 0.05])[0] == "OK"
+    assert np.allclose(exposure_delta_batch(w_now[0], w_new[0]), 0.0)
+    assert frac[1] == 1.0 and 0.049 <= w_new[1, 0] <= 0.051
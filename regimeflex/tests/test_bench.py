@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.bench import compare, find_baseline, record_results, load_history, make_bench_series
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    base = {"run_backtest[1y]": 0.100, "sweep[1y]": 1.00, "ledger_append[500]": 0.001}
+    cur = {"run_backtest[1y]": 0.115, "sweep[1y]": 1.30, "ledger_append[500]": 0.004, "new_bench": 1.0}
+    rows = {r["name"]: r for r in compare(cur, base, threshold=0.20)}
+    assert set(rows) == set(base)                      # new benches have nothing to compare against
+    assert not rows["run_backtest[1y]"]["regression"]  # +15% is within threshold
+    assert rows["sweep[1y]"]["regression"]             # +30%
+    assert not rows["ledger_append[500]"]["regression"]  # 4x but below the noise floor
+
+def test_history_is_keyed_by_commit_and_baseline_is_previous(tmp_path):
+    path = tmp_path / "bench_history.json"
+    record_results({"a": 1.0}, "aaa111", path)
+    record_results({"a": 1.1}, "bbb222", path)
+    hist = load_history(path)
+    assert set(hist) == {"aaa111", "bbb222"}
+    assert find_baseline(hist, "bbb222") == "aaa111"
+    assert find_baseline(hist, "bbb222", baseline="missing") is None
+
+def test_bench_series_is_deterministic():
+    a = make_bench_series(300, seed=3)
+    b = make_bench_series(300, seed=3)
+    assert len(a) == 300 and a["close"].equals(b["close"])
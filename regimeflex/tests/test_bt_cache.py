@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine.backtest as backtest
+import engine.sweep as sweep
+from engine.backtest import BTConfig, run_backtest
+from engine.bt_cache import backtest_cache, data_key, result_key
+from engine.sweep import run_sweep
+
+def _bars(n=260, base=300.0, seed=0):
+    rng = np.random.default_rng(seed)
+    c = np.round(base * np.exp(np.cumsum(rng.normal(0, 0.012, n))), 2)
+    idx = pd.date_range("2023-01-02", periods=n, freq="B", tz="UTC", name="date")
+    return pd.DataFrame({"open": c, "high": np.round(c * 1.01, 2), "low": np.round(c * 0.99, 2),
+                         "close": c, "volume": rng.integers(10**6, 9 * 10**7, n)}, index=idx)
+
+@pytest.fixture
+def bars(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    q = _bars()
+    return q, q.assign(**{c: np.round(1e4 / q[c], 2) for c in ("open", "high", "low", "close")})
+
+def test_identical_run_is_read_back(bars, monkeypatch):
+    q, p = bars
+    first = run_backtest(q, p, BTConfig())
+    monkeypatch.setattr(backtest, "_run_backtest", lambda *a: pytest.fail("recomputed a cached run"))
+    again = run_backtest(q, p, BTConfig(trend_params={}, mr_params=None))   # None ≡ {} params
+    pd.testing.assert_series_equal(again.equity_curve, first.equity_curve)
+    assert (again.trades, again.cagr, again.max_dd, again.sharpe) == \
+           (first.trades, first.cagr, first.max_dd, first.sharpe)
+    assert len(backtest_cache().index()) == 1
+
+def test_key_tracks_data_and_config(bars):
+    q, p = bars
+    dkey = data_key(q, p)
+    assert result_key(dkey, BTConfig()) != result_key(dkey, BTConfig(slippage_bps=5.0))
+    q2 = q.copy()
+    q2.iloc[-1, q2.columns.get_loc("close")] += 0.01
+    assert data_key(q2, p) != dkey
+
+def test_grown_sweep_computes_only_new_points(bars, monkeypatch):
+    q, p = bars
+    calls = []
+    point = sweep._point
+    monkeypatch.setattr(sweep, "_point", lambda *a: calls.append(a[2:]) or point(*a))
+    small = run_sweep(q, p, z_lens=[15], z_bull_entries=[-2.0], z_bear_entries=[2.0])
+    grown = run_sweep(q, p, z_lens=[15, 20], z_bull_entries=[-2.0], z_bear_entries=[2.0])
+    assert calls == [(15, -2.0, 2.0), (20, -2.0, 2.0)]
+    pd.testing.assert_frame_equal(grown.iloc[:1], small)
+    uncached = run_sweep(q, p, z_lens=[15, 20], z_bull_entries=[-2.0], z_bear_entries=[2.0], cache=False)
+    pd.testing.assert_frame_equal(grown, uncached)
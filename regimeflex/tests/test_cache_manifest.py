@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from engine import data as D
+from engine.health import last_cached_date
+
+def _bars(n=30, start="2024-01-01"):
+    idx = pd.date_range(start, periods=n, freq="D")
+    return pd.DataFrame({"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 1000}, index=idx)
+
+def test_seed_writes_manifest_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(D, "CACHE_DIR", tmp_path)
+    D.seed_cache("qqq", _bars())
+    meta = D.cache_meta("QQQ")
+    assert meta["rows"] == 30
+    assert meta["first_date"] == "2024-01-01" and meta["last_date"] == "2024-01-30"
+    assert meta["provider"] == "seed" and len(meta["sha256"]) == 64
+    assert last_cached_date("QQQ").isoformat() == "2024-01-30"
+
+def test_identical_save_skips_write(tmp_path, monkeypatch):
+    monkeypatch.setattr(D, "CACHE_DIR", tmp_path)
+    df = D.load_from_cache("X")
+    assert df is None
+    D.seed_cache("X", _bars())
+    mtime = (tmp_path / "X.csv").stat().st_mtime_ns
+    df = D.load_from_cache("X")
+    assert D.save_to_cache("X", df, provider="polygon") is False
+    assert (tmp_path / "X.csv").stat().st_mtime_ns == mtime
+    assert D.cache_meta("X")["provider"] == "polygon"
+    assert D.save_to_cache("X", _bars(31)) is True
+    assert D.cache_meta("X")["rows"] == 31
+
+def test_bar_cached_mid_session_is_not_final():
+    meta = {"last_date": "2025-03-14"}
+    # 16:00 New York = 20:00 UTC (EDT)
+    assert not D.last_bar_final({**meta, "fetched_at": "2025-03-14T19:45:00Z"})    # near-close, partial
+    assert D.last_bar_final({**meta, "fetched_at": "2025-03-14T20:05:00Z"})
+    assert D.last_bar_final({**meta, "fetched_at": "2025-03-15T01:00:00Z"})
+    assert not D.last_bar_final({"last_date": "2025-03-14", "fetched_at": None})
+
+def test_manifest_ignored_when_file_changed_behind_it(tmp_path, monkeypatch):
+    monkeypatch.setattr(D, "CACHE_DIR", tmp_path)
+    D.seed_cache("Y", _bars())
+    _bars(40).to_csv(tmp_path / "Y.csv", index_label="date")
+    assert D.cache_meta("Y") is None
+    assert last_cached_date("Y").isoformat() == "2024-02-09"   # tail fallback
+    D.rebuild_manifest()
+    assert D.cache_meta("Y")["rows"] == 40
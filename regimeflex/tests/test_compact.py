@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from engine.compact import attach_panel, compact_frames, precision_audit, share_panel
+from engine.sweep import run_sweep
+
+def _bars(n=400, base=300.0, seed=0, start="2023-01-02"):
+    rng = np.random.default_rng(seed)
+    c = np.round(base * np.exp(np.cumsum(rng.normal(0, 0.012, n))), 2)
+    idx = pd.date_range(start, periods=n, freq="B", tz="UTC", name="date")
+    return pd.DataFrame({"open": c, "high": np.round(c * 1.01, 2), "low": np.round(c * 0.99, 2),
+                         "close": c, "volume": rng.integers(10**6, 9 * 10**7, n)}, index=idx)
+
+def test_compact_round_trips_cent_prices_on_shared_days():
+    q, p = _bars(), _bars(300, 12.0, seed=1, start="2023-03-01")
+    panel = compact_frames({"qqq": q, "psq": p})
+    assert panel.days.dtype == np.int32 and len(panel.days) == 400
+    assert panel.columns["close"].dtype == np.float32 and panel.columns["volume"].dtype == np.int32
+    assert panel.nbytes < q.memory_usage().sum() + p.memory_usage().sum()
+    pd.testing.assert_frame_equal(panel.frame("QQQ"), q, check_freq=False)
+    pd.testing.assert_frame_equal(panel.frame("PSQ"), p, check_freq=False)   # exact after rounding back
+
+def test_mixed_precision_symbols_keep_their_exact_prices():
+    q = _bars()
+    raw = q.assign(**{c: q[c] * (1 + np.pi * 1e-9) for c in ("open", "high", "low", "close")})
+    tol = _bars(seed=2).assign(**{c: q[c] / 3 for c in ("open", "high", "low", "close")})
+    stays = compact_frames({"QQQ": q, "RAW": raw}, tol=0.0)            # RAW stays float64
+    assert stays.columns["close"].dtype == np.float64
+    pd.testing.assert_frame_equal(stays.frame("QQQ"), q, check_freq=False, check_exact=True)
+    pd.testing.assert_frame_equal(stays.frame("RAW"), raw, check_freq=False, check_exact=True)
+    both = compact_frames({"QQQ": q, "TOL": tol}, tol=1e-6)            # cents next to tol-narrowed
+    pd.testing.assert_frame_equal(both.frame("QQQ"), q, check_freq=False, check_exact=True)
+
+def test_shared_block_is_read_only(tmp_path):
+    q = _bars()
+    with share_panel(compact_frames({"QQQ": q})) as owner:
+        worker = attach_panel(owner.spec)
+        arr = worker.panel.columns["close"]
+        assert not arr.flags.writeable
+        pd.testing.assert_frame_equal(worker.panel.frame("QQQ"), q, check_freq=False)
+        worker.panel = None
+        del arr
+        worker.close()
+
+def test_precision_audit_reports_no_signal_changes(tmp_path, monkeypatch):
+    monkeypatch.chdir(Path(__file__).parent.parent)     # config/exposure.yaml
+    res = precision_audit({"QQQ": _bars(600), "PSQ": _bars(600, 12.0, seed=3)})
+    assert list(res["symbol"]) == ["QQQ", "PSQ"]
+    assert (res[["side_changes", "phase_changes", "regime_changes"]] == 0).all().all()
+    assert (res["bytes_compact"] < res["bytes_float64"]).all()
+
+def test_process_sweep_matches_serial():
+    q = _bars(300)
+    p = q.assign(**{c: np.round(1e4 / q[c], 2) for c in ("open", "high", "low", "close")})
+    grid = dict(z_lens=[15, 20], z_bull_entries=[-2.0], z_bear_entries=[2.0])
+    serial = run_sweep(q, p, cache=False, **grid)
+    pd.testing.assert_frame_equal(run_sweep(q, p, workers=2, compact=True, cache=False, **grid), serial)
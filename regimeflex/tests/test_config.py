@@ -0,0 +1,55 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.config import Config, frozen_config
+from engine.pipeline import Pipeline, Stage
+
+def _read() -> int:
+    return Config(".")._load_yaml("config/x.yaml")["a"]
+
+def _in_thread(fn):
+    out = []
+    t = threading.Thread(target=lambda: out.append(fn()))
+    t.start()
+    t.join()
+    return out[0]
+
+def test_frozen_snapshot_is_scoped_to_the_calling_context(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path("config").mkdir()
+    Path("config/x.yaml").write_text("a: 1\n")
+    with frozen_config():
+        assert _read() == 1
+        Path("config/x.yaml").write_text("a: 22\n")
+        assert _read() == 1                          # the batch keeps its snapshot
+        assert _in_thread(_read) == 22               # other threads see the edit
+        # pipeline workers run in a copy of the batch's context
+        stages = [Stage(n, lambda n=n: {n: _read()}, outputs=(n,)) for n in ("s1", "s2")]
+        assert Pipeline(stages, max_workers=2).run({}) == {"s1": 1, "s2": 1}
+    assert _read() == 22
+
+def test_one_block_exiting_does_not_unfreeze_another(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path("config").mkdir()
+    Path("config/x.yaml").write_text("a: 1\n")
+    entered, a_done, seen = threading.Event(), threading.Event(), []
+
+    def b():
+        with frozen_config():
+            _read()
+            entered.set()
+            a_done.wait(5)
+            seen.append(_read())
+
+    t = threading.Thread(target=b)
+    with frozen_config():                            # A opens first, B enters while A is inside
+        _read()
+        t.start()
+        entered.wait(5)
+    Path("config/x.yaml").write_text("a: 22\n")      # A has left; B is still in its block
+    a_done.set()
+    t.join()
+    assert seen == [1]
@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from engine.costs import CostModel, adv_series, rebalance_cost
+from engine.exec_planner import OrderIntent
+from engine.daily_stages import stage_delta_filter
+from engine.backtest import BTConfig
+from engine.fills import FillModel, simulate_fills
+
+def test_cost_model_terms_and_broadcasting():
+    m = CostModel(slippage_bps=5.0, commission_per_share=0.01, fixed_fee_per_trade=1.0, impact_bps=100.0)
+    # 100 sh @ $50 with ADV 10_000: 5bps + 100bps·√0.01 = 15bps of $5,000 + $1 commission + $1 fee
+    assert np.isclose(m.cost(100, 50.0, 10_000), 5_000 * 15 / 1e4 + 1.0 + 1.0)
+    # many candidates at once; no ADV → no impact, zero shares → no fee
+    got = m.cost(np.array([0.0, -100.0, 100.0]), 50.0, np.array([np.nan, np.nan, 10_000]))
+    assert np.allclose(got, [0.0, 2.5 + 2.0, 7.5 + 2.0])
+    assert m.exec_price(100.0, "SELL", 100, 10_000) < 100.0 < m.exec_price(100.0, "BUY", 100, 10_000)
+    assert CostModel(slippage_bps=10.0).exec_price(100.0, "BUY") == 100.0 * (1 + 10.0 / 1e4)
+    assert np.allclose(m.fees([0.0, 100.0]), [0.0, 2.0])
+    assert BTConfig().cost_model().slippage_bps == 10.0
+
+def test_rebalance_cost_batch_rows():
+    m = CostModel(slippage_bps=10.0)
+    w_now = np.array([[0.5, 0.0], [0.5, 0.0]])
+    w_tgt = np.array([[0.6, 0.0], [0.0, 0.3]])
+    cost = rebalance_cost(m, w_tgt, w_now, np.array([10_000.0, 20_000.0]), np.array([100.0, 20.0]))
+    assert np.allclose(cost.sum(axis=1), [1_000 * 10 / 1e4, (10_000 + 6_000) * 10 / 1e4])
+
+def test_adv_series_trailing_mean():
+    df = pd.DataFrame({"volume": [10.0, 20.0, 30.0, 40.0]})
+    assert np.allclose(adv_series(df, 2), [10.0, 15.0, 25.0, 35.0])
+    assert np.isnan(adv_series(df.drop(columns="volume"), 2)).all()
+
+def test_delta_filter_skips_costly_resizes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config").mkdir()
+    (tmp_path / "config" / "risk.yaml").write_text(
+        "exposure_threshold: {enabled: false}\n"
+        "costs: {enabled: true, slippage_bps: 5, impact_bps: 50, expected_edge_bps: 10}\n")
+    it = lambda sym, side, qty: OrderIntent(symbol=sym, side=side, qty=qty, order_type="moc",
+                                           time_in_force="cls", limit_price=None, reason="t")
+    prices, adv = {"QQQ": 100.0, "PSQ": 10.0}, {"QQQ": 1_000.0, "PSQ": 1_000.0}
+    # small resize is cheap; a resize trading 25% of ADV costs 5 + 50·0.5 = 30bps > 10bps edge
+    out = stage_delta_filter([it("QQQ", "BUY", 1)], {}, {"QQQ": 100.0}, prices, adv)
+    assert len(out["intents_delta"]) == 1 and out["crumbs_delta"]["cost_filtered"] == 0
+    out = stage_delta_filter([it("QQQ", "BUY", 250)], {}, {"QQQ": 100.0}, prices, adv)
+    assert out["intents_delta"] == [] and out["crumbs_delta"]["no_op_reason"] == "COST_EXCEEDS_BENEFIT"
+    # entries and full exits are never cost-gated
+    out = stage_delta_filter([it("QQQ", "SELL", 100), it("PSQ", "BUY", 250)], {}, {"QQQ": 100.0}, prices, adv)
+    assert len(out["intents_delta"]) == 2
+
+def test_fills_price_through_the_cost_model():
+    m = CostModel(spread_bps=2.0, slippage_bps=5.0, impact_bps=100.0)
+    it = OrderIntent(symbol="QQQ", side="BUY", qty=100, order_type="moc", time_in_force="cls",
+                     limit_price=None, reason="t")
+    fill = simulate_fills([it], prices={"QQQ": 50.0}, bars={"QQQ": {"volume": 10_000.0}}, model=FillModel(cost=m))[0]
+    assert np.isclose(fill.price, m.exec_price(50.0, "BUY", 100, 10_000))
@@ -0,0 +1,83 @@
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.exec_alpaca import AlpacaCreds, AlpacaExecutor
+from engine.exec_planner import OrderIntent
+
+class FakeAlpaca(ThreadingHTTPServer):
+    """Minimal /v2/orders: first POST per symbol answers 503, duplicate client_order_id answers 422."""
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.orders = {}          # client_order_id → order
+        self.posts = []
+        self.failed_once = set()
+        self.lock = threading.Lock()
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        srv = self.server
+        p = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with srv.lock:
+            srv.posts.append(p)
+            if p["symbol"] not in srv.failed_once:
+                srv.failed_once.add(p["symbol"])
+                return self._send(503, {"message": "busy"})
+            if p["client_order_id"] in srv.orders:
+                return self._send(422, {"message": "client_order_id must be unique"})
+            order = {**p, "id": f"ord-{len(srv.orders) + 1}", "status": "accepted"}
+            srv.orders[p["client_order_id"]] = order
+        self._send(200, order)
+
+    def do_GET(self):
+        q = parse_qs(urlparse(self.path).query)
+        order = self.server.orders.get(q.get("client_order_id", [""])[0])
+        self._send(200 if order else 404, order or {"message": "not found"})
+
+def test_live_submission_retries_and_is_idempotent(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)   # fills journal goes to tmp logs/
+    srv = FakeAlpaca()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        exe = AlpacaExecutor(
+            AlpacaCreds(key="k", secret="s", base_url=f"http://127.0.0.1:{srv.server_address[1]}"),
+            dry_run=False,
+            submission={"max_concurrency": 2, "backoff_sec": 0.0, "read_timeout_sec": 5.0},
+        )
+        intents = [
+            OrderIntent("PSQ", "SELL", 100.0, "moc", "cls", None, "close short"),
+            OrderIntent("QQQ", "BUY", 20.0, "moc", "cls", None, "open long"),
+        ]
+        first = exe.place_orders(intents)
+        assert [r["status"] for r in first] == ["accepted", "accepted"]
+        assert first[0]["symbol"] == "PSQ" and first[1]["symbol"] == "QQQ"   # plan order kept
+
+        # re-trigger of the same plan: duplicates are resolved to the existing orders
+        again = exe.place_orders(intents)
+        exe.close()
+        assert [r["id"] for r in again] == [r["id"] for r in first]
+        assert len(srv.orders) == 2
+        assert len({p["client_order_id"] for p in srv.posts}) == 2
+        # one journal record per order: the re-trigger must not double the position deltas
+        journal = [json.loads(l) for l in (tmp_path / "logs/trading/fills_state.jsonl").read_text().splitlines()]
+        assert sorted(r["broker_id"] for r in journal) == sorted(r["id"] for r in first)
+    finally:
+        srv.shutdown()
+        srv.server_close()
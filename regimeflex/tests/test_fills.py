@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from engine.exec_planner import OrderIntent
+from engine.costs import CostModel
+from engine.fills import FillModel, fill_arrays, simulate_fills
+
+def _it(sym, side, qty, order_type="moc", limit=None):
+    return OrderIntent(symbol=sym, side=side, qty=qty, order_type=order_type,
+                       time_in_force="cls", limit_price=limit, reason="t")
+
+def test_each_leg_fills_at_its_own_price():
+    # coalesced flip: sell PSQ, buy QQQ — the PSQ leg must not use the QQQ price
+    fills = simulate_fills([_it("PSQ", "SELL", 100), _it("QQQ", "BUY", 10)],
+                           prices={"QQQ": 400.0, "psq": 12.5})
+    assert [(f.symbol, f.price) for f in fills] == [("PSQ", 12.5), ("QQQ", 400.0)]
+    # legacy single-price callers are unchanged
+    legacy = simulate_fills([_it("QQQ", "BUY", 5, "limit", 399.0)], last_price=400.0)
+    assert legacy[0].price == 399.0 and legacy[0].note == "limit simulated"
+
+def test_costs_and_participation_caps():
+    model = FillModel(cost=CostModel(spread_bps=4.0, slippage_bps=1.0, impact_bps=100.0), max_participation=0.1)
+    bars = {"QQQ": {"volume": 1_000.0, "high": 401.0, "low": 399.0}}
+    fills = simulate_fills([_it("QQQ", "BUY", 60), _it("QQQ", "BUY", 60)], prices={"QQQ": 400.0},
+                           bars=bars, model=model)
+    # both orders share the 100-share cap: 60 + 40
+    assert [f.qty for f in fills] == [60.0, 40.0]
+    assert fills[1].requested_qty == 60.0 and "partial" in fills[1].note
+    expected = 400.0 * (1 + (2.0 + 1.0 + 100.0 * np.sqrt(0.06)) / 1e4)
+    assert abs(fills[0].price - expected) < 1e-9
+    sell = simulate_fills([_it("QQQ", "SELL", 10)], prices={"QQQ": 400.0}, model=FillModel(cost=CostModel(spread_bps=4.0)))
+    assert sell[0].price == 400.0 * (1 - 2.0 / 1e4)
+
+def test_passive_limit_needs_touch_when_enabled():
+    bars = {"QQQ": {"volume": 1e6, "high": 402.0, "low": 399.5}}
+    model = FillModel(limit_touch=True)
+    assert simulate_fills([_it("QQQ", "BUY", 5, "limit", 398.0)], prices={"QQQ": 400.0}, bars=bars, model=model) == []
+    hit = simulate_fills([_it("QQQ", "BUY", 5, "limit", 399.8)], prices={"QQQ": 400.0}, bars=bars, model=model)
+    assert hit[0].price == 399.8
+
+def test_fill_arrays_batch():
+    n = 10_000
+    rng = np.random.default_rng(0)
+    codes = rng.integers(0, 50, n)
+    qty = rng.uniform(1, 100, n)
+    filled, px = fill_arrays(np.where(rng.random(n) > 0.5, 1.0, -1.0), qty, np.full(n, 100.0),
+                             FillModel(max_participation=0.5), volume=np.full(n, 1_000.0), codes=codes)
+    per_symbol = np.bincount(codes, weights=filled)
+    assert np.all(per_symbol <= 500.0 + 1e-9) and np.all(filled <= qty) and np.all(px == 100.0)
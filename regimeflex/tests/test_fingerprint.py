@@ -0,0 +1,45 @@
+import sys
+import os
+import shutil
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.fingerprint import (compute_fingerprint, diff_fingerprints, FILE_DIGESTS,
+                                load_last_fingerprint, save_last_fingerprint)
+
+ROOT = Path(__file__).parent.parent
+
+def _settle(root: Path):
+    t = time.time() - 10
+    for p in (root / "config").glob("*.yaml"):
+        os.utime(p, (t, t))
+
+def test_fingerprint_rehashes_only_changed_files(tmp_path):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    _settle(tmp_path)
+    FILE_DIGESTS.clear()
+    fp1 = compute_fingerprint(str(tmp_path))
+    misses = FILE_DIGESTS.misses
+    assert set(fp1["file_hashes"]) == set(fp1["files"])
+
+    assert compute_fingerprint(str(tmp_path)) == fp1
+    assert FILE_DIGESTS.misses == misses       # all served from the stat cache
+
+    risk = tmp_path / "config" / "risk.yaml"
+    risk.write_text(risk.read_text() + "\n# edited\n")
+    fp2 = compute_fingerprint(str(tmp_path))
+    assert FILE_DIGESTS.misses == misses + 1
+    assert fp2["sha256"] != fp1["sha256"]
+    assert diff_fingerprints(fp1, fp2) == ["config/risk.yaml"]
+
+def test_diff_fingerprints_handles_missing_previous(tmp_path):
+    fp = {"file_hashes": {"config/a.yaml": "1", "config/b.yaml": "2"}}
+    assert diff_fingerprints(None, fp) == []
+    assert diff_fingerprints({"file_hashes": {"config/a.yaml": "1"}}, fp) == ["config/b.yaml"]
+
+    path = tmp_path / "state" / "fingerprint.json"
+    assert load_last_fingerprint(path) is None
+    save_last_fingerprint(fp, path)
+    assert load_last_fingerprint(path) == fp
@@ -0,0 +1,83 @@
+import sys
+import shutil
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from engine.health import HealthMonitor, CheckResult, last_cached_date, run_health
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+    def __call__(self):
+        return self.t
+
+def test_checks_reused_within_ttl():
+    calls = {"a": 0, "b": 0}
+    def a():
+        calls["a"] += 1
+        return CheckResult("a", "PASS", "ok")
+    def b():
+        calls["b"] += 1
+        return CheckResult("b", "WARN", "meh")
+    clock = _Clock()
+    mon = HealthMonitor([("a", a), ("b", b)], ttl_sec={"a": 10, "b": 0}, clock=clock)
+
+    rep = mon.run()
+    assert rep.status == "WARN" and [c.name for c in rep.checks] == ["a", "b"]
+    mon.run()
+    assert calls == {"a": 1, "b": 2}
+    clock.t = 11
+    mon.run()
+    assert calls == {"a": 2, "b": 3}
+    mon.run(force=True)
+    assert calls == {"a": 3, "b": 4}
+
+def test_raising_check_is_fail():
+    def boom():
+        raise RuntimeError("nope")
+    rep = HealthMonitor([("boom", boom)]).run()
+    assert rep.status == "FAIL" and "nope" in rep.checks[0].detail
+
+def test_snapshot_serves_cached_report():
+    calls = []
+    def a():
+        calls.append(1)
+        return CheckResult("a", "PASS", "ok")
+    mon = HealthMonitor([("a", a)], ttl_sec={"a": 60})
+    first = mon.snapshot()
+    assert mon.snapshot() is first
+    assert len(calls) == 1
+
+def test_snapshot_runs_zero_ttl_checks_inline(monkeypatch):
+    state = {"killed": False}
+    kill = lambda: CheckResult("kill", "FAIL" if state["killed"] else "PASS", "")
+    mon = HealthMonitor([("kill", kill), ("slow", lambda: CheckResult("slow", "PASS", ""))],
+                        ttl_sec={"kill": 0, "slow": 60})
+    mon.snapshot()
+    started = []
+    monkeypatch.setattr("engine.health.threading.Thread", lambda *a, **k: started.append(k))
+    state["killed"] = True
+    assert mon.snapshot().status == "FAIL"
+    assert started == []
+
+def test_last_cached_date_reads_tail(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("engine.data.CACHE_DIR", tmp_path)
+    idx = pd.date_range("2020-01-01", periods=500, freq="D", name="date")
+    df = pd.DataFrame({"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1}, index=idx)
+    df.to_csv(tmp_path / "QQQ.csv", index_label="date")
+    assert last_cached_date("QQQ") == idx[-1].date()
+    assert last_cached_date("NOPE") is None
+
+def test_run_health_reports_all_checks(tmp_path, monkeypatch):
+    shutil.copytree(Path(__file__).parent.parent / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("engine.health._monitor", None)
+    rep = run_health(force=True)
+    names = [c.name for c in rep.checks]
+    assert names == ["kill_switch", "configs_present", "broker_mode", "data_cache",
+                     "fs_permissions", "telemetry", "eod_guard"]
+    assert rep.status in ("PASS", "WARN", "FAIL")
@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from engine.bench import import_time, IMPORT_TARGETS
+
+ROOT = Path(__file__).parent.parent
+
+# generous ceilings for a small container; the module checks below are the strict part
+RUNNER_BUDGET_SEC = 1.5
+HTTP_BUDGET_SEC = 1.0
+
+# loaded on first use only (engine/lazy.py)
+DEFERRED = ("telegram", "requests", "matplotlib", "engine.data_providers")
+
+def test_engine_runner_import_budget():
+    secs, mods = import_time(IMPORT_TARGETS["engine.runner"], ROOT)
+    print(f"import engine.runner: {secs * 1000:.1f} ms")
+    assert not [m for m in DEFERRED if m in mods]
+    assert secs <= RUNNER_BUDGET_SEC, f"engine.runner import took {secs:.2f}s (budget {RUNNER_BUDGET_SEC}s)"
+
+def test_http_trigger_import_budget():
+    pytest.importorskip("flask")
+    secs, mods = import_time(IMPORT_TARGETS["run_http_trigger"], ROOT)
+    print(f"import run_http_trigger: {secs * 1000:.1f} ms")
+    # the web process answers /health and queues jobs without the engine's data stack
+    assert not [m for m in DEFERRED + ("pandas", "engine.runner") if m in mods]
+    assert secs <= HTTP_BUDGET_SEC, f"run_http_trigger import took {secs:.2f}s (budget {HTTP_BUDGET_SEC}s)"
@@ -0,0 +1,53 @@
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from engine.intraday import (ingest, months, load_bars, iter_chunks, resample, resample_store,
+                             synthetic_today_bar, with_synthetic_bar)
+
+def _minutes(start: str, n: int, base: float = 100.0) -> pd.DataFrame:
+    idx = pd.date_range(start, periods=n, freq="1min", tz="UTC")
+    close = base + np.arange(n) * 0.01
+    return pd.DataFrame({"open": close, "high": close + 0.05, "low": close - 0.05,
+                         "close": close, "volume": np.full(n, 100.0)}, index=idx)
+
+def test_store_chunks_by_month_and_merges(tmp_path):
+    a = _minutes("2026-09-30 22:00", 180)                  # crosses into October
+    assert ingest("qqq", a, root=tmp_path) == 180
+    assert months("QQQ", root=tmp_path) == ["2026-09", "2026-10"]
+
+    fix = a.iloc[-10:].copy()
+    fix["close"] = 1.0                                     # re-delivered bars replace the old ones
+    ingest("QQQ", fix, root=tmp_path)
+    full = load_bars("QQQ", root=tmp_path)
+    assert len(full) == 180 and full.index.is_monotonic_increasing
+    assert (full["close"].iloc[-10:] == 1.0).all()
+
+    window = load_bars("QQQ", "2026-09-30 23:55", "2026-10-01 00:04", root=tmp_path)
+    assert len(window) == 10
+    assert [len(c) for c in iter_chunks("QQQ", root=tmp_path)] == [120, 60]
+
+def test_resample_and_synthetic_session_bar(tmp_path):
+    # 2026-10-19 09:30–15:44 New York (13:30 UTC onward)
+    bars = _minutes("2026-10-19 13:30", 375)
+    ingest("QQQ", bars, root=tmp_path)
+    five = resample(bars, "5min")
+    assert len(five) == 75 and five["volume"].iloc[0] == 500.0
+    assert resample_store("QQQ", "1Min", "5Min", "5min", root=tmp_path) == 75
+
+    bar = synthetic_today_bar("QQQ", asof=datetime(2026, 10, 19, 19, 44), root=tmp_path)
+    assert bar.index[0] == pd.Timestamp("2026-10-19", tz="UTC")
+    assert bar["open"].iloc[0] == bars["open"].iloc[0] and bar["close"].iloc[0] == bars["close"].iloc[-1]
+    assert bar["volume"].iloc[0] == 375 * 100
+
+    daily = pd.DataFrame({"open": [1.0, 2.0], "high": [1.0, 2.0], "low": [1.0, 2.0], "close": [1.0, 2.0],
+                          "volume": [10, 20]},
+                         index=pd.DatetimeIndex(["2026-10-16", "2026-10-19"], tz="UTC", name="date"))
+    out = with_synthetic_bar(daily, bar)
+    assert len(out) == 2 and out["close"].iloc[-1] == bars["close"].iloc[-1]
+    assert synthetic_today_bar("QQQ", asof=datetime(2026, 10, 20, 14, 0), root=tmp_path) is None
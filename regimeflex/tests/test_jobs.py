@@ -0,0 +1,77 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine import telemetry
+from engine.jobs import JobManager, _FileLock
+
+def _result():
+    return {"target": {"TQQQ": 0.5}, "intents": [], "positions_after": {},
+            "breadcrumbs": {"no_op": True, "no_op_reason": "test", "run_duration_sec": 0.01}}
+
+def test_submit_returns_immediately_and_dedupes_same_session(tmp_path):
+    gate = threading.Event()
+    calls = []
+    def runner():
+        calls.append(1)
+        gate.wait(5)
+        return _result()
+
+    jm = JobManager(runner, lock_path=tmp_path / "run.lock", session_fn=lambda: "2025-01-02")
+    job, created = jm.submit()
+    assert created and job.status in ("queued", "running")
+
+    again, created2 = jm.submit()
+    assert not created2 and again.id == job.id
+
+    gate.set()
+    done = jm.wait(job.id, timeout=5)
+    assert done.status == "succeeded"
+    assert done.result["no_op_reason"] == "test"
+    assert len(calls) == 1
+
+    # a finished job no longer blocks a new one for the same session
+    _, created3 = jm.submit()
+    assert created3
+
+def test_failed_job_records_error(tmp_path):
+    def runner():
+        raise RuntimeError("boom")
+    jm = JobManager(runner, lock_path=tmp_path / "run.lock", session_fn=lambda: "s")
+    job, _ = jm.submit()
+    done = jm.wait(job.id, timeout=5)
+    assert done.status == "failed"
+    assert "RuntimeError: boom" in done.error
+
+def test_job_skipped_when_another_process_holds_lock(tmp_path):
+    lock_path = tmp_path / "run.lock"
+    held = _FileLock(lock_path)
+    assert held.acquire()
+    try:
+        jm = JobManager(_result, lock_path=lock_path, session_fn=lambda: "s")
+        job, _ = jm.submit()
+        assert jm.wait(job.id, timeout=5).status == "skipped"
+    finally:
+        held.release()
+
+def test_history_trims_finished_jobs(tmp_path):
+    n = iter(range(100))
+    jm = JobManager(_result, history=3, lock_path=tmp_path / "run.lock", session_fn=lambda: f"s{next(n)}")
+    ids = []
+    for _ in range(5):
+        job, _ = jm.submit()
+        jm.wait(job.id, timeout=5)
+        ids.append(job.id)
+    assert [j.id for j in jm.list()] == list(reversed(ids[-3:]))
+    assert jm.get(ids[0]) is None
+
+def test_job_flushes_notifications_before_reporting_done(tmp_path, monkeypatch):
+    order = []
+    monkeypatch.setattr(telemetry, "flush_notifications", lambda timeout=None: order.append("flush"))
+    jm = JobManager(lambda: order.append("run") or _result(), lock_path=tmp_path / "run.lock",
+                    session_fn=lambda: "s")
+    job, _ = jm.submit()
+    assert jm.wait(job.id, timeout=5).status == "succeeded"
+    assert order == ["run", "flush"]
@@ -0,0 +1,47 @@
+import sys
+import gzip
+import os
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.logrotate import rotate_once
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+def test_rotates_past_days_and_expires_archives_in_one_pass(tmp_path):
+    old = tmp_path / "ledger_20200101.jsonl"
+    old.write_text('{"a":1}\n' * 100, encoding="utf-8")
+    active = tmp_path / f"ledger_{_today()}.jsonl"
+    active.write_text('{"b":2}\n', encoding="utf-8")
+    expired = tmp_path / "ledger_20190101.jsonl.gz"
+    expired.write_bytes(gzip.compress(b"x"))
+    stamp = (datetime.now(timezone.utc) - timedelta(days=40)).timestamp()
+    os.utime(expired, (stamp, stamp))
+    (tmp_path / "ledger_20200102.jsonl.gz.tmp").write_bytes(b"partial")
+
+    with ThreadPoolExecutor(2) as pool:
+        res = rotate_once(tmp_path, ["*.jsonl"], retention_days=30, pool=pool)
+
+    assert res == {"archived": 1, "removed": 1}
+    assert not old.exists() and active.exists() and not expired.exists()
+    assert gzip.decompress((tmp_path / "ledger_20200101.jsonl.gz").read_bytes()) == b'{"a":1}\n' * 100
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_oversized_active_file_is_cut_and_compressed(tmp_path):
+    active = tmp_path / f"ledger_{_today()}.jsonl"
+    active.write_text("x" * 2048, encoding="utf-8")
+    res = rotate_once(tmp_path, ["*.jsonl"], retention_days=30, max_bytes=1024)
+    assert res["archived"] == 1
+    assert not active.exists()
+    parts = list(tmp_path.glob(f"ledger_{_today()}.r*.jsonl.gz"))
+    assert len(parts) == 1 and gzip.decompress(parts[0].read_bytes()) == b"x" * 2048
+
+def test_small_active_file_left_alone(tmp_path):
+    active = tmp_path / f"ledger_{_today()}.jsonl"
+    active.write_text("x", encoding="utf-8")
+    assert rotate_once(tmp_path, ["*.jsonl"], retention_days=30, max_bytes=1024) == {"archived": 0, "removed": 0}
+    assert active.exists()
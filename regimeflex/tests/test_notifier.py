@@ -0,0 +1,47 @@
+import sys
+import asyncio
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.telemetry import NotifierService, TGCreds
+
+def test_messages_within_window_are_coalesced_and_flushed():
+    delivered = []
+    async def sender(text):
+        delivered.append(text)
+    svc = NotifierService(TGCreds("t", "c"), coalesce_ms=200, sender=sender)
+    for i in range(3):
+        svc.submit(f"msg {i}")
+    assert svc.flush(timeout=5)
+    assert delivered == ["msg 0\n\nmsg 1\n\nmsg 2"]
+    svc.shutdown()
+
+def test_transient_failures_retry_with_backoff():
+    attempts = []
+    async def flaky(text):
+        attempts.append(text)
+        if len(attempts) < 3:
+            raise ConnectionError("telegram down")
+    svc = NotifierService(TGCreds("t", "c"), coalesce_ms=0, max_retries=3, backoff_sec=0.01, sender=flaky)
+    svc.submit("summary")
+    assert svc.flush(timeout=5)
+    assert len(attempts) == 3 and svc.sent == 1 and svc.failed == 0
+    svc.shutdown()
+
+def test_bounded_queue_drops_oldest_without_blocking():
+    gate = asyncio.Event()
+    delivered = []
+    async def slow(text):
+        await gate.wait()
+        delivered.append(text)
+    svc = NotifierService(TGCreds("t", "c"), max_queue=2, coalesce_ms=0, sender=slow)
+    svc.submit("first")              # picked up by the worker, blocked in sender
+    assert not svc.flush(timeout=0.2)
+    for t in ("a", "b", "c"):
+        svc.submit(t)
+    svc._loop.call_soon_threadsafe(gate.set)
+    assert svc.flush(timeout=5)
+    assert svc.dropped == 1 and delivered[0] == "first" and "a" not in "".join(delivered[1:])
+    svc.shutdown()
@@ -0,0 +1,66 @@
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.pipeline import Pipeline, Stage, StageMemo, digest
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)   # deadlocks (→ BrokenBarrierError) if run serially
+    def load(sym):
+        barrier.wait()
+        return {f"{sym}_df": sym}
+    p = Pipeline([
+        Stage("load_a", lambda: load("a"), outputs=("a_df",)),
+        Stage("load_b", lambda: load("b"), outputs=("b_df",)),
+        Stage("join", lambda a_df, b_df: {"pair": a_df + b_df}, inputs=("a_df", "b_df"), outputs=("pair",)),
+    ], max_workers=2)
+    assert p.run()["pair"] == "ab"
+
+def test_pure_stage_memoized_on_inputs_and_salt():
+    calls = []
+    def phase(df):
+        calls.append(1)
+        return {"phase": float(df["close"].iloc[-1])}
+    memo = StageMemo()
+    stages = [Stage("phase", phase, inputs=("df",), outputs=("phase",), pure=True)]
+    df = pd.DataFrame({"close": [1.0, 2.0]})
+    for salt in ("cfg1", "cfg1", "cfg2"):
+        Pipeline(stages, max_workers=1, memo=memo, salt_key="fp").run({"df": df, "fp": salt})
+    assert len(calls) == 2 and memo.hits == 1
+    Pipeline(stages, max_workers=1, memo=memo, salt_key="fp").run({"df": df.assign(close=[1.0, 3.0]), "fp": "cfg1"})
+    assert len(calls) == 3
+
+def test_halt_stops_downstream_and_cycles_rejected():
+    ran = []
+    p = Pipeline([
+        Stage("gate", lambda: {"halt": "KILL_SWITCH"}),
+        Stage("load", lambda: ran.append("load") or {}, after=("gate",)),
+    ], max_workers=2)
+    ctx = p.run()
+    assert ctx["halted_by"] == "gate" and ran == []
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", dict, inputs=("y",), outputs=("x",)), Stage("b", dict, inputs=("x",), outputs=("y",))])
+
+def test_digest_sensitive_to_frame_values():
+    a = pd.DataFrame({"close": [1.0, 2.0]})
+    assert digest(a) == digest(a.copy())
+    assert digest(a) != digest(a.assign(close=[1.0, 2.5]))
+
+def test_decide_halt_leaves_every_breadcrumb_input_in_ctx():
+    from engine.daily_stages import decision_stages
+    p = Pipeline(decision_stages(universe=False))
+    producers = {k: s.name for s in p.stages for k in s.outputs}
+    ancestors, todo = set(), ["decide"]
+    while todo:
+        for dep in p._deps[todo.pop()] - ancestors:
+            ancestors.add(dep)
+            todo.append(dep)
+    # build_crumbs reads these when "decide" ends the run on a zero-intent day
+    for key in ("fp", "calendar", "target", "sig_sym", "phase", "plan_reason", "positions_before"):
+        assert producers[key] in ancestors, key
@@ -0,0 +1,19 @@
+import sys
+import csv
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.pnl import snapshot_from_positions, append_snapshot_csv
+
+def test_new_symbols_extend_the_header_instead_of_shifting_columns(tmp_path):
+    path = tmp_path / "daily_snapshot.csv"
+    append_snapshot_csv(snapshot_from_positions({"QQQ": 10}, {"QQQ": 400.0}, 10_000.0), path)
+    append_snapshot_csv(snapshot_from_positions({"TQQQ": 5}, {"TQQQ": 60.0}, 10_000.0,
+                                                symbols=("TQQQ", "SQQQ")), path)
+
+    with path.open(newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]["QQQ_mv"] == "4000.00" and rows[0]["TQQQ_mv"] == ""
+    assert rows[1]["TQQQ_mv"] == "300.00" and rows[1]["QQQ_mv"] == ""
+    assert rows[1]["SQQQ_w"] == "0.0000"
@@ -5,13 +5,16 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+import pytest
+
 from engine.reconcile_positions import effective_positions_before
 from engine.fills_state import FILLS_FILE
 
-def setup_module(_):
+@pytest.fixture(autouse=True)
+def _tmp_journal(tmp_path, monkeypatch):
+    # FILLS_FILE is relative: keep the test journal out of the working tree's logs/
+    monkeypatch.chdir(tmp_path)
     FILLS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    if FILLS_FILE.exists():
-        FILLS_FILE.unlink()
     FILLS_FILE.write_text("", encoding="utf-8")
 
 def test_prefers_broker_snapshot_over_local_fills(tmp_path):
@@ -0,0 +1,36 @@
+import sys
+import json
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.report import render_batch, render_daily_html, write_daily_html, CSS_NAME, RENDER_INDEX
+
+def _result(sym="TQQQ", dollars=1000.0):
+    return {"target": {"symbol": sym, "direction": "LONG", "dollars": dollars, "shares": 2.0, "notes": "<x>"},
+            "intents": [], "positions_after": {}, "breadcrumbs": {"phase": "bull"}}
+
+def test_render_is_escaped_and_links_shared_css():
+    html = render_daily_html(_result(), "WARN", stamp="2025-01-01_2000Z")
+    assert "<code>&lt;x&gt;</code>" in html
+    assert f"href='{CSS_NAME}'" in html and "<style>" not in html
+    assert "banner warn" in html and "Generated 2025-01-01_2000Z" in html
+
+def test_write_daily_html_explicit_filename(tmp_path):
+    path = write_daily_html(_result(), str(tmp_path), filename="daily_report_2024-05-01.html", health_status="PASS")
+    assert Path(path).name == "daily_report_2024-05-01.html"
+    assert (tmp_path / CSS_NAME).exists()
+
+def test_render_batch_skips_unchanged_pages(tmp_path):
+    pages = [(f"p{i}.html", _result(dollars=float(i))) for i in range(6)]
+    assert render_batch(pages, str(tmp_path), health_status="PASS", workers=3) == {"rendered": 6, "skipped": 0}
+    assert len(json.loads((tmp_path / RENDER_INDEX).read_text())) == 6
+
+    pages[2] = ("p2.html", _result(sym="SQQQ"))
+    (tmp_path / "p4.html").unlink()
+    assert render_batch(pages, str(tmp_path), health_status="PASS") == {"rendered": 2, "skipped": 4}
+    assert "SQQQ" in (tmp_path / "p2.html").read_text()
+
+    # health change alters every page's inputs; incremental=False forces a full render
+    assert render_batch(pages, str(tmp_path), health_status="FAIL")["rendered"] == 6
+    assert render_batch(pages, str(tmp_path), health_status="FAIL", incremental=False)["rendered"] == 6
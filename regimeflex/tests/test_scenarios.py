@@ -0,0 +1,34 @@
+import sys
+import shutil
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.bench import make_bench_series
+from engine.data import seed_cache
+from engine.runner import Scenario, run_scenarios
+
+ROOT = Path(__file__).parent.parent
+
+def test_scenario_batch_is_side_effect_free(tmp_path, monkeypatch):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    Path("data/cache").mkdir(parents=True)
+    seed_cache("QQQ", make_bench_series(400, 400.0, seed=5))
+    seed_cache("PSQ", make_bench_series(400, 15.0, seed=5, inverse=True))
+    before = {p for p in tmp_path.rglob("*") if p.is_file()}
+
+    df = run_scenarios([
+        Scenario(name="small", equity=10_000.0, positions={}),
+        Scenario(name="large", equity=100_000.0, positions={}),
+        Scenario(name="panic", equity=100_000.0, vix=45.0, positions={}, fomc_blackout=True),
+    ])
+
+    assert list(df["scenario"]) == ["small", "large", "panic"]
+    small, large, panic = df.to_dict("records")
+    assert large["target_dollars"] >= small["target_dollars"]
+    assert panic["risk_blocked"] and not large["risk_blocked"]
+    assert all(isinstance(r, list) for r in df["intents"])
+    # no ledger, preview, positions or snapshot files written
+    assert {p for p in tmp_path.rglob("*") if p.is_file()} == before
@@ -0,0 +1,95 @@
+import sys
+import shutil
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine import daily_stages
+from engine.bench import make_bench_series, time_call
+from engine.costs import CostModel
+from engine.data import seed_cache
+from engine.daily_stages import decision_stages, subgraph, stage_adv, PLANNING_STAGES
+from engine.exposure import exposure_allocator
+from engine.fills import FillModel
+from engine.guardrails import enforce_exposure_caps
+from engine.pipeline import Pipeline
+from engine.runner import run_daily_offline
+from engine.sim import SimConfig, run_sim
+
+ROOT = Path(__file__).parent.parent
+
+def _setup(tmp_path, monkeypatch):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    qqq = make_bench_series(600, 400.0, seed=7)
+    psq = make_bench_series(600, 15.0, seed=7, inverse=True)
+    return qqq, psq
+
+def test_sim_writes_nothing_and_trades(tmp_path, monkeypatch):
+    qqq, psq = _setup(tmp_path, monkeypatch)
+    before = {p for p in tmp_path.rglob("*") if p.is_file()}
+    res = run_sim(qqq, qqq, psq, ["QQQ", "PSQ"], SimConfig(start_equity=50_000.0))
+    assert {p for p in tmp_path.rglob("*") if p.is_file()} == before
+    assert res.trades > 0 and len(res.equity_curve) == len(res.days) > 300
+    assert res.equity_curve.iloc[0] > 0
+    assert set(res.fills["symbol"]) <= {"QQQ", "PSQ"}
+
+def test_sim_day_is_a_fraction_of_a_runner_cycle(tmp_path, monkeypatch):
+    # relative bound (absolute per-day timing lives in scripts/bench_engine.py as sim_per_day[...])
+    _setup(tmp_path, monkeypatch)
+    Path("data/cache").mkdir(parents=True)
+    Path("logs/audit").mkdir(parents=True)
+    seed_cache("QQQ", make_bench_series(400, 400.0, seed=5))
+    seed_cache("PSQ", make_bench_series(400, 15.0, seed=5, inverse=True))
+    monkeypatch.setattr(daily_stages, "eod_ready", lambda m: (True, "test"))
+    run_daily_offline(equity=50_000, vix=20.0, minutes_to_close=15)           # warm imports/caches
+    cycle = time_call(lambda: run_daily_offline(equity=50_000, vix=20.0, minutes_to_close=15), repeat=3)
+
+    qqq = make_bench_series(2_500, 400.0, seed=7)
+    psq = make_bench_series(2_500, 15.0, seed=7, inverse=True)
+    res = run_sim(qqq, qqq, psq, ["QQQ", "PSQ"], SimConfig(start_equity=50_000.0))
+    assert len(res.days) > 2_000 and res.trades > 0
+    assert res.sec_per_day < cycle / 10          # ~1/50 of a warm cycle measured
+
+def test_sim_charges_fees_in_cash(tmp_path, monkeypatch):
+    qqq, psq = _setup(tmp_path, monkeypatch)
+    free = run_sim(qqq, qqq, psq, ["QQQ", "PSQ"], SimConfig(fill_model=FillModel()))
+    paid = run_sim(qqq, qqq, psq, ["QQQ", "PSQ"],
+                   SimConfig(fill_model=FillModel(cost=CostModel(commission_per_share=0.01, fixed_fee_per_trade=1.0))))
+    day = free.fills["date"].iloc[0]
+    first = free.fills[free.fills["date"] == day]
+    nav = lambda r: r.days.loc[r.days["date"] == day, "nav"].iloc[0]
+    assert abs(nav(free) - nav(paid) - (0.01 * first["qty"].sum() + len(first))) < 1e-6
+
+def test_sim_day_matches_live_planning(tmp_path, monkeypatch):
+    qqq, psq = _setup(tmp_path, monkeypatch)
+    full = run_sim(qqq, qqq, psq, ["QQQ", "PSQ"])
+    day = full.fills["date"].iloc[len(full.fills) // 2]                  # a day that trades
+    prev = run_sim(qqq, qqq, psq, ["QQQ", "PSQ"],
+                   SimConfig(end=str(qqq.index[qqq.index.get_loc(day) - 1].date())))
+    cur = run_sim(qqq, qqq, psq, ["QQQ", "PSQ"], SimConfig(end=str(day.date())))
+
+    # the live planning stages on the same state: positions/cash from the prior run, frames cut at `day`
+    positions = {}
+    cash = 25_000.0
+    for f in prev.fills.to_dict("records"):
+        signed = f["qty"] if f["side"] == "BUY" else -f["qty"]
+        positions[f["symbol"]] = positions.get(f["symbol"], 0.0) + signed
+        cash -= signed * f["price"]
+    positions = {k: v for k, v in positions.items() if abs(v) > 1e-9}
+    q, p = qqq.loc[:day], psq.loc[:day]
+    prices = {"QQQ": float(q["close"].iloc[-1]), "PSQ": float(p["close"].iloc[-1])}
+    last = {f["symbol"]: f["date"] for f in prev.fills.to_dict("records")}
+    ctx = Pipeline(subgraph(decision_stages(), PLANNING_STAGES), max_workers=1).run({
+        "alloc_raw": enforce_exposure_caps(exposure_allocator(q))[0],
+        "sides": ["QQQ", "PSQ"], "exec_map": {"long": "QQQ", "short": "PSQ"},
+        "long_df": q, "short_df": p, **stage_adv(q, p, ["QQQ", "PSQ"]),
+        "equity": cash + sum(sh * prices[s] for s, sh in positions.items()),
+        "last_prices_map": prices, "price_info": {}, "positions_before": positions,
+        "positions_source": "test", "minutes_to_close": 15, "min_trade_value": 200.0, "t0": 0.0,
+        "days_since": lambda s: (day - last[s]).days if s in last else None,
+    })
+    row = cur.days.iloc[-1]
+    assert row["date"] == day
+    assert row["alloc_long"] == ctx["alloc_capped"]["QQQ"] and row["alloc_short"] == ctx["alloc_capped"]["PSQ"]
+    assert row["n_intents"] == len(ctx.get("intents") or []) > 0
@@ -0,0 +1,39 @@
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.stage_timer import StageTimer
+
+def test_spans_accumulate_wall_and_cpu():
+    timer = StageTimer(enabled=True)
+    with timer.span("allocator"):
+        time.sleep(0.01)
+    with timer.span("allocator"):
+        sum(range(10_000))
+    with timer.span("turnover"):
+        pass
+    d = timer.as_dict()
+    assert list(d.keys()) == ["allocator", "turnover"]
+    assert d["allocator"]["calls"] == 2
+    assert d["allocator"]["wall_ms"] >= 10.0
+    # sleeping is wall time, not CPU time
+    assert d["allocator"]["cpu_ms"] < d["allocator"]["wall_ms"]
+    assert timer.slowest(1)[0][0] == "allocator"
+
+def test_disabled_timer_records_nothing():
+    timer = StageTimer(enabled=False)
+    with timer.span("fingerprint"):
+        pass
+    assert timer.as_dict() == {}
+
+def test_allocation_tracking_inside_profile(tmp_path):
+    timer = StageTimer(enabled=True, track_allocations=True, tracemalloc_top=5, out_dir=tmp_path)
+    with timer.profile("unit"):
+        with timer.span("alloc"):
+            blob = [bytes(1024) for _ in range(200)]
+    assert timer.as_dict()["alloc"]["alloc_kb"] > 100
+    assert len(list(tmp_path.glob("unit_*_alloc.txt"))) == 1
+    del blob
@@ -0,0 +1,84 @@
+import sys
+import time
+import shutil
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+import yaml
+
+from engine import daily_stages
+from engine.bench import make_bench_series
+from engine.data import seed_cache
+from engine.runner import run_daily_offline
+from engine.guardrails import enforce_exposure_caps
+from engine.turnover import enforce_turnover_cap
+from engine.sizing import SizeConstraints
+from engine.universe import Universe, cap_weights, current_weights, turnover_cap, plan_rebalance, target_weights
+
+def test_two_leg_parity_with_existing_guards():
+    u = Universe.from_symbols(["TQQQ", "SQQQ"], max_weight={"TQQQ": 0.6, "SQQQ": 0.5}, max_gross=0.9)
+    limits = {"max_tqqq": 0.6, "max_sqqq": 0.5, "max_gross": 0.9}
+    for w in ({"TQQQ": 0.8, "SQQQ": 0.4}, {"TQQQ": 0.3, "SQQQ": 0.0}, {"TQQQ": -0.2, "SQQQ": 0.7}):
+        ref, _ = enforce_exposure_caps(w, limits)
+        got, _ = cap_weights(u, u.vector(w))
+        assert np.allclose(got, u.vector(ref))
+
+    pos, px, eq = {"TQQQ": 10.0, "SQQQ": 0.0}, {"TQQQ": 50.0, "SQQQ": 20.0}, 10_000.0
+    for mode in ("clamp", "skip"):
+        ref_w, _, ref_frac, _ = enforce_turnover_cap({"TQQQ": 0.1, "SQQQ": 0.4}, pos, px, eq, 0.15, mode)
+        w_now = current_weights(u.vector(pos), u.vector(px), eq)
+        got, frac, _ = turnover_cap(u.vector({"TQQQ": 0.1, "SQQQ": 0.4}), w_now, 0.15, mode)
+        assert np.isclose(frac, ref_frac) and np.allclose(got, u.vector(ref_w))
+
+def test_rebalance_plans_every_leg_sells_first_and_fast():
+    syms = [f"S{i:02d}" for i in range(60)]
+    u = Universe.from_symbols(syms, max_gross=1.0, sleeves={"S00": "long", "S01": "short"},
+                              static={s: 0.015 for s in syms[2:]})
+    rng = np.random.default_rng(0)
+    px = rng.uniform(20, 400, len(syms))
+    positions = {s: float(rng.integers(0, 40)) for s in syms}
+    cons = SizeConstraints(min_notional=50.0)
+
+    w, note = cap_weights(u, target_weights(u, {"TQQQ": 0.2, "SQQQ": 0.0}))
+    assert np.isclose(w.sum(), min(1.0, 0.2 + 58 * 0.015))
+
+    t0 = time.perf_counter()
+    for _ in range(100):
+        intents = plan_rebalance(u, positions, w, px, 100_000.0, minutes_to_close=15, cons=cons,
+                                 min_trade_value=50.0)
+    per_plan = (time.perf_counter() - t0) / 100
+    assert per_plan < 0.005, f"{per_plan * 1000:.2f} ms per 60-leg plan"
+
+    sides = [it.side for it in intents]
+    assert len({it.symbol for it in intents}) > 2
+    assert sides == sorted(sides, key=lambda s: s != "SELL")        # sells wave first
+    assert all(it.order_type == "moc" and it.qty >= 1 and float(it.qty).is_integer() for it in intents)
+
+ROOT = Path(__file__).parent.parent
+
+def test_runner_plans_the_enabled_universe(tmp_path, monkeypatch):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    Path("data/cache").mkdir(parents=True)
+    Path("logs/audit").mkdir(parents=True)
+    Path("config/universe.yaml").write_text(yaml.safe_dump({
+        "enabled": True, "max_gross": 1.0,
+        "symbols": {"QQQ": {"sleeve": "long"}, "PSQ": {"sleeve": "short"},
+                    "XLK": {"weight": 0.10, "max_weight": 0.10}, "TLT": {"weight": 0.05}},
+    }))
+    risk = yaml.safe_load(Path("config/risk.yaml").read_text())
+    risk.setdefault("turnover", {})["max_pct_of_equity"] = 0.0      # no cap: open every leg today
+    Path("config/risk.yaml").write_text(yaml.safe_dump(risk))
+    seed_cache("QQQ", make_bench_series(400, 400.0, seed=5))
+    seed_cache("PSQ", make_bench_series(400, 15.0, seed=5, inverse=True))
+    seed_cache("XLK", make_bench_series(400, 200.0, seed=6))
+    seed_cache("TLT", make_bench_series(400, 90.0, seed=7))
+    monkeypatch.setattr(daily_stages, "eod_ready", lambda m: (True, "test"))
+
+    out = run_daily_offline(equity=50_000, vix=20.0, minutes_to_close=15)
+
+    assert {"XLK", "TLT"} <= {i["symbol"] for i in out["intents"]}
+    assert out["positions_after"]["XLK"] > 0 and out["positions_after"]["TLT"] > 0
+    assert out["snapshot"]["XLK_mv"] > 0 and out["snapshot"]["TLT_mv"] > 0
@@ -0,0 +1,55 @@
+import sys
+import os
+import shutil
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from engine.statcache import StatCache
+from engine.warm import EngineContext
+
+ROOT = Path(__file__).parent.parent
+
+def _age(p: Path, secs: float = 10.0):
+    t = time.time() - secs
+    os.utime(p, (t, t))
+
+def test_statcache_reuses_until_stat_changes(tmp_path):
+    calls = []
+    cache = StatCache(lambda p: calls.append(p) or {"v": p.read_text()})
+    f = tmp_path / "a.txt"
+    f.write_text("one")
+    _age(f)
+    assert cache.get(f) == {"v": "one"}
+    got = cache.get(f)
+    got["v"] = "mutated"                       # callers get copies
+    assert cache.get(f) == {"v": "one"}
+    assert len(calls) == 1 and cache.hits == 2
+
+    f.write_text("two!")
+    _age(f, 5.0)
+    assert cache.get(f) == {"v": "two!"}
+    assert len(calls) == 2
+
+def test_statcache_skips_freshly_written_files(tmp_path):
+    calls = []
+    cache = StatCache(lambda p: calls.append(p) or p.read_text(), settle_sec=60)
+    f = tmp_path / "b.txt"
+    f.write_text("x")
+    cache.get(f)
+    cache.get(f)
+    assert len(calls) == 2 and cache.peek(f) is None
+
+def test_engine_context_tracks_file_changes(tmp_path, monkeypatch):
+    shutil.copytree(ROOT / "config", tmp_path / "config")
+    monkeypatch.chdir(tmp_path)
+    ctx = EngineContext()
+    ctx.warm()                                 # no bars cached: warm still completes
+    assert ctx.warmed_at is not None and ctx.changed() == []
+
+    p = tmp_path / "config" / "run.yaml"
+    p.write_text(p.read_text() + "\n# touched\n")
+    assert ctx.changed() == ["config/run.yaml"]
+    assert ctx.refresh() == ["config/run.yaml"]
+    assert ctx.changed() == []